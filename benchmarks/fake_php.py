@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Sustituto de PHP para los benchmarks: habla el mismo protocolo que el script
+del worker (tramas ready / out / rows / done por STDOUT y la marca de fin en
+STDERR) sin necesitar PHP ni Laravel.
+
+Se invoca como `python fake_php.py script proyecto [--once]`; script y
+proyecto se ignoran. El contenido de cada trabajo es un JSON con la carga a
+generar, p. ej. {"rows": 1000, "shape": "nested", "depth": 3, "stream": false}.
+"""
+
+import json
+import sys
+import time
+
+DONE_MARKER = "\0__tinker_done__\n"
+ROWS_BATCH = 500
+
+
+def make_value(depth, seed):
+    """Estructura anidada de `depth` niveles"""
+    if depth <= 0:
+        return {'city': f"Ciudad {seed % 97}", 'zip': f"{seed % 100000:05d}"}
+    return {
+        'level': depth,
+        'tags': [f"tag{(seed + k) % 13}" for k in range(3)],
+        'child': make_value(depth - 1, seed + 1),
+    }
+
+
+def make_row(index, shape, depth):
+    row = {
+        'id': index + 1,
+        'name': f"Usuario {index + 1}",
+        'email': f"usuario{index + 1}@example.com",
+        'active': index % 3 != 0,
+        'score': round(index * 1.5, 2),
+        'created_at': "2024-01-01T00:00:00.000000Z",
+        'updated_at': "2024-06-01T12:30:00.000000Z",
+    }
+    if shape == 'nested':
+        row['profile'] = make_value(depth, index)
+    return row
+
+
+def emit(frame):
+    sys.stdout.write(json.dumps(frame, ensure_ascii=False, separators=(',', ':')) + "\n")
+    sys.stdout.flush()
+
+
+def run_job(job):
+    # La aplicación antepone los use de facades: la carga es el JSON que sigue
+    code = job['code']
+    try:
+        spec = json.loads(code[code.find('{'):])
+    except ValueError:
+        spec = {}
+    rows = int(spec.get('rows', 10))
+    shape = spec.get('shape', 'flat')
+    depth = int(spec.get('depth', 2))
+    stream = bool(spec.get('stream', False))
+
+    started = time.time()
+    results = []
+    streamed = 0
+    if stream:
+        batch = []
+        for index in range(rows):
+            batch.append(make_row(index, shape, depth))
+            if len(batch) >= ROWS_BATCH:
+                emit({'type': 'rows', 'id': job['id'], 'rows': batch})
+                streamed += len(batch)
+                batch = []
+        if batch:
+            emit({'type': 'rows', 'id': job['id'], 'rows': batch})
+            streamed += len(batch)
+    else:
+        results.append([make_row(index, shape, depth) for index in range(rows)])
+    code_ms = (time.time() - started) * 1000
+
+    sys.stderr.write(DONE_MARKER)
+    sys.stderr.flush()
+    frame = {
+        'type': 'done',
+        'id': job['id'],
+        'status': 'ok',
+        'results': results,
+        'streamed': streamed,
+        'queries': [],
+        'queries_dropped': 0,
+        'exception': None,
+        'error': None,
+        'code_ms': round(code_ms, 3),
+        'memory_peak': 0,
+    }
+    serialize_started = time.time()
+    encoded = json.dumps(frame, ensure_ascii=False, separators=(',', ':'))
+    serialize_ms = (time.time() - serialize_started) * 1000
+    sys.stdout.write(encoded[:-1] + f',"serialize_ms":{serialize_ms:.3f},"sent_at":{time.time():.6f}}}' + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    once = '--once' in sys.argv
+    emit({'type': 'ready', 'pid': 0, 'boot_ms': 0.0})
+    for line in sys.stdin:
+        try:
+            job = json.loads(line)
+        except ValueError:
+            continue
+        run_job(job)
+        if once:
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks de la tubería de ejecución y render con un PHP simulado
+(benchmarks/fake_php.py), para comparar regresiones entre commits.
+
+Etapas medidas por escenario (filas × forma):
+- worker: TinkerWorker.execute con el worker ya arrancado, con su desglose
+- json_decode: json.loads de la trama "done" equivalente
+- run_tinker: LaravelTinkerApp._run_tinker de extremo a extremo (proceso de un uso)
+- add_to_log: inserción del resultado en el log
+- create_table_view: creación y llenado de la vista de tabla
+
+Las etapas de interfaz necesitan pantalla; sin ella se marcan como omitidas.
+
+Uso:
+    python benchmarks/run_benchmarks.py --rows 10,1000,100000 --shapes flat,nested
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/anterior.json
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from tinker_engine import TinkerWorker  # noqa: E402
+import fake_php  # noqa: E402
+
+FAKE_PHP = [sys.executable, os.path.join(BENCHMARKS_DIR, 'fake_php.py')]
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+
+def measure(func, repeat):
+    """
+    Ejecuta func `repeat` veces midiendo el tiempo y una vez más con
+    tracemalloc para el pico de memoria de Python
+
+    Returns:
+        dict: ms (mediana), ms_min, ms_max, python_peak_bytes y el último valor devuelto
+    """
+    times = []
+    value = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        value = func()
+        times.append((time.perf_counter() - started) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'ms': round(statistics.median(times), 3),
+        'ms_min': round(min(times), 3),
+        'ms_max': round(max(times), 3),
+        'python_peak_bytes': peak,
+    }, value
+
+
+def build_payload(rows, shape, depth):
+    return [fake_php.make_row(index, shape, depth) for index in range(rows)]
+
+
+def open_gui():
+    """Crea la aplicación oculta; None si no hay pantalla o falta ttkbootstrap"""
+    try:
+        import ttkbootstrap as ttk
+        from laravel_tinker_tool import LaravelTinkerApp
+        root = ttk.Window(themename="cosmo")
+    except Exception as e:
+        return None, f"sin interfaz: {e}"
+    root.withdraw()
+    app = LaravelTinkerApp(root)
+    app.php_binary = FAKE_PHP
+    return app, None
+
+
+def close_tables(app):
+    import tkinter as tk
+    for widget in app.root.winfo_children():
+        if isinstance(widget, tk.Toplevel):
+            widget.destroy()
+    app.root.update_idletasks()
+
+
+def drain_queue(app):
+    """Procesa los mensajes pendientes de la cola como lo haría el bucle de la interfaz"""
+    from laravel_tinker_tool import UI_FRAME_BUDGET
+    while not app.output_queue.empty():
+        app._drain_output_queue(time.perf_counter() + UI_FRAME_BUDGET)
+        app.root.update_idletasks()
+
+
+def run_scenario(worker, app, gui_reason, project, rows, shape, depth, stream, args):
+    spec = {'rows': rows, 'shape': shape, 'depth': depth, 'stream': stream}
+    code = json.dumps(spec)
+    stages = {}
+
+    # Worker ya arrancado: transferencia y decodificación del lado de Python
+    def run_worker():
+        collected = []
+        envelope = worker.execute(code, on_rows=collected.extend if stream else None)
+        return envelope
+    stats, envelope = measure(run_worker, args.repeat)
+    stats['breakdown'] = {key: value for key, value in envelope['timing'].items()
+                          if isinstance(value, (int, float))}
+    stages['worker'] = stats
+    envelope = None
+
+    # json.loads de una trama equivalente
+    payload = build_payload(rows, shape, depth)
+    frame = json.dumps({'type': 'done', 'id': 1, 'status': 'ok', 'results': [payload]},
+                       ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    stats, _ = measure(lambda: json.loads(frame), args.repeat)
+    stats['bytes'] = len(frame)
+    stages['json_decode'] = stats
+    frame = None
+
+    if app is None or rows > args.gui_max_rows:
+        reason = gui_reason or f"más de {args.gui_max_rows} filas"
+        for stage in ('run_tinker', 'add_to_log', 'create_table_view'):
+            stages[stage] = {'skipped': reason}
+        return stages
+
+    def run_tinker():
+        run = app._new_streamed_run("Salida")
+        run.code = code
+        app._run_tinker(code, run, project)
+        drain_queue(app)
+        close_tables(app)
+    stats, _ = measure(run_tinker, args.repeat)
+    stages['run_tinker'] = stats
+
+    def add_to_log():
+        app.add_to_log(("Resultado", payload), "result")
+        app.root.update_idletasks()
+        app.clear_logs()
+    stats, _ = measure(add_to_log, args.repeat)
+    stages['add_to_log'] = stats
+
+    def create_table_view():
+        app.create_table_view(payload)
+        app.root.update_idletasks()
+        close_tables(app)
+    stats, _ = measure(create_table_view, args.repeat)
+    stages['create_table_view'] = stats
+    return stages
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base_path, current):
+    """Imprime la relación actual / base de cada etapa medida"""
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    base_index = {
+        (s['rows'], s['shape'], s['depth'], s['stream']): s['stages'] for s in base['scenarios']
+    }
+    print(f"\nComparación con {base_path} (commit {base['meta'].get('commit')}):")
+    regressions = 0
+    for scenario in current['scenarios']:
+        key = (scenario['rows'], scenario['shape'], scenario['depth'], scenario['stream'])
+        base_stages = base_index.get(key)
+        if base_stages is None:
+            continue
+        for stage, stats in scenario['stages'].items():
+            old = base_stages.get(stage, {})
+            if 'ms' not in stats or not old.get('ms'):
+                continue
+            ratio = stats['ms'] / old['ms']
+            flag = ""
+            if ratio > 1 + current['meta']['threshold']:
+                flag = "  <-- regresión"
+                regressions += 1
+            print(f"  {key[0]:>8} {key[1]:<6} {'stream' if key[3] else 'batch':<6} {stage:<18} "
+                  f"{old['ms']:>10.2f} ms -> {stats['ms']:>10.2f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks de la tubería con PHP simulado")
+    parser.add_argument("--rows", default="10,1000,100000,1000000",
+                        help="Tamaños en filas separados por comas")
+    parser.add_argument("--shapes", default="flat,nested", help="Formas: flat, nested")
+    parser.add_argument("--depth", type=int, default=2, help="Niveles de anidación de la forma nested")
+    parser.add_argument("--stream", action="store_true", help="Medir también el modo streaming")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por etapa (se usa la mediana)")
+    parser.add_argument("--gui-max-rows", type=int, default=100000,
+                        help="Tamaño máximo para las etapas de interfaz")
+    parser.add_argument("--no-gui", action="store_true", help="Omitir las etapas de interfaz")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto en benchmarks/results/)")
+    parser.add_argument("--compare", help="Resultados anteriores con los que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Empeoramiento relativo que se marca como regresión (0.10 = 10%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    sizes = [int(size) for size in args.rows.split(',') if size.strip()]
+    shapes = [shape.strip() for shape in args.shapes.split(',') if shape.strip()]
+    modes = [False, True] if args.stream else [False]
+
+    project = tempfile.mkdtemp(prefix='py_tinker_bench_')
+    worker = TinkerWorker(project, FAKE_PHP)
+    worker.start()
+
+    app, gui_reason = (None, "omitido con --no-gui") if args.no_gui else open_gui()
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'threshold': args.threshold,
+        },
+        'scenarios': [],
+    }
+    try:
+        for rows in sizes:
+            for shape in shapes:
+                for stream in modes:
+                    print(f"{rows:>8} filas, {shape}, {'stream' if stream else 'batch'}...", flush=True)
+                    stages = run_scenario(worker, app, gui_reason, project, rows, shape, args.depth, stream, args)
+                    for stage, stats in stages.items():
+                        if 'ms' in stats:
+                            print(f"    {stage:<18} {stats['ms']:>10.2f} ms  "
+                                  f"pico Python {stats['python_peak_bytes'] / (1024 * 1024):.1f} MB")
+                        else:
+                            print(f"    {stage:<18} omitido ({stats['skipped']})")
+                    results['scenarios'].append({
+                        'rows': rows, 'shape': shape, 'depth': args.depth, 'stream': stream, 'stages': stages,
+                    })
+    finally:
+        worker.shutdown()
+        if app is not None:
+            app.root.destroy()
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{results['meta']['commit'] or 'sin-commit'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {output}")
+
+    if args.compare:
+        return 1 if compare(args.compare, results) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,561 @@ import queue
 import re
 import json
 import datetime
+import time
+import collections
+import itertools
+
+from tinker_columns import (
+    ColumnStore, cell_text, estimate_bytes, export_format, export_store, json_default,
+)
+from tinker_syntax import HIGHLIGHT_MAX_CHARS, HIGHLIGHT_TAGS, STATE_CODE, highlight_ranges, lex_line
+from tinker_engine import (
+    build_use_statements, php_command, kill_process_tree, pump_pipe, PROCESS_GROUP_KWARGS,
+    ExecutionInterrupted, make_envelope, TinkerWorker, WorkerPool, PRIORITY_HIGH, snippet_priority,
+    OutputSpool, LogArchive, transform_code, to_stream_code, format_bytes, format_timing, detect_n_plus_one,
+    build_explain_code, explain_findings, build_benchmark_code, benchmark_stats, PagedQuery,
+    OneShotRunner,
+)
+
+
+class OutputQueue(queue.Queue):
+    """
+    Cola de mensajes hacia la interfaz que despierta al bucle de Tk cuando
+    llegan datos nuevos.
+
+    El primer mensaje tras vaciar la cola publica el evento virtual
+    OUTPUT_READY_EVENT en el widget enlazado con bind_widget; los siguientes
+    solo marcan ready hasta que la interfaz vacía la cola, así que una ráfaga
+    de mensajes genera un único evento.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.ready = threading.Event()
+        self._widget = None
+
+    def bind_widget(self, widget):
+        """
+        Indica el widget en el que se publica el aviso de datos nuevos
+
+        Args:
+            widget: Widget de Tk (normalmente la ventana raíz)
+        """
+        self._widget = widget
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        if self.ready.is_set():
+            return
+        self.ready.set()
+        widget = self._widget
+        if widget is None:
+            return
+        try:
+            widget.event_generate(OUTPUT_READY_EVENT, when="tail")
+        except (tk.TclError, RuntimeError):
+            # Ventana cerrada o bucle de Tk aún sin arrancar: queda el sondeo
+            pass
+
+
+class StreamedRun:
+    """
+    Salida impresa por una ejecución, que se reenvía al log a medida que llega.
+    Los datos estructurados no pasan por aquí: llegan en el sobre del trabajo.
+    """
+
+    def __init__(self, output_queue, label, cap_bytes, error_label="Error"):
+        self.output_queue = output_queue
+        self.label = label
+        self.error_label = error_label
+        self.stdout = OutputSpool(cap_bytes)
+        self.stderr = OutputSpool(cap_bytes)
+        # 'timeout' o 'cancelled' si la ejecución se detuvo antes de terminar
+        self.interrupted = None
+        # Vista de tabla que recibe las filas en streaming (la gestiona la interfaz)
+        self.table = None
+        # Código ejecutado y segundos de interfaz dedicados a sus filas (para el historial)
+        self.code = ''
+        self.render_seconds = 0.0
+        self._label_sent = False
+        self._error_label_sent = False
+
+    def feed(self, text):
+        """Recibe salida estándar (puede llamarse desde cualquier hilo)"""
+        if self.stdout.write(text):
+            self._send(text)
+
+    def feed_error(self, text):
+        """Recibe salida de errores (puede llamarse desde cualquier hilo)"""
+        if self.stderr.write(text):
+            if not self._error_label_sent:
+                self._error_label_sent = True
+                self.output_queue.put((self.error_label + ":", "error"))
+            self.output_queue.put((text, "stream_error"))
+
+    def feed_rows(self, rows):
+        """Recibe un lote de filas de streamOutput() (puede llamarse desde cualquier hilo)"""
+        self.output_queue.put(((self, rows), "rows"))
+
+    def _send(self, text):
+        if not self._label_sent:
+            self._label_sent = True
+            self.output_queue.put((self.label + ":", "info"))
+        self.output_queue.put((text, "stream"))
+
+    def close(self):
+        self.stdout.close()
+        self.stderr.close()
+
+
+# Tope de elementos y de caracteres que se formatean de una vez en el log
+RESULT_PAGE_ITEMS = 50
+RESULT_PAGE_CHARS = 64 * 1024
+
+# Líneas que conserva el widget de log; las más antiguas se borran
+OUTPUT_MAX_LINES = 20000
+
+# Tamaño estimado máximo de las entradas del historial en memoria (con sus
+# resultados); las que no caben pasan al archivo en disco aunque no se haya
+# llegado al número de entradas configurado
+LOG_HISTORY_MAX_BYTES = 64 * 1024 * 1024
+
+# Mensajes de más caracteres que esto se muestran plegados: un resumen y las
+# primeras líneas; el resto se añade por bloques o se abre en un visor aparte
+LOG_COLLAPSE_CHARS = 256 * 1024
+LOG_PREVIEW_LINES = 50
+LOG_EXPAND_LINES = 2000
+
+# Segundos de cada pasada por la cola de salida antes de ceder el control a Tk,
+# y milisegundos entre pasadas: mínimo con datos llegando, máximo en reposo
+UI_FRAME_BUDGET = 0.012
+UI_POLL_MIN_MS = 15
+UI_POLL_MAX_MS = 100
+# Evento virtual con el que OutputQueue despierta a la interfaz al llegar datos
+OUTPUT_READY_EVENT = "<<OutputReady>>"
+
+
+# Milisegundos sin editar antes de volver a resaltar el editor
+HIGHLIGHT_DELAY_MS = 150
+
+
+class EditorHighlighter:
+    """
+    Resaltado incremental del editor. Guarda el estado del lexer al empezar
+    cada línea; tras una edición sólo se tokenizan las líneas cambiadas y las
+    siguientes mientras su estado inicial cambie (p. ej. al abrir un /* que
+    convierte en comentario el resto del archivo). El trabajo se hace cuando
+    el usuario deja de escribir y por tramos de UI_FRAME_BUDGET segundos.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        # Estado del lexer al empezar cada línea (la posición 0 es la línea 1)
+        self.states = [STATE_CODE]
+        self.line_count = 1
+        # Primera y última línea pendientes de tokenizar
+        self._dirty = None
+        self._after_id = None
+        widget.bind("<<Modified>>", self._on_modified, add="+")
+
+    def _lines(self):
+        return int(self.widget.index("end-1c").split(".")[0])
+
+    def reset(self):
+        """Vuelve a resaltar todo el texto (tras cargar un archivo o reemplazarlo entero)"""
+        self.line_count = self._lines()
+        self.states = [STATE_CODE] * self.line_count
+        self._mark_dirty(1, self.line_count)
+
+    def _on_modified(self, event=None):
+        if not self.widget.edit_modified():
+            return
+        self.widget.edit_modified(False)
+
+        # La edición está junto al cursor: las líneas nuevas quedan antes de él
+        # y las borradas, después
+        lines = self._lines()
+        delta = lines - self.line_count
+        self.line_count = lines
+        cursor = int(self.widget.index(tk.INSERT).split(".")[0])
+        if delta > 0:
+            first = max(cursor - delta, 1)
+            self.states[first:first] = [None] * delta
+        else:
+            first = cursor
+            del self.states[cursor:cursor - delta]
+        if self._dirty and self._dirty[1] >= first:
+            self._dirty = (self._dirty[0], max(self._dirty[1] + delta, first))
+        self._mark_dirty(first, cursor)
+
+    def _mark_dirty(self, first, last):
+        if self._dirty:
+            first, last = min(first, self._dirty[0]), max(last, self._dirty[1])
+        self._dirty = (first, min(last, self.line_count))
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(HIGHLIGHT_DELAY_MS, self._rehighlight)
+
+    def _rehighlight(self):
+        """
+        Tokeniza las líneas pendientes hasta que el estado deja de cambiar o se
+        agota el tiempo de la pasada; en ese caso continúa en la siguiente
+        """
+        self._after_id = None
+        if not self._dirty:
+            return
+        first, last = self._dirty
+        self._dirty = None
+        total = self.line_count = self._lines()
+        if len(self.states) != total:
+            # El recuento no cuadra (edición lejos del cursor): se reajusta y se llega al final
+            self.states = (self.states + [None] * total)[:total]
+            last = total
+        first = max(1, min(first, total))
+
+        deadline = time.perf_counter() + UI_FRAME_BUDGET
+        ranges = {}
+        state = self.states[first - 1] if first > 1 else STATE_CODE
+        self.states[first - 1] = state
+        line = first
+        while True:
+            text = self.widget.get(f"{line}.0", f"{line}.end")
+            tokens, state = lex_line(text, state)
+            for tag, start, end in tokens:
+                ranges.setdefault(tag, []).extend((f"{line}.{start}", f"{line}.{end}"))
+            if line >= total:
+                break
+            line += 1
+            if line > last and self.states[line - 1] == state:
+                # A partir de aquí el resaltado anterior sigue siendo válido
+                line -= 1
+                break
+            self.states[line - 1] = state
+            if time.perf_counter() > deadline:
+                # Continuar en la siguiente pasada desde esta línea
+                self._dirty = (line, max(last, line))
+                line -= 1
+                break
+
+        for tag in HIGHLIGHT_TAGS:
+            self.widget.tag_remove(tag, f"{first}.0", f"{line}.end")
+        for tag, indices in ranges.items():
+            for offset in range(0, len(indices), 2000):
+                self.widget.tag_add(tag, *indices[offset:offset + 2000])
+
+        if self._dirty:
+            self._after_id = self.widget.after(1, self._rehighlight)
+
+
+# Filas que se formatean por encima y por debajo de las visibles en la vista de tabla
+TABLE_OVERSCAN_ROWS = 20
+
+# Tablas paginadas: registros por página pedida al worker y páginas que se guardan en memoria
+TABLE_PAGE_SIZE = 500
+TABLE_PAGE_CACHE = 20
+
+
+class VirtualGrid:
+    """
+    Vista de tabla virtual sobre un Treeview: sólo existen como elementos del
+    Treeview las filas que caben en pantalla, que se reutilizan al desplazarse
+    cambiando sus valores. Los datos siguen en su ColumnStore y cada fila se
+    convierte a texto cuando entra en la zona visible (más TABLE_OVERSCAN_ROWS
+    por cada lado, que se preparan en segundo plano).
+
+    Ordenar o filtrar no toca los datos: `order` es la lista de índices de fila
+    en el orden en que se muestran (None = todas en su orden original).
+
+    Si se asigna `on_view`, se llama con (primera, última) posición visible en
+    cada redibujado, p. ej. para pedir las páginas de una PagedQuery.
+    """
+
+    def __init__(self, tree, scrollbar, rows, columns, highlight=None):
+        """
+        Args:
+            tree (ttk.Treeview): Treeview sin scroll vertical propio
+            scrollbar (ttk.Scrollbar): Scrollbar vertical que recorre todas las filas
+            rows (ColumnStore): Filas; puede crecer (streaming) llamando a refresh()
+            columns (list): Columnas mostradas; puede crecer llamando a refresh()
+            highlight (set): Índices de las filas que se destacan como aviso
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rows = rows
+        self.columns = columns
+        self.highlight = highlight or set()
+        self.order = None
+        self.on_view = None
+        self.first = 0
+        self.visible = 1
+        self.selected = None
+        self._items = []
+        self._formatted = {}
+        self._overscan_id = None
+        self._row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+
+        scrollbar.config(command=self._on_scrollbar)
+        tree.bind("<Configure>", self._on_configure)
+        tree.bind("<MouseWheel>", self._on_mousewheel)
+        tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        tree.bind("<Button-5>", lambda e: self.scroll(3))
+        tree.bind("<<TreeviewSelect>>", self._on_select)
+        tree.bind("<Up>", lambda e: self._move_selection(-1))
+        tree.bind("<Down>", lambda e: self._move_selection(1))
+        tree.bind("<Prior>", lambda e: self.scroll(-self.visible) or "break")
+        tree.bind("<Next>", lambda e: self.scroll(self.visible) or "break")
+        tree.bind("<Home>", lambda e: self.scroll_to(0) or "break")
+        tree.bind("<End>", lambda e: self.scroll_to(self.count()) or "break")
+
+    def count(self):
+        """Filas que se muestran (las que pasan el filtro, si lo hay)"""
+        return len(self.rows) if self.order is None else len(self.order)
+
+    def row_index(self, position):
+        """Índice en los datos de la fila mostrada en la posición dada"""
+        return position if self.order is None else self.order[position]
+
+    def refresh(self, columns_changed=False):
+        """Vuelve a dibujar tras añadir filas o columnas"""
+        if columns_changed:
+            self._formatted.clear()
+        self._render()
+
+    def set_order(self, order):
+        """
+        Muestra las filas en otro orden o sólo algunas, conservando la fila seleccionada
+
+        Args:
+            order (list): Índices de fila a mostrar, o None para todas en su orden original
+        """
+        selected = self.row_index(self.selected) if self.selected is not None else None
+        self.order = order
+        if selected is None:
+            self.selected = None
+        elif order is None:
+            self.selected = selected
+        else:
+            try:
+                self.selected = order.index(selected)
+            except ValueError:
+                self.selected = None
+        first = 0
+        if self.selected is not None and self.selected >= self.visible:
+            first = self.selected - self.visible // 2
+        self.first = max(0, min(first, self.count() - self.visible))
+        self._render()
+
+    def scroll(self, delta):
+        self.scroll_to(self.first + delta)
+        return "break"
+
+    def scroll_to(self, first):
+        last_first = max(self.count() - self.visible, 0)
+        first = max(0, min(int(first), last_first))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def row_values(self, index):
+        """Valores de texto de una fila (por su índice en los datos), formateados una sola vez mientras está cerca de la vista"""
+        values = self._formatted.get(index)
+        if values is None:
+            values = self._formatted[index] = [cell_text(self.rows.value(index, col)) for col in self.columns]
+        return values
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * self.count())
+        elif unit == "pages":
+            self.scroll(int(amount) * self.visible)
+        else:
+            self.scroll(int(amount))
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_configure(self, event=None):
+        # El encabezado ocupa aproximadamente una fila
+        visible = max(self.tree.winfo_height() // self._row_height - 1, 1)
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            self.selected = self.first + self._items.index(selection[0])
+
+    def _move_selection(self, delta):
+        """Mueve la selección con las flechas desplazando la vista en los bordes"""
+        if self.selected is None:
+            return None
+        target = max(0, min(self.selected + delta, self.count() - 1))
+        self.selected = target
+        if target < self.first:
+            self.scroll_to(target)
+        elif target >= self.first + self.visible:
+            self.scroll_to(target - self.visible + 1)
+        else:
+            self._render()
+        return "break"
+
+    def _render(self):
+        total = self.count()
+        count = min(self.visible, max(total - self.first, 0))
+        while len(self._items) < count:
+            self._items.append(self.tree.insert("", "end"))
+        while len(self._items) > count:
+            self.tree.delete(self._items.pop())
+
+        for slot, item in enumerate(self._items):
+            position = self.first + slot
+            index = self.row_index(position)
+            tags = ["odd" if position % 2 else "even"]
+            if index in self.highlight:
+                tags.append("warning")
+            self.tree.item(item, values=self.row_values(index), tags=tags)
+
+        if self.selected is not None and self.first <= self.selected < self.first + count:
+            item = self._items[self.selected - self.first]
+            if self.tree.selection() != (item,):
+                self.tree.selection_set(item)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        if total:
+            self.scrollbar.set(self.first / total, min((self.first + count) / total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        if self.on_view is not None:
+            self.on_view(self.first, self.first + count)
+
+        # Preparar en segundo plano las filas de alrededor y olvidar las lejanas
+        if self._overscan_id is None:
+            self._overscan_id = self.tree.after_idle(self._prepare_overscan)
+
+    def _prepare_overscan(self):
+        self._overscan_id = None
+        low = max(self.first - TABLE_OVERSCAN_ROWS, 0)
+        high = min(self.first + self.visible + TABLE_OVERSCAN_ROWS, self.count())
+        nearby = [self.row_index(position) for position in range(low, high)]
+        if len(self._formatted) > (self.visible + 2 * TABLE_OVERSCAN_ROWS) * 2:
+            keep = set(nearby)
+            self._formatted = {index: values for index, values in self._formatted.items() if index in keep}
+        for index in nearby:
+            self.row_values(index)
+
+
+def describe_json(data):
+    """Resumen corto de un resultado, sin recorrerlo"""
+    if isinstance(data, (list, ColumnStore)):
+        return f"lista de {len(data)} elementos"
+    if isinstance(data, dict):
+        return f"objeto con {len(data)} claves"
+    return type(data).__name__
+
+
+class TextPager:
+    """
+    Texto largo que se guarda fuera del widget y se entrega por bloques de líneas
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.size = len(text.encode('utf-8', 'replace'))
+        self.lines = text.count("\n") + (0 if text.endswith("\n") else 1)
+        self.position = 0
+        self.shown_lines = 0
+
+    def remaining(self):
+        """Líneas que aún no se han entregado"""
+        return self.lines - self.shown_lines if self.position < len(self.text) else 0
+
+    def next_lines(self, count):
+        """
+        Siguiente bloque de como mucho `count` líneas y RESULT_PAGE_CHARS caracteres
+
+        Returns:
+            str: Texto del bloque (vacío si ya se entregó todo)
+        """
+        limit = min(len(self.text), self.position + RESULT_PAGE_CHARS)
+        end = self.position
+        for _ in range(count):
+            newline = self.text.find("\n", end, limit)
+            if newline == -1:
+                end = limit
+                break
+            end = newline + 1
+        chunk = self.text[self.position:end]
+        self.position = end
+        self.shown_lines += chunk.count("\n")
+        if self.position >= len(self.text) and not chunk.endswith("\n"):
+            self.shown_lines += 1
+        return chunk
+
+
+class JsonPager:
+    """
+    Formatea un resultado con sangría por páginas. Los datos llegan ya
+    decodificados desde el worker y sólo se convierten a texto los elementos
+    del primer nivel que se muestran en el log.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        if isinstance(data, dict):
+            self._keys = list(data.keys())
+            self._total = len(self._keys)
+        elif isinstance(data, (list, ColumnStore)):
+            self._keys = None
+            self._total = len(data)
+        else:
+            self._total = 0
+        self.position = 0
+        self._started = False
+
+    def remaining(self):
+        """Elementos del primer nivel que aún no se han formateado"""
+        return self._total - self.position
+
+    def _format_item(self, index):
+        if self._keys is None:
+            text = json.dumps(self.data[index], indent=4, ensure_ascii=False)
+        else:
+            key = self._keys[index]
+            text = json.dumps(key, ensure_ascii=False) + ": " + \
+                json.dumps(self.data[key], indent=4, ensure_ascii=False)
+        return "    " + text.replace("\n", "\n    ")
+
+    def next_page(self):
+        """
+        Formatea la siguiente página del resultado
+
+        Returns:
+            str: Texto de la página; la última termina con el cierre del contenedor
+        """
+        if not self._total:
+            self._started = True
+            return json.dumps(self.data, indent=4, ensure_ascii=False)
+
+        parts = []
+        if not self._started:
+            self._started = True
+            parts.append("{\n" if self._keys is not None else "[\n")
+
+        size = 0
+        count = 0
+        while self.position < self._total and count < RESULT_PAGE_ITEMS and size < RESULT_PAGE_CHARS:
+            text = self._format_item(self.position)
+            self.position += 1
+            count += 1
+            size += len(text)
+            parts.append(text + (",\n" if self.position < self._total else "\n"))
+
+        if not self.remaining():
+            parts.append("}" if self._keys is not None else "]")
+        return "".join(parts)
+
 
 class LaravelTinkerApp:
     def __init__(self, root):
@@ -20,21 +575,75 @@ class LaravelTinkerApp:
         self.root.state('zoomed')
         
         self.project_path = tk.StringVar()
-        self.output_queue = queue.Queue()
-        
-        # Historial de logs
-        self.log_history = []
+        self.output_queue = OutputQueue()
+        self._poll_interval = UI_POLL_MIN_MS
+        self._poll_id = None
+        # Mientras se vacía la cola, add_to_log no desplaza el log (se hace una vez al final)
+        self._log_batch = False
+        self._log_dirty = False
+        
+        # Historial de logs: las últimas entradas en memoria y el resto en un
+        # archivo JSONL rotativo que se escribe en segundo plano
+        self.log_history_size = tk.IntVar(value=1000)
+        self.log_history = collections.deque()
+        # Tamaño estimado de cada entrada del historial y su suma
+        self._log_sizes = collections.deque()
+        self._log_bytes = 0
+        self.log_archive = LogArchive()
         
         # Habilitar transformador de código
         self.auto_transform = tk.BooleanVar(value=True)
         
+        # Enviar las filas de las consultas por partes a la vista de tabla
+        self.stream_rows = tk.BooleanVar(value=False)
+        
+        # Pools de workers PHP persistentes, uno por proyecto
+        self.php_binary = 'php'
+        self.use_worker = tk.BooleanVar(value=True)
+        self.pool_size = tk.IntVar(value=2)
+        self.scheduling = tk.StringVar(value='priority')
+        self.scheduling.trace_add('write', lambda *args: self._apply_scheduling())
+        self.pools = {}
+        self._pools_lock = threading.Lock()
+        
+        # Tope de salida en memoria por ejecución; el resto va a un archivo temporal
+        self.output_cap_mb = tk.IntVar(value=20)
+        
+        # Iteraciones medidas y de calentamiento del modo benchmark
+        self.bench_iterations = tk.IntVar(value=50)
+        self.bench_warmup = tk.IntVar(value=5)
+        
+        # Límites por ejecución (0 segundos = sin límite de tiempo)
+        self.timeout_seconds = tk.IntVar(value=300)
+        self.memory_limit = tk.StringVar(value="1G")
+        
+        # Procesos PHP de un solo uso en curso (ejecuciones sin worker y Artisan),
+        # con la función que los termina
+        self._active_processes = {}
+        self._active_processes_lock = threading.Lock()
+        
         # Crear menú
         self.create_menu()
         
         # Crear widgets
         self.create_widgets()
         
-        self.root.after(100, self.check_output_queue)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
+        
+        self.output_queue.bind_widget(self.root)
+        self.root.bind(OUTPUT_READY_EVENT, self._on_output_ready)
+        self._poll_id = self.root.after(UI_POLL_MIN_MS, self.check_output_queue)
+    
+    def quit_app(self):
+        """
+        Detiene los workers PHP y cierra la aplicación
+        """
+        with self._pools_lock:
+            pools, self.pools = list(self.pools.values()), {}
+        for pool in pools:
+            pool.shutdown()
+        self.log_archive.close(remove=True)
+        self.root.quit()
     
     def create_menu(self):
         # Crear barra de menú
@@ -46,12 +655,12 @@ class LaravelTinkerApp:
         menu_bar.add_cascade(label="Archivo", menu=file_menu)
         file_menu.add_command(label="Abrir Proyecto", command=self.browse_project)
         file_menu.add_separator()
-        file_menu.add_command(label="Salir", command=self.root.quit)
+        file_menu.add_command(label="Salir", command=self.quit_app)
         
         # Menú Edición
         edit_menu = tk.Menu(menu_bar, tearoff=0)
         menu_bar.add_cascade(label="Edición", menu=edit_menu)
-        edit_menu.add_command(label="Limpiar Editor", command=lambda: self.code_editor.delete(1.0, tk.END))
+        edit_menu.add_command(label="Limpiar Editor", command=lambda: self._set_editor_text(""))
         
         # Menú Laravel
         laravel_menu = tk.Menu(menu_bar, tearoff=0)
@@ -63,6 +672,9 @@ class LaravelTinkerApp:
                                 command=lambda: self.run_artisan_command("migrate"))
         laravel_menu.add_command(label="Ver Rutas", 
                                 command=lambda: self.run_artisan_command("route:list"))
+        laravel_menu.add_separator()
+        laravel_menu.add_command(label="Reiniciar Workers PHP", command=self.restart_worker)
+        laravel_menu.add_command(label="Cancelar Ejecuciones", command=self.cancel_execution)
         
         # Menú Logs
         logs_menu = tk.Menu(menu_bar, tearoff=0)
@@ -83,6 +695,28 @@ class LaravelTinkerApp:
                                 variable=self.auto_transform, 
                                 onvalue=True, 
                                 offvalue=False)
+        config_menu.add_checkbutton(label="Transmitir filas de consultas (streaming)", 
+                                variable=self.stream_rows, 
+                                onvalue=True, 
+                                offvalue=False)
+        config_menu.add_checkbutton(label="Usar worker PHP persistente", 
+                                variable=self.use_worker, 
+                                onvalue=True, 
+                                offvalue=False)
+        config_menu.add_command(label="Tamaño del pool de workers...", command=self.configure_pool_size)
+        config_menu.add_command(label="Límite de salida en memoria...", command=self.configure_output_cap)
+        config_menu.add_command(label="Límites de ejecución...", command=self.configure_execution_limits)
+        config_menu.add_command(label="Tamaño del historial de logs...", command=self.configure_log_history)
+        
+        # Submenú de planificación de la cola de trabajos
+        scheduling_menu = tk.Menu(config_menu, tearoff=0)
+        config_menu.add_cascade(label="Planificación de trabajos", menu=scheduling_menu)
+        scheduling_menu.add_radiobutton(label="Por prioridad (consultas rápidas primero)", 
+                                        variable=self.scheduling, 
+                                        value='priority')
+        scheduling_menu.add_radiobutton(label="FIFO (orden de llegada)", 
+                                        variable=self.scheduling, 
+                                        value='fifo')
         
         # Menú Ayuda
         help_menu = tk.Menu(menu_bar, tearoff=0)
@@ -149,11 +783,27 @@ class LaravelTinkerApp:
         self.code_editor.tag_configure('keyword', foreground='#0066CC')
         self.code_editor.tag_configure('string', foreground='#008800')
         self.code_editor.tag_configure('comment', foreground='#808080', font=('Courier', 10, 'italic'))
+        self.code_editor.tag_configure('number', foreground='#C05800')
+        self.editor_highlighter = EditorHighlighter(self.code_editor)
         
         # Botones de acción para el editor
         editor_buttons = ttk.Frame(editor_frame)
         editor_buttons.pack(fill=tk.X, pady=(10, 0))
         
+        ttk.Button(
+            editor_buttons, 
+            text="Cancelar", 
+            command=self.cancel_execution, 
+            style="danger.TButton"
+        ).pack(side=tk.RIGHT, padx=(10, 0))
+        
+        ttk.Button(
+            editor_buttons, 
+            text="Benchmark", 
+            command=self.run_benchmark, 
+            style="success.Outline.TButton"
+        ).pack(side=tk.RIGHT, padx=(10, 0))
+        
         ttk.Button(
             editor_buttons, 
             text="Ejecutar", 
@@ -164,7 +814,7 @@ class LaravelTinkerApp:
         ttk.Button(
             editor_buttons, 
             text="Limpiar", 
-            command=lambda: self.code_editor.delete(1.0, tk.END), 
+            command=lambda: self._set_editor_text(""), 
             style="warning.TButton"
         ).pack(side=tk.RIGHT)
 
@@ -194,9 +844,12 @@ class LaravelTinkerApp:
             style="info.TButton"
         ).pack(side=tk.RIGHT, padx=(5, 0))
         
-        # Panel de salida
-        output_frame = ttk.Labelframe(editor_paned, text="Logs", padding=10)
-        editor_paned.add(output_frame, weight=1)
+        # Paneles de salida: logs e historial de ejecuciones
+        self.output_notebook = ttk.Notebook(editor_paned)
+        editor_paned.add(self.output_notebook, weight=1)
+        
+        output_frame = ttk.Frame(self.output_notebook, padding=10)
+        self.output_notebook.add(output_frame, text="Logs")
         
         # Usar Text normal en lugar de ScrolledText para evitar problemas con el estado
         self.output_text = tk.Text(output_frame, wrap=tk.WORD)
@@ -208,14 +861,326 @@ class LaravelTinkerApp:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.output_text.config(yscrollcommand=scrollbar.set)
         
+        self.create_sql_panel()
+        self.create_history_panel()
+        
         # Variable para almacenar los últimos datos JSON
         self.last_json_data = None
         
         # Barra de estado
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        
         self.status_var = tk.StringVar()
         self.status_var.set("Listo")
-        status_bar = ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Profundidad de la cola de trabajos del pool
+        self.queue_var = tk.StringVar()
+        self.queue_var.set("Cola: 0")
+        queue_label = ttk.Label(status_frame, textvariable=self.queue_var, relief=tk.SUNKEN, anchor=tk.E, width=28)
+        queue_label.pack(side=tk.RIGHT)
+
+    # Consultas más lentas de cada ejecución que se destacan en el panel SQL
+    SLOWEST_QUERIES = 3
+
+    def create_sql_panel(self):
+        """
+        Pestaña con las consultas SQL de cada ejecución: una fila por ejecución
+        con los totales y, debajo, sus consultas con bindings, tiempo y conexión
+        """
+        sql_frame = ttk.Frame(self.output_notebook, padding=10)
+        self.output_notebook.add(sql_frame, text="Consultas SQL")
+        
+        self.sql_totals = {'count': 0, 'time': 0.0, 'slowest': None}
+        # Consulta capturada de cada fila del panel, para EXPLAIN
+        self._sql_items = {}
+        
+        info_frame = ttk.Frame(sql_frame)
+        info_frame.pack(fill=tk.X, pady=(0, 10))
+        self.sql_summary_var = tk.StringVar(value="Sin consultas registradas")
+        ttk.Label(info_frame, textvariable=self.sql_summary_var).pack(side=tk.LEFT)
+        ttk.Button(
+            info_frame,
+            text="Limpiar",
+            command=self.clear_sql_log,
+            style="warning.Outline.TButton"
+        ).pack(side=tk.RIGHT)
+        ttk.Button(
+            info_frame,
+            text="EXPLAIN ANALYZE",
+            command=lambda: self.explain_selected_query(analyze=True),
+            style="info.Outline.TButton"
+        ).pack(side=tk.RIGHT, padx=(0, 10))
+        ttk.Button(
+            info_frame,
+            text="EXPLAIN",
+            command=self.explain_selected_query,
+            style="info.TButton"
+        ).pack(side=tk.RIGHT, padx=(0, 5))
+        
+        table_frame = ttk.Frame(sql_frame)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.sql_tree = ttk.Treeview(
+            table_frame,
+            columns=("connection", "time", "sql", "bindings"),
+            show="tree headings"
+        )
+        self.sql_tree.heading("#0", text="Ejecución / #")
+        self.sql_tree.heading("connection", text="Conexión")
+        self.sql_tree.heading("time", text="Tiempo (ms)")
+        self.sql_tree.heading("sql", text="SQL")
+        self.sql_tree.heading("bindings", text="Bindings")
+        self.sql_tree.column("#0", width=140, minwidth=80)
+        self.sql_tree.column("connection", width=90, minwidth=60)
+        self.sql_tree.column("time", width=90, minwidth=60, anchor=tk.E)
+        self.sql_tree.column("sql", width=500, minwidth=100)
+        self.sql_tree.column("bindings", width=200, minwidth=80)
+        self.sql_tree.tag_configure("total", font=("TkDefaultFont", 9, "bold"))
+        self.sql_tree.tag_configure("n_plus_one", background="#fff4cc")
+        self.sql_tree.tag_configure("slow", background="#ffe0e0", foreground="#b00000")
+        
+        v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.sql_tree.yview)
+        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        h_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=self.sql_tree.xview)
+        h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.sql_tree.config(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.sql_tree.pack(fill=tk.BOTH, expand=True)
+        self.sql_tree.bind("<Double-1>", lambda e: self.explain_selected_query())
+
+    def _add_query_log(self, label, queries, dropped, suspects=()):
+        """
+        Añade al panel SQL las consultas de una ejecución y destaca las más lentas
+        y las que forman parte de un posible N+1
+        
+        Args:
+            label (str): Nombre de la ejecución
+            queries (list): Consultas con sql, bindings, time y connection
+            dropped (int): Consultas que no se registraron por superar el tope
+            suspects (list): Grupos de detect_n_plus_one()
+        """
+        total = sum(query['time'] or 0 for query in queries)
+        count = len(queries) + dropped
+        summary = f"{count} consultas"
+        if dropped:
+            summary += f" ({dropped} sin registrar)"
+        if suspects:
+            summary += f" · {len(suspects)} posibles N+1"
+        repeated = {idx for suspect in suspects for idx in suspect['indexes']}
+        parent = self.sql_tree.insert(
+            "", "end", text=label, values=("", f"{total:.2f}", summary, ""), open=True, tags=("total",)
+        )
+        
+        ranked = sorted(range(len(queries)), key=lambda i: queries[i]['time'] or 0, reverse=True)
+        slowest = set(ranked[:self.SLOWEST_QUERIES])
+        for idx, query in enumerate(queries):
+            tags = []
+            if idx in repeated:
+                tags.append("n_plus_one")
+            if idx in slowest:
+                tags.append("slow")
+            item = self.sql_tree.insert(
+                parent, "end",
+                text=str(idx + 1),
+                values=(
+                    query['connection'],
+                    f"{query['time'] or 0:.2f}",
+                    " ".join(query['sql'].split()),
+                    json.dumps(query['bindings'], ensure_ascii=False)
+                ),
+                tags=tags
+            )
+            self._sql_items[item] = query
+        
+        # Totales acumulados de todas las ejecuciones
+        totals = self.sql_totals
+        totals['count'] += count
+        totals['time'] += total
+        if ranked:
+            query = queries[ranked[0]]
+            if totals['slowest'] is None or (query['time'] or 0) > (totals['slowest']['time'] or 0):
+                totals['slowest'] = query
+        self._update_sql_summary()
+        
+        self.sql_tree.see(parent)
+
+    def _update_sql_summary(self):
+        totals = self.sql_totals
+        if not totals['count']:
+            self.sql_summary_var.set("Sin consultas registradas")
+            return
+        text = f"Consultas: {totals['count']} · Tiempo total: {totals['time']:.2f} ms"
+        slowest = totals['slowest']
+        if slowest is not None:
+            sql = " ".join(slowest['sql'].split())
+            if len(sql) > 60:
+                sql = sql[:57] + "..."
+            text += f" · Más lenta: {slowest['time'] or 0:.2f} ms ({sql})"
+        self.sql_summary_var.set(text)
+
+    def clear_sql_log(self):
+        self.sql_tree.delete(*self.sql_tree.get_children())
+        self._sql_items = {}
+        self.sql_totals = {'count': 0, 'time': 0.0, 'slowest': None}
+        self._update_sql_summary()
+
+    def explain_selected_query(self, analyze=False):
+        """
+        Repite la consulta seleccionada en el panel SQL como EXPLAIN (o EXPLAIN
+        ANALYZE) en un worker del proyecto y muestra el plan en una tabla
+        """
+        selection = self.sql_tree.selection()
+        query = self._sql_items.get(selection[0]) if selection else None
+        if query is None:
+            Messagebox.show_info("Selecciona una consulta del panel SQL.", "EXPLAIN")
+            return
+        if not self.project_path.get():
+            Messagebox.show_error("Por favor selecciona un proyecto Laravel primero.", "Error")
+            return
+        if analyze and not re.match(r'\s*(select|with)\b', query['sql'], re.I):
+            # EXPLAIN ANALYZE ejecuta la sentencia; aunque se deshace, mejor no tocar escrituras
+            Messagebox.show_warning("EXPLAIN ANALYZE sólo está disponible para consultas SELECT.", "EXPLAIN")
+            return
+        
+        mode = "EXPLAIN ANALYZE" if analyze else "EXPLAIN"
+        self.add_to_log(f"{mode}: {' '.join(query['sql'].split())}", "info")
+        pool = self._get_pool(self.project_path.get())
+        pool.submit(
+            build_explain_code(query, analyze),
+            lambda job_id, envelope, error: self.output_queue.put(((query, mode, envelope, error), "explain")),
+            PRIORITY_HIGH,
+            timeout=self._execution_limits()[0]
+        )
+
+    def _show_explain(self, query, mode, envelope, error):
+        """
+        Muestra el plan de una consulta en la vista de tabla, con los
+        recorridos completos y la falta de índices destacados
+        """
+        if error is not None:
+            self.add_to_log(f"Error al ejecutar {mode}: {str(error)}", "error")
+            return
+        exception = envelope['exception']
+        if exception:
+            self.add_to_log(f"Error al ejecutar {mode}: {exception['class']}: {exception['message']}", "error")
+            return
+        if envelope['error'] or not envelope['results']:
+            self.add_to_log(f"Error al ejecutar {mode}: {envelope['error'] or envelope['stderr'] or 'sin resultado'}", "error")
+            return
+        
+        result = envelope['results'][0]
+        plan = result['plan']
+        findings = explain_findings(result['driver'], plan)
+        for idx, reason in findings.items():
+            plan[idx]['aviso'] = reason
+        
+        sql = " ".join(query['sql'].split())
+        self.create_table_view(plan, title=f"{mode} ({result['driver']}) - {sql[:80]}", highlight=set(findings))
+        if findings:
+            reasons = sorted(set(findings.values()))
+            self.add_to_log(f"{mode}: {len(findings)} paso(s) del plan con avisos: {', '.join(reasons)}", "warning")
+        else:
+            self.add_to_log(f"{mode}: el plan no muestra recorridos completos.", "success")
+
+    # Columnas del historial: (clave del registro, encabezado, ancho)
+    HISTORY_COLUMNS = [
+        ('time', "Hora", 70),
+        ('label', "Ejecución", 100),
+        ('status', "Estado", 70),
+        ('spawn_ms', "Proceso (ms)", 90),
+        ('bootstrap_ms', "Bootstrap (ms)", 100),
+        ('code_ms', "Código (ms)", 90),
+        ('serialize_ms', "Serialización (ms)", 120),
+        ('transfer_ms', "Transferencia (ms)", 120),
+        ('parse_ms', "Parseo JSON (ms)", 110),
+        ('render_ms', "Render UI (ms)", 100),
+        ('total_ms', "Total (ms)", 80),
+        ('memory_peak', "Memoria pico", 100),
+        ('bytes_received', "Recibido", 90),
+        ('code', "Código", 300),
+    ]
+
+    def create_history_panel(self):
+        """
+        Pestaña con el desglose de tiempos de cada ejecución, ordenable por columna
+        """
+        history_frame = ttk.Frame(self.output_notebook, padding=10)
+        self.output_notebook.add(history_frame, text="Historial")
+        
+        self.run_history = []
+        self._history_sort = ('time', False)
+        
+        columns = [key for key, _heading, _width in self.HISTORY_COLUMNS]
+        self.history_tree = ttk.Treeview(history_frame, columns=columns, show="headings")
+        for key, heading, width in self.HISTORY_COLUMNS:
+            self.history_tree.heading(key, text=heading, command=lambda key=key: self._sort_history(key))
+            anchor = tk.W if key in ('time', 'label', 'status', 'code') else tk.E
+            self.history_tree.column(key, width=width, minwidth=50, anchor=anchor)
+        
+        v_scrollbar = ttk.Scrollbar(history_frame, orient=tk.VERTICAL, command=self.history_tree.yview)
+        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        h_scrollbar = ttk.Scrollbar(history_frame, orient=tk.HORIZONTAL, command=self.history_tree.xview)
+        h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.history_tree.config(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.history_tree.pack(fill=tk.BOTH, expand=True)
+
+    def _record_timing(self, timing):
+        """
+        Completa el desglose de una ejecución con el tiempo de render de la
+        interfaz, lo escribe en el log y lo añade al historial
+        
+        Args:
+            timing (dict): Tiempos del sobre más los datos de la ejecución
+        """
+        run = timing.pop('run')
+        started = timing.pop('render_started', None)
+        render_seconds = run.render_seconds
+        if started is not None:
+            render_seconds += time.perf_counter() - started
+        timing['render_ms'] = render_seconds * 1000
+        timing['code'] = " ".join(timing['code'].split())[:200]
+        
+        self.add_to_log(f"Tiempos ({timing['label']}): {format_timing(timing)}", "status")
+        
+        self.run_history.append(timing)
+        self._refresh_history()
+
+    def _sort_history(self, key):
+        """
+        Ordena el historial por una columna; un segundo clic invierte el orden
+        """
+        current_key, descending = self._history_sort
+        self._history_sort = (key, not descending if key == current_key else False)
+        self._refresh_history()
+
+    def _refresh_history(self):
+        key, descending = self._history_sort
+        
+        def sort_key(record):
+            value = record.get(key)
+            if value is None:
+                return (1, 0) if descending else (-1, 0)
+            return (0, value)
+        
+        records = sorted(self.run_history, key=sort_key, reverse=descending)
+        self.history_tree.delete(*self.history_tree.get_children())
+        for record in records:
+            values = []
+            for column, _heading, _width in self.HISTORY_COLUMNS:
+                value = record.get(column)
+                if value is None:
+                    values.append("")
+                elif column == 'memory_peak':
+                    values.append(format_bytes(value))
+                elif column == 'bytes_received':
+                    values.append(format_bytes(value))
+                elif column.endswith('_ms'):
+                    values.append(f"{value:.1f}")
+                else:
+                    values.append(str(value))
+            self.history_tree.insert("", "end", values=values)
 
     def paste_from_clipboard(self):
         """
@@ -227,11 +1192,7 @@ class LaravelTinkerApp:
 
             if clipboard_content:
                 # Limpiar el editor actual y pegar el contenido
-                self.code_editor.delete(1.0, tk.END)
-                self.code_editor.insert(tk.END, clipboard_content)
-
-                # Aplicar resaltado de sintaxis
-                self._highlight_syntax()
+                self._set_editor_text(clipboard_content)
 
                 # Registrar en log
                 self.add_to_log("Texto pegado desde el portapapeles", "info")
@@ -255,6 +1216,162 @@ class LaravelTinkerApp:
             
             # Registrar en log
             self.add_to_log(f"Proyecto cargado: {project_directory}", "info")
+            
+            # Arrancar Laravel en segundo plano para que la primera ejecución sea rápida
+            if self.use_worker.get() and os.path.exists(os.path.join(project_directory, 'artisan')):
+                self._get_pool(project_directory)
+    
+    def _get_pool(self, project_path):
+        """
+        Devuelve el pool de workers del proyecto, creándolo si no existe
+        """
+        with self._pools_lock:
+            pool = self.pools.get(project_path)
+            if pool is None:
+                pool = WorkerPool(
+                    project_path,
+                    size=self.pool_size.get(),
+                    scheduling=self.scheduling.get(),
+                    on_event=lambda message, msg_type: self.output_queue.put((message, msg_type)),
+                    php_binary=self.php_binary
+                )
+                self.pools[project_path] = pool
+                self.add_to_log(f"Arrancando {pool.size()} worker(s) PHP para {project_path}...", "info")
+            return pool
+    
+    def _apply_scheduling(self):
+        with self._pools_lock:
+            for pool in self.pools.values():
+                pool.scheduling = self.scheduling.get()
+        self.add_to_log(f"Planificación de trabajos: {self.scheduling.get()}", "info")
+    
+    def configure_pool_size(self):
+        size = simpledialog.askinteger(
+            "Pool de workers",
+            "Número de workers PHP por proyecto:",
+            initialvalue=self.pool_size.get(),
+            minvalue=1,
+            maxvalue=16,
+            parent=self.root
+        )
+        if not size:
+            return
+        
+        self.pool_size.set(size)
+        with self._pools_lock:
+            for pool in self.pools.values():
+                pool.resize(size)
+        self.add_to_log(f"Tamaño del pool de workers: {size}", "info")
+    
+    def configure_output_cap(self):
+        cap = simpledialog.askinteger(
+            "Límite de salida",
+            "MB de salida por ejecución que se muestran en el log\n"
+            "(lo que exceda se guarda en un archivo temporal):",
+            initialvalue=self.output_cap_mb.get(),
+            minvalue=1,
+            maxvalue=1024,
+            parent=self.root
+        )
+        if not cap:
+            return
+        
+        self.output_cap_mb.set(cap)
+        self.add_to_log(f"Límite de salida en memoria: {cap} MB", "info")
+    
+    def configure_log_history(self):
+        size = simpledialog.askinteger(
+            "Historial de logs",
+            "Entradas del log que se conservan en memoria\n"
+            "(las anteriores se guardan en disco y se incluyen al exportar):",
+            initialvalue=self.log_history_size.get(),
+            minvalue=10,
+            maxvalue=1000000,
+            parent=self.root
+        )
+        if not size:
+            return
+        
+        self.log_history_size.set(size)
+        self._trim_log_history()
+        self.add_to_log(f"Tamaño del historial de logs: {size} entradas", "info")
+    
+    def configure_execution_limits(self):
+        timeout = simpledialog.askinteger(
+            "Límites de ejecución",
+            "Tiempo máximo por ejecución en segundos (0 = sin límite):",
+            initialvalue=self.timeout_seconds.get(),
+            minvalue=0,
+            parent=self.root
+        )
+        if timeout is None:
+            return
+        
+        memory_limit = simpledialog.askstring(
+            "Límites de ejecución",
+            "memory_limit de PHP por ejecución (p. ej. 512M, 2G; -1 = sin límite):",
+            initialvalue=self.memory_limit.get(),
+            parent=self.root
+        )
+        if memory_limit is None:
+            return
+        
+        memory_limit = memory_limit.strip()
+        if not re.match(r'^(-1|\d+[KMG]?)$', memory_limit, re.IGNORECASE):
+            Messagebox.show_warning("Valor de memoria no válido.", "Advertencia")
+            return
+        
+        self.timeout_seconds.set(timeout)
+        self.memory_limit.set(memory_limit)
+        self.add_to_log(
+            f"Límites de ejecución: {timeout or 'sin límite de'} s, memory_limit {memory_limit}", "info"
+        )
+    
+    def _execution_limits(self):
+        """
+        Devuelve (timeout, memory_limit) configurados; se leen en el hilo de la interfaz
+        """
+        timeout = self.timeout_seconds.get() or None
+        return timeout, self.memory_limit.get().strip() or None
+    
+    def cancel_execution(self):
+        """
+        Cancela los trabajos en cola y mata los procesos PHP en ejecución
+        """
+        with self._pools_lock:
+            pools = list(self.pools.values())
+        cancelled = sum(pool.cancel() for pool in pools)
+        
+        with self._active_processes_lock:
+            active = list(self._active_processes.values())
+        for kill, run in active:
+            run.interrupted = 'cancelled'
+            kill()
+        cancelled += len(active)
+        
+        if cancelled:
+            self.add_to_log(f"Cancelando {cancelled} ejecución(es)...", "info")
+        else:
+            self.add_to_log("No hay ejecuciones en curso.", "info")
+    
+    def _new_streamed_run(self, label):
+        return StreamedRun(self.output_queue, label, self.output_cap_mb.get() * 1024 * 1024)
+    
+    def restart_worker(self):
+        if not self.project_path.get():
+            Messagebox.show_error("Por favor selecciona un proyecto Laravel primero.", "Error")
+            return
+        
+        self.add_to_log("Reiniciando workers PHP...", "info")
+        pool = self._get_pool(self.project_path.get())
+        threading.Thread(target=self._restart_pool, args=(pool,), daemon=True).start()
+    
+    def _restart_pool(self, pool):
+        try:
+            pool.restart_all()
+            self.output_queue.put(("Workers PHP reiniciados", "success"))
+        except Exception as e:
+            self.output_queue.put((f"No se pudieron reiniciar los workers PHP: {str(e)}", "error"))
     
     def load_project_tree(self, directory):
         # Limpiar el árbol actual
@@ -316,11 +1433,7 @@ class LaravelTinkerApp:
                 content = file.read()
                 
                 # Limpiar editor y mostrar contenido
-                self.code_editor.delete(1.0, tk.END)
-                self.code_editor.insert(tk.END, content)
-                
-                # Aplicar destacado sintáctico simple
-                self._highlight_syntax()
+                self._set_editor_text(content)
                 
                 self.status_var.set(f"Archivo cargado: {file_path}")
                 
@@ -330,26 +1443,22 @@ class LaravelTinkerApp:
             self.add_to_log(f"Error al cargar el archivo: {str(e)}", "error")
     
     def _highlight_syntax(self):
-        # Implementación básica de resaltado de sintaxis PHP
-        content = self.code_editor.get(1.0, tk.END)
-        
-        # Palabras clave de PHP
-        keywords = ['function', 'class', 'return', 'if', 'else', 'foreach', 'while', 
-                    'public', 'private', 'protected', 'use', 'namespace']
-        
-        # Esta es una implementación simple; para un resaltado completo, 
-        # considera usar una biblioteca de resaltado de código
-        
-        for keyword in keywords:
-            start_pos = '1.0'
-            while True:
-                start_pos = self.code_editor.search(r'\b' + keyword + r'\b', start_pos, tk.END, regexp=True)
-                if not start_pos:
-                    break
-                    
-                end_pos = f"{start_pos}+{len(keyword)}c"
-                self.code_editor.tag_add('keyword', start_pos, end_pos)
-                start_pos = end_pos
+        """
+        Vuelve a resaltar todo el editor. Las ediciones normales se resaltan
+        solas y por líneas (ver EditorHighlighter); esto es para cuando se
+        reemplaza el contenido entero.
+        """
+        self.editor_highlighter.reset()
+    
+    def _set_editor_text(self, text):
+        """
+        Reemplaza todo el contenido del editor y lo vuelve a resaltar entero:
+        el evento <<Modified>> de un borrado más inserción llega una sola vez
+        y no indica qué líneas cambiaron
+        """
+        self.code_editor.delete(1.0, tk.END)
+        self.code_editor.insert(tk.END, text)
+        self._highlight_syntax()
     
     def execute_code(self):
         if not self.project_path.get():
@@ -368,154 +1477,449 @@ class LaravelTinkerApp:
             transformed_code = self.transform_code(code)
             code = transformed_code
         
+        # En modo streaming la consulta se recorre por partes en PHP
+        if self.stream_rows.get():
+            code = to_stream_code(code)
+        
         # Si el código fue transformado, actualizar el editor
         if code != original_code:
-            self.code_editor.delete(1.0, tk.END)
-            self.code_editor.insert(tk.END, code)
+            self._set_editor_text(code)
             
-        # Iniciar ejecución en un hilo separado
         self.status_var.set("Ejecutando código...")
         self.add_to_log("Ejecutando código...", "info")
         self.add_to_log(f"---- CÓDIGO ----\n{code}\n--------------", "code")
         
-        threading.Thread(target=self._run_tinker, args=(code,), daemon=True).start()
+        if self.use_worker.get():
+            # Encolar en el pool de workers ya arrancados
+            pool = self._get_pool(self.project_path.get())
+            job_id = pool.new_job_id()
+            run = self._new_streamed_run(f"Salida (trabajo #{job_id})")
+            run.code = code
+            timeout, memory_limit = self._execution_limits()
+            pool.submit(
+                build_use_statements(code) + code,
+                lambda job_id, envelope, error: self._on_job_done(run, job_id, envelope, error),
+                snippet_priority(code),
+                on_output=run.feed,
+                on_error=run.feed_error,
+                job_id=job_id,
+                timeout=timeout,
+                memory_limit=memory_limit,
+                on_rows=run.feed_rows
+            )
+            self.add_to_log(f"Trabajo #{job_id} en cola ({pool.pending()} pendientes)", "status")
+        else:
+            # Iniciar ejecución en un hilo separado
+            run = self._new_streamed_run("Salida")
+            run.code = code
+            threading.Thread(
+                target=self._run_tinker,
+                args=(code, run, self.project_path.get()) + self._execution_limits(),
+                daemon=True
+            ).start()
+
+    def run_benchmark(self):
+        """
+        Ejecuta el fragmento del editor varias veces en un mismo worker ya
+        arrancado, tras unas iteraciones de calentamiento, y resume los tiempos
+        """
+        if not self.project_path.get():
+            self.add_to_log("Error: Por favor selecciona un proyecto Laravel primero.", "error")
+            return
+            
+        code = self.code_editor.get(1.0, tk.END).strip()
+        if not code:
+            self.add_to_log("Error: No hay código para ejecutar.", "error")
+            return
+        
+        iterations = simpledialog.askinteger(
+            "Benchmark",
+            "Número de iteraciones medidas:",
+            initialvalue=self.bench_iterations.get(),
+            minvalue=1,
+            maxvalue=100000,
+            parent=self.root
+        )
+        if iterations is None:
+            return
+        warmup = simpledialog.askinteger(
+            "Benchmark",
+            "Iteraciones de calentamiento (no se miden):",
+            initialvalue=self.bench_warmup.get(),
+            minvalue=0,
+            maxvalue=100000,
+            parent=self.root
+        )
+        if warmup is None:
+            return
+        self.bench_iterations.set(iterations)
+        self.bench_warmup.set(warmup)
+        
+        # Mismo código que ejecutaría "Ejecutar" (sin streaming: la salida se descarta)
+        if self.auto_transform.get():
+            code = self.transform_code(code)
+        
+        self.status_var.set("Ejecutando benchmark...")
+        self.add_to_log(f"Benchmark: {iterations} iteraciones tras {warmup} de calentamiento", "info")
+        self.add_to_log(f"---- CÓDIGO ----\n{code}\n--------------", "code")
+        
+        pool = self._get_pool(self.project_path.get())
+        job_id = pool.new_job_id()
+        run = self._new_streamed_run(f"Salida (benchmark #{job_id})")
+        timeout, memory_limit = self._execution_limits()
+        pool.submit(
+            build_benchmark_code(code, iterations, warmup),
+            lambda job_id, envelope, error: self.output_queue.put(
+                ((run, job_id, iterations, warmup, envelope, error), "benchmark")
+            ),
+            on_output=run.feed,
+            on_error=run.feed_error,
+            job_id=job_id,
+            timeout=timeout,
+            memory_limit=memory_limit
+        )
+
+    def _show_benchmark(self, run, job_id, iterations, warmup, envelope, error):
+        """
+        Resume en el log las iteraciones de un benchmark y ofrece verlas en tabla
+        """
+        run.close()
+        if isinstance(error, ExecutionInterrupted):
+            self.add_to_log(f"Benchmark #{job_id}: {str(error)}", "error")
+            self.status_var.set(f"Benchmark #{job_id} detenido.")
+            return
+        if error is not None:
+            self.add_to_log(f"Error al ejecutar el benchmark #{job_id}: {str(error)}", "error")
+            return
+        if envelope['stdout']:
+            run.feed(envelope['stdout'])
+        if envelope['stderr']:
+            run.feed_error(envelope['stderr'])
+        exception = envelope['exception']
+        if exception:
+            self.add_to_log(
+                f"Error: {exception['class']}: {exception['message']}\n"
+                f"En archivo: {exception['file']} línea: {exception['line']}",
+                "error"
+            )
+        if envelope['error']:
+            self.add_to_log(f"Error fatal: {envelope['error']}", "error")
+        samples = envelope['results'][0]['benchmark'] if envelope['results'] else []
+        if not samples:
+            self.status_var.set(f"Benchmark #{job_id} sin resultados.")
+            return
+        
+        stats = benchmark_stats(samples)
+        self.add_to_log(
+            f"Benchmark #{job_id} ({iterations} iteraciones, {warmup} de calentamiento):\n"
+            f"Tiempo: min {stats['min']:.3f} ms · p50 {stats['p50']:.3f} ms · p95 {stats['p95']:.3f} ms · "
+            f"p99 {stats['p99']:.3f} ms · max {stats['max']:.3f} ms\n"
+            f"Memoria por iteración: media {format_bytes(stats['memory_avg'])} · "
+            f"máxima {format_bytes(stats['memory_max'])}\n"
+            f"Consultas por iteración: media {stats['queries_avg']:.1f} "
+            f"(min {stats['queries_min']}, max {stats['queries_max']})",
+            "success"
+        )
+        self._show_table_button(samples)
+        self.status_var.set(f"Benchmark #{job_id} completado: p50 {stats['p50']:.3f} ms")
+
+    def _on_job_done(self, run, job_id, envelope, error):
+        """
+        Recibe el resultado de un trabajo del pool (se llama desde el hilo del worker)
+        """
+        if isinstance(error, ExecutionInterrupted):
+            # Mostrar la salida parcial y cerrar la ejecución
+            run.interrupted = error.reason
+            envelope = make_envelope('interrupted', error.stdout, error.stderr)
+        elif error is not None:
+            run.close()
+            # Liberar la vista de tabla en streaming si llegó a abrirse
+            self.output_queue.put((run, "rows_end"))
+            self.output_queue.put((f"Error al ejecutar el trabajo #{job_id}: {str(error)}", "error"))
+            self.output_queue.put((f"Error en el trabajo #{job_id}.", "status"))
+            return
+        
+        self._publish_tinker_output(run, envelope, job_id)
 
-    def _run_tinker(self, code):
+    def _run_tinker(self, code, run, project_path, timeout=None, memory_limit=None):
         try:
-            # Extraer posibles nombres de modelos del código
-            import re
-            model_names = set(re.findall(r'([A-Z][A-Za-z0-9_]*)::', code))
-
-            # Lista de clases que no son modelos y no necesitan importación de App\Models
-            non_model_classes = {'DB', 'Schema', 'Route', 'Auth', 'Storage', 'Config', 'Log', 'Cache', 'View',
-                                 'Response', 'Request'}
-
-            # Filtrar nombres de modelos, excluyendo los que no son modelos
-            model_names = {model for model in model_names if model not in non_model_classes}
-
-            # Crear un archivo temporal con el código
-            temp_file = os.path.join(self.project_path.get(), 'temp_tinker.php')
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                # Envolver el código en PHP
-                f.write("<?php\n")
-                f.write("// Configurar manejo de errores para mostrar todos los mensajes\n")
-                f.write("ini_set('display_errors', 1);\n")
-                f.write("ini_set('display_startup_errors', 1);\n")
-                f.write("error_reporting(E_ALL);\n\n")
-
-                # Importar clases comunes de Laravel
-                f.write("use Illuminate\\Support\\Facades\\DB;\n")
-                f.write("use Illuminate\\Support\\Facades\\Schema;\n")
-                f.write("use Illuminate\\Support\\Facades\\Auth;\n")
-                f.write("use Illuminate\\Support\\Facades\\Route;\n")
-                f.write("use Illuminate\\Support\\Facades\\Storage;\n")
-                f.write("use Illuminate\\Support\\Facades\\Cache;\n")
-                f.write("use Illuminate\\Support\\Facades\\Config;\n")
-                f.write("use Illuminate\\Support\\Facades\\Log;\n")
-
-                # Añadir imports automáticos para modelos detectados
-                for model in model_names:
-                    f.write(f"use App\\Models\\{model};\n")
-                f.write("\n")
-
-                # Cargar Laravel
-                f.write("try {\n")
-                f.write("    require __DIR__.'/vendor/autoload.php';\n")
-                f.write("    $app = require_once __DIR__.'/bootstrap/app.php';\n")
-                f.write("    $kernel = $app->make(Illuminate\\Contracts\\Console\\Kernel::class);\n")
-                f.write("    $kernel->bootstrap();\n")
-                f.write("} catch (\\Exception $e) {\n")
-                f.write("    echo \"Error al inicializar Laravel: \" . $e->getMessage() . \"\\n\";\n")
-                f.write("    echo \"En archivo: \" . $e->getFile() . \" línea: \" . $e->getLine() . \"\\n\";\n")
-                f.write("    exit(1);\n")
-                f.write("}\n\n")
-
-                # Funciones de ayuda para consultas de modelos
-                f.write("function formatOutput($data) {\n")
-                f.write("    if (is_object($data) && method_exists($data, 'toArray')) {\n")
-                f.write("        return json_encode($data->toArray(), JSON_PRETTY_PRINT);\n")
-                f.write("    } elseif (is_object($data) && method_exists($data, 'toJson')) {\n")
-                f.write("        return $data->toJson(JSON_PRETTY_PRINT);\n")
-                f.write("    } elseif (is_array($data)) {\n")
-                f.write("        return json_encode($data, JSON_PRETTY_PRINT);\n")
-                f.write("    } else {\n")
-                f.write("        return var_export($data, true);\n")
-                f.write("    }\n")
-                f.write("}\n\n")
-
-                # Código del usuario dentro de un bloque try-catch
-                f.write("// Código del usuario:\n")
-                f.write("try {\n")
-                f.write(code)
-                f.write("\n} catch (\\Exception $e) {\n")
-                f.write("    echo \"Error: \" . $e->getMessage() . \"\\n\";\n")
-                f.write("    echo \"En archivo: \" . $e->getFile() . \" línea: \" . $e->getLine() . \"\\n\";\n")
-                f.write("}\n")
-
-            # Ejecutar el código con PHP
-            process = subprocess.Popen(
-                ['php', temp_file],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=self.project_path.get(),
-                text=True
+            try:
+                envelope = self._run_tinker_once(code, run, project_path, timeout, memory_limit)
+            except ExecutionInterrupted as e:
+                run.interrupted = e.reason
+                envelope = make_envelope('interrupted', e.stdout, e.stderr)
+            self._publish_tinker_output(run, envelope)
+
+        except Exception as e:
+            run.close()
+            self.output_queue.put((run, "rows_end"))
+            self.output_queue.put((f"Error al ejecutar: {str(e)}", "error"))
+            self.output_queue.put(("Error en la ejecución.", "status"))
+
+    def _run_tinker_once(self, code, run, project_path, timeout=None, memory_limit=None):
+        """
+        Ejecuta el código en un proceso PHP nuevo que arranca Laravel desde cero.
+        
+        Se usa el mismo script fijo que el worker (guardado en el directorio
+        temporal del sistema) y el código viaja por STDIN, así que no se escribe
+        nada en el proyecto y las ejecuciones pueden solaparse.
+        
+        Args:
+            code (str): Código del usuario
+            run (StreamedRun): Recibe stdout y stderr a medida que llegan
+            project_path (str): Directorio del proyecto Laravel
+            timeout (float): Segundos de reloj antes de matar el proceso
+            memory_limit (str): memory_limit de PHP
+        
+        Returns:
+            dict: Sobre con el resultado (ver TinkerWorker.execute)
+        """
+        worker = TinkerWorker(project_path, self.php_binary, once=True)
+        with self._active_processes_lock:
+            self._active_processes[id(run)] = (lambda: worker.kill('cancelled'), run)
+        try:
+            try:
+                worker.start()
+            except RuntimeError:
+                # Cancelado mientras Laravel arrancaba
+                if run.interrupted:
+                    raise ExecutionInterrupted(run.interrupted)
+                raise
+            if run.interrupted:
+                raise ExecutionInterrupted(run.interrupted)
+            return worker.execute(
+                build_use_statements(code) + code,
+                on_output=run.feed,
+                on_error=run.feed_error,
+                timeout=timeout,
+                memory_limit=memory_limit,
+                on_rows=run.feed_rows
             )
+        finally:
+            with self._active_processes_lock:
+                self._active_processes.pop(id(run), None)
+            worker.shutdown()
+
+    def _stream_process(self, process, run, timeout=None):
+        """
+        Lee stdout y stderr del proceso línea a línea hasta que termina. Si se
+        supera el tiempo máximo o se cancela, mata el árbol de procesos y se
+        queda con la salida parcial.
+        """
+        def on_timeout():
+            run.interrupted = 'timeout'
+            kill_process_tree(process)
+        
+        with self._active_processes_lock:
+            self._active_processes[id(run)] = (lambda: kill_process_tree(process), run)
+        timer = None
+        if timeout:
+            timer = threading.Timer(timeout, on_timeout)
+            timer.daemon = True
+            timer.start()
+        try:
+            stderr_thread = threading.Thread(target=pump_pipe, args=(process.stderr, run.feed_error), daemon=True)
+            stderr_thread.start()
+            pump_pipe(process.stdout, run.feed)
+            stderr_thread.join()
+            process.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            with self._active_processes_lock:
+                self._active_processes.pop(id(run), None)
+
+    def _publish_tinker_output(self, run, envelope, job_id=None):
+        """
+        Cierra una ejecución a partir de su sobre: muestra los datos devueltos
+        por formatOutput(), la excepción o el error fatal, avisa si la salida se
+        desvió a disco y actualiza el estado
+        
+        Args:
+            run (StreamedRun): Salida impresa recibida durante la ejecución
+            envelope (dict): Sobre con el resultado del trabajo
+            job_id (int): Identificador del trabajo del pool, si lo hay
+        """
+        # Salida que el worker no pudo entregar por partes (p. ej. al morir el proceso)
+        if envelope['stdout']:
+            run.feed(envelope['stdout'])
+        if envelope['stderr']:
+            run.feed_error(envelope['stderr'])
+        run.close()
+        # Siempre: run.table sólo existe cuando la interfaz procesa el primer lote
+        # de filas, y un trabajo cortado llega con streamed a 0 aunque haya
+        # enviado filas. _finish_streamed_rows no hace nada si no hubo tabla.
+        self.output_queue.put((run, "rows_end"))
+
+        name = f"trabajo #{job_id}" if job_id is not None else None
+
+        # Desglose de tiempos; la interfaz mide el render entre "render_start" y "timing"
+        timing = dict(envelope['timing'])
+        timing.update({
+            'label': name.capitalize() if name else "Ejecución",
+            'status': envelope['status'],
+            'code': run.code,
+            'time': datetime.datetime.now().strftime("%H:%M:%S"),
+            'run': run,
+        })
+        self.output_queue.put((timing, "render_start"))
+        label = f"Resultado ({name})" if name else "Resultado"
+
+        # Los datos ya vienen decodificados en el sobre: el log los formatea por páginas.
+        # Las listas de registros se pasan una vez a columnas (log, tabla y exportación las comparten)
+        for json_data in envelope['results']:
+            if ColumnStore.is_tabular(json_data):
+                json_data = ColumnStore.from_rows(json_data)
+            self.output_queue.put(((label, json_data), "result"))
+
+            # Almacenar los datos JSON para uso posterior
+            self.last_json_data = json_data
+
+            # Añadir señal para mostrar el botón de vista de tabla
+            self.output_queue.put((json_data, "show_table_button"))
+
+        exception = envelope['exception']
+        if exception:
+            self.output_queue.put((
+                f"Error: {exception['class']}: {exception['message']}\n"
+                f"En archivo: {exception['file']} línea: {exception['line']}",
+                "error"
+            ))
+        if envelope['error']:
+            self.output_queue.put((f"Error fatal: {envelope['error']}", "error"))
 
-            stdout, stderr = process.communicate()
+        if envelope['queries'] or envelope['queries_dropped']:
+            # Las líneas que informa PHP cuentan los use añadidos antes del código
+            suspects = detect_n_plus_one(envelope['queries'], build_use_statements(run.code).count("\n"))
+            self.output_queue.put((
+                (timing['label'], envelope['queries'], envelope['queries_dropped'], suspects), "queries"
+            ))
+            for suspect in suspects:
+                where = f"línea {suspect['line']}" if suspect['line'] is not None else "línea desconocida"
+                message = (f"Posible N+1 ({where}): la misma consulta se ejecutó {suspect['count']} veces "
+                           f"({suspect['time']:.1f} ms)\n{suspect['shape']}")
+                if suspect['suggestion']:
+                    message += f"\nSugerencia: cargar la relación por adelantado con {suspect['suggestion']}"
+                self.output_queue.put((message, "warning"))
 
-            # Eliminar el archivo temporal
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+        self._report_spilled_output(run)
+
+        name = name.capitalize() if name else "Ejecución"
+        if run.interrupted:
+            self.output_queue.put((ExecutionInterrupted.MESSAGES[run.interrupted] + 
+                                   " Se muestra la salida parcial.", "error"))
+            state = "cancelado" if run.interrupted == 'cancelled' else "detenido por tiempo máximo"
+            self.output_queue.put((f"{name} {state}.", "status"))
+            return
+
+        if (not run.stdout.total_bytes and not run.stderr.total_bytes and not envelope['results']
+                and not envelope['streamed'] and not exception):
+            self.output_queue.put(("El código se ejecutó correctamente sin salida.", "success"))
+
+        # Actualizar estado
+        details = []
+        if envelope['streamed']:
+            details.append(f"{envelope['streamed']} filas en streaming")
+        if envelope['queries']:
+            sql_ms = sum(query['time'] or 0 for query in envelope['queries'])
+            details.append(f"{len(envelope['queries']) + envelope['queries_dropped']} consultas SQL en {sql_ms:.1f} ms")
+        if envelope['code_ms'] is not None:
+            details.append(f"código {envelope['code_ms']:.0f} ms")
+        if envelope['memory_peak']:
+            details.append(f"memoria pico {envelope['memory_peak'] / (1024 * 1024):.1f} MB")
+        suffix = f" ({', '.join(details)})" if details else ""
+        if job_id is not None:
+            self.output_queue.put((f"Trabajo #{job_id} completado{suffix}.", "status"))
+        else:
+            self.output_queue.put((f"Ejecución completada{suffix}.", "status"))
+        if envelope['timing']:
+            self.output_queue.put((timing, "timing"))
+
+    def _report_spilled_output(self, run):
+        """
+        Avisa de la salida que superó el límite en memoria y quedó en disco
+        """
+        for spool, name in ((run.stdout, "La salida"), (run.stderr, "La salida de errores")):
+            if spool.spill_path:
+                spilled_mb = spool.spilled_bytes() / (1024 * 1024)
+                self.output_queue.put((
+                    f"{name} superó el límite de {spool.cap_bytes // (1024 * 1024)} MB; "
+                    f"{spilled_mb:.1f} MB adicionales guardados en {spool.spill_path}",
+                    "info"
+                ))
+            
+    def _on_output_ready(self, event=None):
+        """
+        Atiende el aviso de datos nuevos de la cola: cancela la espera
+        programada y vacía la cola en este momento
+        """
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self.check_output_queue()
+
+    def check_output_queue(self):
+        """
+        Procesa los mensajes de la cola de salida durante como mucho
+        UI_FRAME_BUDGET segundos y programa la siguiente pasada.
+
+        La salida impresa consecutiva se inserta de una vez y el log se desplaza
+        una sola vez por pasada. Si quedan mensajes se vuelve enseguida; sin
+        mensajes el intervalo crece hasta UI_POLL_MAX_MS. Los datos nuevos no
+        esperan a ese intervalo: OutputQueue publica OUTPUT_READY_EVENT y
+        _on_output_ready adelanta la pasada.
+        """
+        self._poll_id = None
+        processed = 0
+        try:
+            if self.output_queue.ready.is_set():
+                self.output_queue.ready.clear()
+                processed = self._drain_output_queue(time.perf_counter() + UI_FRAME_BUDGET)
+        finally:
+            self._update_queue_status()
+
+            # Programar la siguiente verificación
+            if not self.output_queue.empty():
+                # Presupuesto agotado: ceder a Tk para que redibuje y seguir
+                self.output_queue.ready.set()
+                self._poll_interval = 1
+            elif processed:
+                self._poll_interval = UI_POLL_MIN_MS
+            else:
+                self._poll_interval = min(max(self._poll_interval, UI_POLL_MIN_MS) * 2, UI_POLL_MAX_MS)
+            self._poll_id = self.root.after(self._poll_interval, self.check_output_queue)
 
-            # Variable para almacenar datos JSON si se detectan
-            json_data = None
+    def _drain_output_queue(self, deadline):
+        """
+        Reparte los mensajes de la cola hasta vaciarla o llegar a deadline
 
-            # Enviar resultados a la cola
-            if stdout:
+        Returns:
+            int: Mensajes procesados
+        """
+        processed = 0
+        # Trozos de salida impresa del mismo tipo pendientes de insertar juntos
+        pending_type = None
+        pending = []
+        self._log_batch = True
+        try:
+            while time.perf_counter() < deadline:
                 try:
-                    # Verificar específicamente si es la salida del listado de modelos
-                    if "Buscando modelos Eloquent en el proyecto" in stdout:
-                        # Para la salida del listado de modelos, mantener el formato original
-                        self.output_queue.put(("Salida:\n" + stdout, "normal"))
-                    # Intentar formatear si es JSON
-                    elif stdout.strip().startswith('{') or stdout.strip().startswith('['):
-                        try:
-                            json_data = json.loads(stdout)
-                            formatted_json = json.dumps(json_data, indent=4)
-                            self.output_queue.put(("Salida:\n" + formatted_json, "json"))
-
-                            # Almacenar los datos JSON para uso posterior
-                            self.last_json_data = json_data
-
-                            # Añadir señal para mostrar el botón de vista de tabla
-                            self.output_queue.put(("show_table_button", json_data))
-                        except json.JSONDecodeError:
-                            # Si falla el parseo JSON, mostrar como texto normal
-                            self.output_queue.put(("Salida:\n" + stdout, "normal"))
-                    else:
-                        self.output_queue.put(("Salida:\n" + stdout, "normal"))
-                except Exception as e:
-                    # Si hay cualquier error en el procesamiento, mostrar la salida original
-                    self.output_queue.put(("Salida (Error de formato):\n" + stdout + f"\n\nError: {str(e)}", "normal"))
-
-            if stderr:
-                self.output_queue.put(("Error:\n" + stderr, "error"))
-
-            if not stdout and not stderr:
-                self.output_queue.put(("El código se ejecutó correctamente sin salida.", "success"))
+                    message, msg_type = self.output_queue.get_nowait()
+                except queue.Empty:
+                    break
+                processed += 1
 
-            # Actualizar estado
-            self.output_queue.put(("status", "Ejecución completada."))
+                if msg_type in ("stream", "stream_error"):
+                    if msg_type != pending_type and pending:
+                        self.add_to_log("".join(pending), pending_type)
+                        pending = []
+                    pending_type = msg_type
+                    pending.append(message)
+                    continue
+                if pending:
+                    self.add_to_log("".join(pending), pending_type)
+                    pending = []
 
-        except Exception as e:
-            self.output_queue.put((f"Error al ejecutar: {str(e)}", "error"))
-            self.output_queue.put(("status", "Error en la ejecución."))
-            
-    def check_output_queue(self):
-        try:
-            while True:
-                message, msg_type = self.output_queue.get_nowait()
-                
                 if msg_type == "status":
                     self.status_var.set(message)
                     # Añadir el cambio de estado al log también
@@ -523,13 +1927,49 @@ class LaravelTinkerApp:
                 elif msg_type == "show_table_button":
                     # Aquí es donde mostramos el botón para ver la tabla
                     self._show_table_button(message)
+                elif msg_type == "rows":
+                    self._append_streamed_rows(*message)
+                elif msg_type == "rows_end":
+                    self._finish_streamed_rows(message)
+                elif msg_type == "table_order":
+                    self._apply_table_order(*message)
+                elif msg_type == "table_page":
+                    self._apply_table_page(*message)
+                elif msg_type == "export_progress":
+                    self._show_export_progress(*message)
+                elif msg_type == "export_done":
+                    self._finish_export(*message)
+                elif msg_type == "render_start":
+                    message['render_started'] = time.perf_counter()
+                elif msg_type == "timing":
+                    self._record_timing(message)
+                elif msg_type == "queries":
+                    self._add_query_log(*message)
+                elif msg_type == "explain":
+                    self._show_explain(*message)
+                elif msg_type == "benchmark":
+                    self._show_benchmark(*message)
                 else:
                     self.add_to_log(message, msg_type)
-        except queue.Empty:
-            pass
+            if pending:
+                self.add_to_log("".join(pending), pending_type)
         finally:
-            # Programar la siguiente verificación
-            self.root.after(100, self.check_output_queue)
+            self._log_batch = False
+            if self._log_dirty:
+                self._log_dirty = False
+                self.output_text.config(state=tk.DISABLED)
+                self.output_text.see(tk.END)
+        return processed
+
+    def _update_queue_status(self):
+        """
+        Muestra en la barra de estado la profundidad de la cola del pool
+        """
+        with self._pools_lock:
+            pools = list(self.pools.values())
+        pending = sum(pool.pending() for pool in pools)
+        running = sum(pool.running() for pool in pools)
+        self.queue_var.set(f"Cola: {pending} | En ejecución: {running}")
             
     def _show_table_button(self, json_data):
         """
@@ -583,176 +2023,519 @@ class LaravelTinkerApp:
             
         self.create_table_view(self.last_json_data)
     
-    def create_table_view(self, data):
+    def create_table_view(self, data, title="Resultados en Tabla", highlight=None):
         """
         Crea una ventana con una tabla para mostrar los datos JSON
         
         Args:
-            data (list/dict): Datos en formato JSON a mostrar
+            data (ColumnStore/list/dict): Datos a mostrar
+            title (str): Título de la ventana
+            highlight (set): Índices de las filas que se destacan como aviso
         """
         try:
-            # Convertir el string JSON a un objeto Python si es necesario
-            if isinstance(data, str):
-                import json
-                data = json.loads(data)
-            
-            # Si es un diccionario único, convertirlo a lista
-            if isinstance(data, dict):
-                data = [data]
-                
-            # Verificar que sea una lista de diccionarios
-            if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
-                self.add_to_log("Error: Los datos no tienen un formato válido para tabla.", "error")
-                return
+            if not isinstance(data, ColumnStore):
+                # Convertir el string JSON a un objeto Python si es necesario
+                if isinstance(data, str):
+                    data = json.loads(data)
                 
-            # Crear ventana para la tabla
-            table_window = ttk.Toplevel(self.root)
-            table_window.title("Resultados en Tabla")
-            table_window.geometry("1000x600")
-            
-            # Frame principal con padding
-            main_frame = ttk.Frame(table_window, padding=10)
-            main_frame.pack(fill=tk.BOTH, expand=True)
-            
-            # Frame para info y controles
-            info_frame = ttk.Frame(main_frame)
-            info_frame.pack(fill=tk.X, pady=(0, 10))
-            
-            # Mostrar número de registros
-            records_label = ttk.Label(info_frame, text=f"Registros: {len(data)}")
-            records_label.pack(side=tk.LEFT)
-            
-            # Botón para exportar
-            export_btn = ttk.Button(
-                info_frame, 
-                text="Exportar CSV", 
-                command=lambda: self.export_table_data(data),
-                style="info.TButton"
-            )
-            export_btn.pack(side=tk.RIGHT)
-            
-            # Frame para la tabla con scrollbars
-            table_frame = ttk.Frame(main_frame)
-            table_frame.pack(fill=tk.BOTH, expand=True)
-            
-            # Scrollbars
-            v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL)
-            v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            h_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL)
-            h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-            
-            # Obtener todas las columnas únicas de todos los registros
-            all_columns = set()
-            for item in data:
-                all_columns.update(item.keys())
+                # Si es un diccionario único, convertirlo a lista
+                if isinstance(data, dict):
+                    data = [data]
+                    
+                # Verificar que sea una lista de diccionarios
+                if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+                    self.add_to_log("Error: Los datos no tienen un formato válido para tabla.", "error")
+                    return
                 
-            # Convertir a lista y ordenar alfabéticamente
-            columns = sorted(list(all_columns))
-            
-            # Crear Treeview (tabla)
-            tree = ttk.Treeview(
-                table_frame, 
-                columns=columns,
-                show="headings",
-                yscrollcommand=v_scrollbar.set,
-                xscrollcommand=h_scrollbar.set
-            )
-            
-            # Configurar scrollbars
-            v_scrollbar.config(command=tree.yview)
-            h_scrollbar.config(command=tree.xview)
-            
-            # Configurar encabezados de columnas
-            for col in columns:
-                # Truncar nombres de columnas muy largos
-                display_name = col if len(col) < 25 else col[:22] + "..."
-                tree.heading(col, text=display_name)
+                data = ColumnStore.from_rows(data)
                 
-                # Calcular ancho basado en el nombre de la columna
-                width = max(100, len(col) * 10)
-                tree.column(col, width=width, minwidth=50)
-            
-            # Insertar datos
-            for idx, item in enumerate(data):
-                values = []
-                for col in columns:
-                    # Obtener el valor o un espacio en blanco si no existe
-                    value = item.get(col, "")
-                    
-                    # Convertir a string para mostrar en la tabla
-                    if isinstance(value, (dict, list)):
-                        value = json.dumps(value)
-                    elif value is None:
-                        value = "NULL"
-                    else:
-                        value = str(value)
-                        
-                    values.append(value)
-                    
-                # Insertar fila
-                tree.insert("", "end", values=values, tags=("odd" if idx % 2 else "even",))
+            # Columnas ordenadas alfabéticamente
+            columns = sorted(data.columns)
             
-            # Configurar colores alternos para las filas
-            tree.tag_configure("odd", background="#f5f5f5")
-            tree.tag_configure("even", background="#ffffff")
-            
-            # Empaquetar la tabla
-            tree.pack(fill=tk.BOTH, expand=True)
+            table = self._open_table_window(title, columns, data, highlight)
+            table['grid'].refresh()
             
             # Registrar en logs
             self.add_to_log(f"Vista de tabla creada con {len(data)} registros y {len(columns)} columnas", "info")
             
-            # Centrar la ventana
-            # Centrar la ventana
-            table_window.transient(self.root)
-            table_window.update_idletasks()
-            width = table_window.winfo_width()
-            height = table_window.winfo_height()
-            x = (table_window.winfo_screenwidth() // 2) - (width // 2)
-            y = (table_window.winfo_screenheight() // 2) - (height // 2)
-            table_window.geometry(f'{width}x{height}+{x}+{y}')
+            self._center_table_window(table)
             
         except Exception as e:
             self.add_to_log(f"Error al crear vista de tabla: {str(e)}", "error")
 
-    def export_table_data(self, data):
+    def open_paged_table(self, model_name, constraints=""):
         """
-        Exporta los datos de la tabla a un archivo CSV
+        Abre una vista de tabla que recorre una consulta por páginas: sólo se
+        piden las páginas cercanas a la parte visible (y la siguiente),
+        ordenadas por clave primaria, y se guardan las últimas TABLE_PAGE_CACHE.
+        Las páginas van al pool de workers o, si el worker está desactivado, a
+        procesos PHP de un uso, con el límite de memoria configurado.
         
         Args:
-            data (list): Lista de diccionarios con los datos
+            model_name (str): Clase del modelo, p. ej. App\\Models\\User
+            constraints (str): Condiciones opcionales, p. ej. where('active', 1)
         """
-        try:
-            import csv
+        query = f"{model_name}::{constraints}" if constraints else f"{model_name}::query()"
+        if self.use_worker.get():
+            runner = self._get_pool(self.project_path.get())
+        else:
+            runner = OneShotRunner(self.project_path.get(), self.php_binary)
+        timeout, memory_limit = self._execution_limits()
+        paged = PagedQuery(
+            runner,
+            query,
+            lambda page, job_id, envelope, error: self.output_queue.put(
+                ((table, page, job_id, envelope, error), "table_page")
+            ),
+            page_size=TABLE_PAGE_SIZE,
+            max_pages=TABLE_PAGE_CACHE,
+            timeout=timeout,
+            memory_limit=memory_limit
+        )
+        table = self._open_table_window(f"{query} (paginado)", [], paged)
+        table['grid'].on_view = paged.ensure
+        # Al cerrar la ventana nadie verá las páginas pendientes: liberar el ejecutor
+        table['window'].bind(
+            "<Destroy>", lambda event: paged.cancel() if event.widget is table['window'] else None, add="+"
+        )
+        table['label'].config(text="Registros: cargando...")
+        table['grid'].refresh()
+        self._center_table_window(table)
+        self.add_to_log(f"Tabla paginada de {query} ({TABLE_PAGE_SIZE} registros por página)", "info")
+
+    def _apply_table_page(self, table, page, job_id, envelope, error):
+        """
+        Guarda una página recibida de una tabla paginada y redibuja la tabla
+        """
+        paged = table['data']
+        if not table['window'].winfo_exists():
+            return
+        known = len(table['columns'])
+        error = paged.store_page(page, job_id, envelope, error)
+        if error is not None:
+            self.add_to_log(f"Error al cargar la página {page + 1} de {paged.query}: {error}", "error")
+            return
+        new_columns = paged.columns[known:]
+        if new_columns:
+            table['columns'].extend(sorted(new_columns))
+            self._configure_table_columns(table)
+        # Las filas de la página se habían formateado vacías mientras no estaba
+        table['grid'].refresh(columns_changed=True)
+        self._update_table_label(table, f" (páginas en memoria: {paged.cached_pages()})")
+
+    def _open_table_window(self, title, columns, data, highlight=None, streaming=False):
+        """
+        Crea la ventana de la vista de tabla sobre un resultado por columnas.
+        La tabla es virtual: sólo se muestran las filas visibles (ver VirtualGrid).
+        Pulsar un encabezado ordena por esa columna y la caja de filtro filtra
+        las filas; ambos se calculan en segundo plano (ver _update_table_order).
+        
+        Args:
+            title (str): Título de la ventana
+            columns (list): Columnas iniciales
+            data (ColumnStore/PagedQuery): Registros que se muestran, exporta "Exportar..." y
+                resume "Estadísticas"; una PagedQuery no se ordena, filtra ni exporta
+            highlight (set): Índices de las filas que se destacan como aviso
+            streaming (bool): Las filas siguen llegando: ordenar, filtrar y
+                exportar quedan desactivados hasta _finish_streamed_rows, porque
+                el almacenamiento cambia mientras se recibe
             
-            # Solicitar ubicación para guardar
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV", "*.csv"), ("Todos los archivos", "*.*")],
-                title="Exportar a CSV"
-            )
+        Returns:
+            dict: Ventana, tabla, vista virtual, etiqueta de registros, columnas y datos
+        """
+        # Crear ventana para la tabla
+        table_window = ttk.Toplevel(self.root)
+        table_window.title(title)
+        table_window.geometry("1000x600")
+        
+        # Frame principal con padding
+        main_frame = ttk.Frame(table_window, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Frame para info y controles
+        info_frame = ttk.Frame(main_frame)
+        info_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # Mostrar número de registros
+        records_label = ttk.Label(info_frame, text=f"Registros: {len(data)}")
+        records_label.pack(side=tk.LEFT)
+        
+        # Filtro: subcadena en cualquier columna o expresión (`total > 100 and email ~ gmail`)
+        ttk.Label(info_frame, text="Filtro:").pack(side=tk.LEFT, padx=(20, 5))
+        filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(info_frame, textvariable=filter_var, width=40)
+        filter_entry.pack(side=tk.LEFT)
+        filter_entry.bind("<Return>", lambda e: self._filter_table(table))
+        filter_entry.bind("<Escape>", lambda e: filter_var.set("") or self._filter_table(table))
+        
+        # Botón para exportar
+        export_btn = ttk.Button(
+            info_frame, 
+            text="Exportar...", 
+            command=lambda: self.export_table_data(table),
+            style="info.TButton"
+        )
+        export_btn.pack(side=tk.RIGHT)
+        
+        # Resumen por columna calculado sobre el almacenamiento columnar
+        stats_btn = ttk.Button(
+            info_frame, 
+            text="Estadísticas", 
+            command=lambda: self.show_table_stats(data, title),
+            style="secondary.TButton"
+        )
+        stats_btn.pack(side=tk.RIGHT, padx=(0, 10))
+        
+        # Frame para la tabla con scrollbars
+        table_frame = ttk.Frame(main_frame)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Scrollbars
+        v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL)
+        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        h_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL)
+        h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        # Crear Treeview (tabla); el scroll vertical lo lleva la vista virtual
+        tree = ttk.Treeview(
+            table_frame, 
+            columns=columns,
+            show="headings",
+            selectmode="browse",
+            xscrollcommand=h_scrollbar.set
+        )
+        
+        # Configurar scrollbars
+        h_scrollbar.config(command=tree.xview)
+        
+        table = {
+            'window': table_window,
+            'tree': tree,
+            'label': records_label,
+            'columns': list(columns),
+            'data': data,
+            # Orden y filtro aplicados; el cálculo en curso y si hay que repetirlo al terminar
+            'sort': None,
+            'descending': False,
+            'filter_var': filter_var,
+            'filter': "",
+            'busy': False,
+            'pending': False,
+            'streaming': streaming,
+            'controls': (filter_entry, export_btn),
+        }
+        table['grid'] = VirtualGrid(tree, v_scrollbar, data, table['columns'], highlight)
+        self._configure_table_columns(table)
+        
+        # Configurar colores alternos para las filas
+        tree.tag_configure("odd", background="#f5f5f5")
+        tree.tag_configure("even", background="#ffffff")
+        tree.tag_configure("warning", background="#ffe0e0", foreground="#b00000")
+        
+        if not isinstance(data, ColumnStore):
+            # Tabla paginada: los datos completos no están en memoria
+            for widget in (filter_entry, export_btn, stats_btn):
+                widget.configure(state=tk.DISABLED)
+        elif streaming:
+            for widget in table['controls']:
+                widget.configure(state=tk.DISABLED)
+        
+        # Empaquetar la tabla
+        tree.pack(fill=tk.BOTH, expand=True)
+        return table
+
+    def _configure_table_columns(self, table):
+        """
+        Aplica encabezados y anchos a las columnas de una vista de tabla
+        """
+        tree = table['tree']
+        tree.configure(columns=table['columns'])
+        for col in table['columns']:
+            tree.heading(col, command=lambda c=col: self._sort_table(table, c))
             
-            if not file_path:
+            # Calcular ancho basado en el nombre de la columna
+            width = max(100, len(col) * 10)
+            tree.column(col, width=width, minwidth=50)
+        self._update_table_headings(table)
+
+    def _update_table_headings(self, table):
+        """
+        Muestra en los encabezados los nombres de columna y la flecha del orden aplicado
+        """
+        for col in table['columns']:
+            # Truncar nombres de columnas muy largos
+            display_name = col if len(col) < 25 else col[:22] + "..."
+            if col == table['sort']:
+                display_name += " ▼" if table['descending'] else " ▲"
+            table['tree'].heading(col, text=display_name)
+
+    def _update_table_label(self, table, suffix=""):
+        """
+        Muestra los registros de la tabla, y cuántos pasan el filtro si lo hay
+        """
+        total = len(table['data'])
+        order = table['grid'].order
+        if order is not None and table['filter']:
+            text = f"Registros: {len(order)} de {total}"
+        else:
+            text = f"Registros: {total}"
+        table['label'].config(text=text + suffix)
+
+    def _sort_table(self, table, column):
+        """
+        Ordena la tabla por una columna; pulsar otra vez invierte el sentido
+        """
+        if not isinstance(table['data'], ColumnStore):
+            self.add_to_log("Las tablas paginadas se muestran ordenadas por clave primaria.", "info")
+            return
+        if table['streaming']:
+            self.add_to_log("La tabla se podrá ordenar cuando termine de recibir filas.", "info")
+            return
+        if table['sort'] == column:
+            table['descending'] = not table['descending']
+        else:
+            table['sort'] = column
+            table['descending'] = False
+        self._update_table_headings(table)
+        self._update_table_order(table)
+
+    def _filter_table(self, table):
+        """
+        Aplica el texto de la caja de filtro (vacío = sin filtro)
+        """
+        table['filter'] = table['filter_var'].get().strip()
+        self._update_table_order(table)
+        return "break"
+
+    def _update_table_order(self, table):
+        """
+        Calcula en un hilo el orden de filas para el orden y filtro actuales; el
+        resultado llega por la cola como "table_order". Si ya hay un cálculo en
+        curso, se repite al terminar con el estado más reciente.
+        """
+        if table['busy']:
+            table['pending'] = True
+            return
+        table['busy'] = True
+        table['pending'] = False
+        self._update_table_label(table, " (ordenando...)" if table['sort'] else " (filtrando...)")
+        threading.Thread(
+            target=self._compute_table_order,
+            args=(table, table['sort'], table['descending'], table['filter'], len(table['data'])),
+            daemon=True
+        ).start()
+
+    def _compute_table_order(self, table, column, descending, filter_text, length):
+        """
+        Calcula el orden de filas sobre las primeras `length` filas (las que había
+        al pedirlo, aunque sigan llegando más en streaming)
+        """
+        try:
+            order = table['data'].view_order(column, descending, filter_text, length)
+            self.output_queue.put(((table, order, None), "table_order"))
+        except Exception as e:
+            self.output_queue.put(((table, None, e), "table_order"))
+
+    def _apply_table_order(self, table, order, error):
+        """
+        Muestra el orden de filas calculado en segundo plano
+        """
+        table['busy'] = False
+        if not table['window'].winfo_exists():
+            return
+        if error is not None:
+            self.add_to_log(f"Error al ordenar o filtrar la tabla: {str(error)}", "error")
+        else:
+            table['grid'].set_order(order)
+        self._update_table_label(table)
+        if table['pending']:
+            self._update_table_order(table)
+
+    def _center_table_window(self, table):
+        # Centrar la ventana
+        table_window = table['window']
+        table_window.transient(self.root)
+        table_window.update_idletasks()
+        width = table_window.winfo_width()
+        height = table_window.winfo_height()
+        x = (table_window.winfo_screenwidth() // 2) - (width // 2)
+        y = (table_window.winfo_screenheight() // 2) - (height // 2)
+        table_window.geometry(f'{width}x{height}+{x}+{y}')
+
+    def _append_streamed_rows(self, run, rows):
+        """
+        Añade a la vista de tabla de una ejecución un lote de filas recibido
+        en streaming; la ventana se abre con el primer lote
+        
+        Args:
+            run (StreamedRun): Ejecución que envía las filas
+            rows (list): Lote de filas (diccionarios)
+        """
+        if not rows:
+            return
+        if not all(isinstance(row, dict) for row in rows):
+            # Valores sueltos (p. ej. de pluck()) no son filas de tabla: van al log como JSON
+            self.add_to_log((f"Filas ({run.label})", rows), "result")
+            return
+        try:
+            if run.table is None:
+                columns = sorted({key for row in rows for key in row})
+                run.table = self._open_table_window(
+                    f"Resultados en Tabla - {run.label} (streaming)", columns, ColumnStore(), streaming=True
+                )
+                self._center_table_window(run.table)
+            table = run.table
+            if not table['window'].winfo_exists():
+                # El usuario cerró la ventana: se descartan las filas restantes
                 return
-                
-            # Obtener todas las columnas
-            all_columns = set()
-            for item in data:
-                all_columns.update(item.keys())
-                
-            columns = sorted(list(all_columns))
-            
-            # Escribir CSV
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=columns)
-                writer.writeheader()
-                writer.writerows(data)
-                
-            self.add_to_log(f"Datos exportados correctamente a {file_path}", "success")
-            
+
+            started = time.perf_counter()
+            known = len(table['data'].columns)
+            table['data'].extend(rows)
+
+            # Las columnas nuevas van al final para no desordenar las filas ya insertadas
+            new_columns = sorted(set(table['data'].columns[known:]) - set(table['columns']))
+            if new_columns:
+                table['columns'].extend(new_columns)
+                self._configure_table_columns(table)
+            table['grid'].refresh(columns_changed=bool(new_columns))
+            self._update_table_label(table, " (recibiendo...)")
+            run.render_seconds += time.perf_counter() - started
+        except Exception as e:
+            self.add_to_log(f"Error al crear vista de tabla: {str(e)}", "error")
+
+    def _finish_streamed_rows(self, run):
+        """
+        Cierra la vista de tabla en streaming de una ejecución
+        """
+        table = run.table
+        if table is None:
+            return
+        self.last_json_data = table['data']
+        table['streaming'] = False
+        if table['window'].winfo_exists():
+            # Ya no llegan más filas: se puede ordenar, filtrar y exportar
+            for widget in table['controls']:
+                widget.configure(state=tk.NORMAL)
+            self._update_table_label(table)
+        self.add_to_log(
+            f"Vista de tabla creada con {len(table['data'])} registros y {len(table['columns'])} columnas", 
+            "info"
+        )
+
+    def show_table_stats(self, data, title):
+        """
+        Muestra en otra tabla el resumen por columna de un resultado: tipo,
+        valores, nulos, ausentes, distintos, mínimo, máximo y media
+        
+        Args:
+            data (ColumnStore): Datos de la tabla
+            title (str): Título de la tabla de origen
+        """
+        self.create_table_view(data.column_stats(), title=f"Estadísticas - {title}")
+
+    def export_table_data(self, table):
+        """
+        Exporta las filas de la tabla, con el orden y el filtro aplicados, a
+        CSV, TSV o NDJSON (con .gz, comprimido) según la extensión elegida. Se
+        escribe en un hilo aparte con una ventana de progreso que permite cancelar.
+        
+        Args:
+            table (dict): Vista de tabla (ver _open_table_window)
+        """
+        # Solicitar ubicación para guardar
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV", "*.csv"),
+                ("CSV comprimido", "*.csv.gz"),
+                ("TSV", "*.tsv"),
+                ("TSV comprimido", "*.tsv.gz"),
+                ("NDJSON", "*.ndjson *.jsonl"),
+                ("NDJSON comprimido", "*.ndjson.gz *.jsonl.gz"),
+                ("Todos los archivos", "*.*"),
+            ],
+            title="Exportar datos"
+        )
+        
+        if not file_path:
+            return
+        
+        # Instantánea de lo que se ve: columnas, orden y filas ya recibidas
+        data = table['data']
+        order = table['grid'].order
+        indices = range(len(data)) if order is None else order
+        file_format, compressed = export_format(file_path)
+        
+        window = ttk.Toplevel(self.root)
+        window.title("Exportando datos")
+        window.geometry("420x140")
+        window.transient(table['window'])
+        frame = ttk.Frame(window, padding=15)
+        frame.pack(fill=tk.BOTH, expand=True)
+        label = ttk.Label(frame, text=f"Exportando {len(indices)} registros a {os.path.basename(file_path)}...")
+        label.pack(anchor=tk.W, pady=(0, 10))
+        bar = ttk.Progressbar(frame, mode='determinate', maximum=max(len(indices), 1))
+        bar.pack(fill=tk.X, pady=(0, 10))
+        
+        export = {
+            'window': window,
+            'bar': bar,
+            'label': label,
+            'path': file_path,
+            'cancel': threading.Event(),
+        }
+        ttk.Button(
+            frame,
+            text="Cancelar",
+            command=export['cancel'].set,
+            style="secondary.TButton"
+        ).pack(side=tk.RIGHT)
+        window.protocol("WM_DELETE_WINDOW", export['cancel'].set)
+        
+        self.add_to_log(
+            f"Exportando {len(indices)} registros a {file_path} "
+            f"({file_format.upper()}{', gzip' if compressed else ''})...",
+            "info"
+        )
+        threading.Thread(
+            target=self._export_table_rows,
+            args=(export, data, list(table['columns']), indices),
+            daemon=True
+        ).start()
+
+    def _export_table_rows(self, export, data, columns, indices):
+        """
+        Escribe la exportación en segundo plano; el progreso y el final llegan
+        a la interfaz por la cola como "export_progress" y "export_done"
+        """
+        try:
+            written = export_store(
+                data, export['path'], columns, indices,
+                progress=lambda done, total: self.output_queue.put(((export, done), "export_progress")),
+                cancel=export['cancel']
+            )
+            self.output_queue.put(((export, written, None), "export_done"))
         except Exception as e:
-            self.add_to_log(f"Error al exportar datos: {str(e)}", "error")
+            self.output_queue.put(((export, None, e), "export_done"))
+
+    def _show_export_progress(self, export, done):
+        if export['window'].winfo_exists():
+            export['bar'].configure(value=done)
+
+    def _finish_export(self, export, written, error):
+        """
+        Cierra la ventana de progreso e informa del resultado de la exportación
+        """
+        if export['window'].winfo_exists():
+            export['window'].destroy()
+        if error is not None:
+            self.add_to_log(f"Error al exportar datos: {str(error)}", "error")
+        elif written is None:
+            self.add_to_log(f"Exportación a {export['path']} cancelada.", "warning")
+        else:
+            self.add_to_log(f"{written} registros exportados correctamente a {export['path']}", "success")
     
     def add_to_log(self, message, msg_type="normal"):
         # Añadir marca de tiempo
@@ -763,8 +2546,21 @@ class LaravelTinkerApp:
             "type": msg_type
         }
         
+        # Resultado estructurado: el historial guarda los datos sin formatear
+        if msg_type == "result":
+            label, data = message
+            message = f"{label} ({describe_json(data)}):"
+            log_entry["message"] = message
+            log_entry["data"] = data
+        
         # Añadir al historial de logs
+        size = len(message) if isinstance(message, str) else 64
+        if "data" in log_entry:
+            size += estimate_bytes(log_entry["data"])
         self.log_history.append(log_entry)
+        self._log_sizes.append(size)
+        self._log_bytes += size
+        self._trim_log_history()
         
         # Habilitar edición del widget de salida
         self.output_text.config(state=tk.NORMAL)
@@ -773,35 +2569,58 @@ class LaravelTinkerApp:
         if not hasattr(self, '_tags_configured'):
             self.output_text.tag_configure("error", foreground="red")
             self.output_text.tag_configure("success", foreground="green")
+            self.output_text.tag_configure("warning", foreground="#CC7700")
             self.output_text.tag_configure("json", foreground="#00AAAA")
             self.output_text.tag_configure("keyword", foreground="blue")
             self.output_text.tag_configure("info", foreground="black")
             self.output_text.tag_configure("status", foreground="#555555")
             self.output_text.tag_configure("code", foreground="#888888")
             self.output_text.tag_configure("timestamp", foreground="#888888", font=("TkDefaultFont", 8))
+            self.output_text.tag_configure("json_key", foreground="#7A1FA2")
+            self.output_text.tag_configure("string", foreground="#008800")
+            self.output_text.tag_configure("number", foreground="#C05800")
+            self.output_text.tag_configure("json_more", foreground="blue", underline=True)
+            self.output_text.tag_configure("collapsed", foreground="#555555", background="#F2F2F2")
             self._tags_configured = True
+        
+        # Salida que llega por partes: se añade tal cual, sin marca de tiempo
+        if msg_type in ("stream", "stream_error"):
+            tag = "error" if msg_type == "stream_error" else "info"
+            if len(message) > LOG_COLLAPSE_CHARS:
+                self._insert_collapsed(message, tag, tk.END)
+            else:
+                self.output_text.insert(tk.END, message, tag)
+            self._trim_output()
+            self._end_log_insert()
+            return
+        
+        # Empezar en una línea nueva si la salida anterior quedó a medias
+        if self.output_text.get("end-2c") not in ("\n", ""):
+            self.output_text.insert(tk.END, "\n")
             
         # Añadir timestamp al inicio de la línea
         self.output_text.insert(tk.END, f"[{timestamp}] ", "timestamp")
         
         # Agregar mensaje con formato según el tipo
-        if msg_type == "error":
+        if msg_type != "result" and len(message) > LOG_COLLAPSE_CHARS:
+            tag = msg_type if msg_type in ("error", "success", "warning", "json", "status", "code") else "info"
+            self._insert_collapsed(message, tag, tk.END)
+            self.output_text.insert(tk.END, "\n")
+        elif msg_type == "error":
             self.output_text.insert(tk.END, message + "\n\n", "error")
         elif msg_type == "success":
             self.output_text.insert(tk.END, message + "\n\n", "success")
+        elif msg_type == "warning":
+            self.output_text.insert(tk.END, message + "\n\n", "warning")
+        elif msg_type == "result":
+            self.output_text.insert(tk.END, message + "\n", "json")
+            pager = JsonPager(log_entry["data"])
+            self._insert_result_page(pager, "end-1c")
+            self.output_text.insert(tk.END, "\n\n")
         elif msg_type == "json":
+            start_idx = self.output_text.index("end-1c")
             self.output_text.insert(tk.END, message + "\n\n", "json")
-            
-            # Destacar algunas palabras clave en la salida JSON
-            start_idx = self.output_text.index(tk.END + "-2l linestart")
-            while True:
-                for keyword in ['"id":', '"name":', '"created_at":', '"updated_at":', '"deleted_at":']:
-                    start_pos = self.output_text.search(keyword, start_idx, tk.END)
-                    if not start_pos:
-                        continue
-                    end_pos = f"{start_pos}+{len(keyword)}c"
-                    self.output_text.tag_add('keyword', start_pos, end_pos)
-                break  # Solo una pasada
+            self._highlight_json(start_idx, message)
         elif msg_type == "info":
             self.output_text.insert(tk.END, message + "\n\n", "info")
         elif msg_type == "status":
@@ -811,15 +2630,246 @@ class LaravelTinkerApp:
         else:
             self.output_text.insert(tk.END, message + "\n\n", "info")
         
+        self._trim_output()
+        self._end_log_insert()
+    
+    def _end_log_insert(self):
+        """
+        Desactiva la edición del log y lo desplaza al final, salvo mientras se
+        vacía la cola de salida: entonces se hace una sola vez al terminar
+        """
+        if self._log_batch:
+            self._log_dirty = True
+            return
+        
         # Desactivar edición
         self.output_text.config(state=tk.DISABLED)
         
         # Desplazarse al final
         self.output_text.see(tk.END)
     
+    def _trim_log_history(self):
+        """
+        Pasa al archivo en disco las entradas que exceden el tamaño del historial
+        en memoria, en número de entradas o en bytes (LOG_HISTORY_MAX_BYTES)
+        """
+        size = self.log_history_size.get()
+        while self.log_history and (len(self.log_history) > size or self._log_bytes > LOG_HISTORY_MAX_BYTES):
+            self.log_archive.append(self.log_history.popleft())
+            self._log_bytes -= self._log_sizes.popleft()
+
+    def _trim_output(self):
+        """
+        Borra las líneas más antiguas del widget de log por encima de OUTPUT_MAX_LINES
+        """
+        lines = int(self.output_text.index("end-1c").split(".")[0])
+        excess = lines - OUTPUT_MAX_LINES
+        if excess <= 0:
+            return
+        self.output_text.delete("1.0", f"{excess + 1}.0")
+        # Los enlaces "mostrar más" borrados retienen su resultado en el callback
+        for tag in self.output_text.tag_names():
+            if tag.startswith(("json_more_", "text_more_", "text_view_")) and not self.output_text.tag_ranges(tag):
+                self.output_text.tag_delete(tag)
+
+    def _highlight_json(self, start, text):
+        """
+        Resalta claves, cadenas, números y literales de un tramo de salida JSON
+        recién insertado
+        
+        Args:
+            start (str): Índice del widget donde empieza el texto
+            text (str): Texto insertado
+        """
+        if len(text) > HIGHLIGHT_MAX_CHARS:
+            return
+        self._apply_highlight(self.output_text, start, text, 'json')
+
+    def _apply_highlight(self, widget, start, text, language):
+        """
+        Aplica en bloque las etiquetas de un único recorrido del tokenizador:
+        una llamada a tag_add por etiqueta
+        """
+        line, column = map(int, widget.index(start).split("."))
+        for tag, indices in highlight_ranges(text, language, line, column).items():
+            # Tk admite varios pares de índices por llamada; se parte para no crear comandos enormes
+            for offset in range(0, len(indices), 2000):
+                widget.tag_add(tag, *indices[offset:offset + 2000])
+
+    def _insert_result_page(self, pager, index):
+        """
+        Inserta la siguiente página de un resultado y, si quedan elementos,
+        un enlace para mostrar la siguiente en el mismo lugar
+        
+        Args:
+            pager (JsonPager): Resultado que se está mostrando
+            index (str): Posición del widget donde insertar
+        """
+        start = self.output_text.index(index)
+        self.output_text.mark_set("result_insert", start)
+        self.output_text.mark_gravity("result_insert", tk.RIGHT)
+        page = pager.next_page()
+        if len(page) > LOG_COLLAPSE_CHARS:
+            # Un elemento enorme no se formatea entero en el widget
+            self._insert_collapsed(page, "json", start)
+        else:
+            self.output_text.insert(start, page, "json")
+            self._highlight_json(start, page)
+
+        remaining = pager.remaining()
+        if remaining:
+            more_tag = f"json_more_{id(pager)}"
+            self.output_text.insert(
+                "result_insert",
+                f"    … {remaining} elementos más (clic para mostrar)\n",
+                ("json_more", more_tag)
+            )
+            self.output_text.tag_bind(more_tag, "<Button-1>",
+                                      lambda e: self._expand_result(pager, more_tag))
+            self.output_text.tag_bind(more_tag, "<Enter>",
+                                      lambda e: self.output_text.config(cursor="hand2"))
+            self.output_text.tag_bind(more_tag, "<Leave>",
+                                      lambda e: self.output_text.config(cursor=""))
+        self.output_text.mark_unset("result_insert")
+
+    def _insert_collapsed(self, text, tag, index):
+        """
+        Inserta un texto largo plegado: una línea de resumen con su tamaño, las
+        primeras LOG_PREVIEW_LINES líneas y enlaces para mostrar más o abrirlo
+        en un visor. El texto completo queda en un TextPager fuera del widget.
+        
+        Args:
+            text (str): Texto completo
+            tag (str): Etiqueta de formato de las líneas
+            index (str): Posición del widget donde insertar
+        """
+        pager = TextPager(text)
+        view_tag = f"text_view_{id(pager)}"
+        start = self.output_text.index(index)
+        self.output_text.mark_set("collapsed_insert", start)
+        self.output_text.mark_gravity("collapsed_insert", tk.RIGHT)
+        
+        self.output_text.insert(
+            "collapsed_insert",
+            f"[Salida grande: {format_bytes(pager.size)}, {pager.lines} líneas. "
+            f"Se muestran las primeras {min(LOG_PREVIEW_LINES, pager.lines)}] ",
+            "collapsed"
+        )
+        self.output_text.insert("collapsed_insert", "Abrir en visor\n", ("json_more", view_tag))
+        self._bind_link(view_tag, lambda e: self._open_text_viewer(text))
+        
+        self._insert_text_page(pager, tag, "collapsed_insert", LOG_PREVIEW_LINES)
+        self.output_text.mark_unset("collapsed_insert")
+
+    def _insert_text_page(self, pager, tag, index, count):
+        """
+        Inserta el siguiente bloque de un texto plegado y, si queda más, el
+        enlace que lo sustituye por el bloque siguiente
+        """
+        start = self.output_text.index(index)
+        self.output_text.mark_set("text_insert", start)
+        self.output_text.mark_gravity("text_insert", tk.RIGHT)
+        chunk = pager.next_lines(count)
+        self.output_text.insert("text_insert", chunk, tag)
+        if chunk and not chunk.endswith("\n"):
+            self.output_text.insert("text_insert", "\n", tag)
+        if tag == "json":
+            self._highlight_json(start, chunk)
+        
+        remaining = pager.remaining()
+        if remaining:
+            more_tag = f"text_more_{id(pager)}"
+            self.output_text.insert(
+                "text_insert",
+                f"    … {remaining} líneas más (clic para mostrar {min(remaining, LOG_EXPAND_LINES)})\n",
+                ("json_more", more_tag)
+            )
+            self._bind_link(more_tag, lambda e: self._expand_text(pager, tag, more_tag))
+        self.output_text.mark_unset("text_insert")
+
+    def _expand_text(self, pager, tag, more_tag):
+        """
+        Sustituye el enlace de un texto plegado por su siguiente bloque de líneas
+        """
+        ranges = self.output_text.tag_ranges(more_tag)
+        if not ranges:
+            return
+        self.output_text.config(state=tk.NORMAL)
+        start = self.output_text.index(ranges[0])
+        self.output_text.delete(ranges[0], ranges[1])
+        self.output_text.tag_delete(more_tag)
+        self.output_text.config(cursor="")
+        self._insert_text_page(pager, tag, start, LOG_EXPAND_LINES)
+        self.output_text.config(state=tk.DISABLED)
+
+    def _bind_link(self, tag, command):
+        self.output_text.tag_bind(tag, "<Button-1>", command)
+        self.output_text.tag_bind(tag, "<Enter>", lambda e: self.output_text.config(cursor="hand2"))
+        self.output_text.tag_bind(tag, "<Leave>", lambda e: self.output_text.config(cursor=""))
+
+    def _open_text_viewer(self, text, title="Salida completa"):
+        """
+        Muestra un texto largo en una ventana aparte que carga los bloques de
+        líneas a medida que se desplaza hacia el final
+        """
+        pager = TextPager(text)
+        
+        viewer = ttk.Toplevel(self.root)
+        viewer.title(f"{title} ({format_bytes(pager.size)}, {pager.lines} líneas)")
+        viewer.geometry("1000x700")
+        
+        frame = ttk.Frame(viewer, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        status_var = tk.StringVar()
+        ttk.Label(frame, textvariable=status_var).pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text_widget = tk.Text(frame, wrap=tk.NONE, font=("Courier", 10))
+        text_widget.pack(fill=tk.BOTH, expand=True)
+        scrollbar.config(command=text_widget.yview)
+        
+        loading = [False]
+        
+        def load_more():
+            loading[0] = False
+            text_widget.config(state=tk.NORMAL)
+            text_widget.insert(tk.END, pager.next_lines(LOG_EXPAND_LINES))
+            text_widget.config(state=tk.DISABLED)
+            status_var.set(f"Cargadas {pager.shown_lines} de {pager.lines} líneas")
+        
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            # Cerca del final: cargar el siguiente bloque
+            if pager.remaining() and float(last) > 0.9 and not loading[0]:
+                loading[0] = True
+                viewer.after_idle(load_more)
+        
+        text_widget.config(yscrollcommand=on_scroll)
+        load_more()
+
+    def _expand_result(self, pager, more_tag):
+        """
+        Sustituye el enlace de un resultado por su siguiente página
+        """
+        ranges = self.output_text.tag_ranges(more_tag)
+        if not ranges:
+            return
+        self.output_text.config(state=tk.NORMAL)
+        start = self.output_text.index(ranges[0])
+        self.output_text.delete(ranges[0], ranges[1])
+        self.output_text.tag_delete(more_tag)
+        self.output_text.config(cursor="")
+        self._insert_result_page(pager, start)
+        self.output_text.config(state=tk.DISABLED)
+
     def clear_logs(self):
         # Limpiar el historial de logs
-        self.log_history = []
+        self.log_history.clear()
+        self._log_sizes.clear()
+        self._log_bytes = 0
+        self.log_archive.clear()
         
         # Limpiar el widget de salida
         self.output_text.config(state=tk.NORMAL)
@@ -830,7 +2880,7 @@ class LaravelTinkerApp:
         self.status_var.set("Logs limpiados.")
     
     def export_logs(self):
-        if not self.log_history:
+        if not self.log_history and not self.log_archive.archived:
             Messagebox.show_info("No hay logs para exportar.", "Exportar Logs")
             return
             
@@ -844,16 +2894,33 @@ class LaravelTinkerApp:
         if not file_path:
             return
             
+        # Instantánea en el hilo de la interfaz: lo archivado hasta ahora y lo que hay en memoria
+        self.status_var.set("Exportando logs...")
+        threading.Thread(
+            target=self._write_logs,
+            args=(file_path, self.log_archive.archived, list(self.log_history)),
+            daemon=True
+        ).start()
+
+    def _write_logs(self, file_path, archived, entries):
+        """
+        Escribe la exportación de logs en segundo plano: primero las `archived`
+        entradas del archivo en disco, leídas una a una, y luego las de memoria
+        """
         try:
             with open(file_path, 'w', encoding='utf-8') as f:
-                for entry in self.log_history:
+                archive = itertools.islice(self.log_archive.iter_entries(), archived)
+                for entry in itertools.chain(archive, entries):
                     f.write(f"[{entry['timestamp']}] [{entry['type'].upper()}] {entry['message']}\n")
-                    
-            self.status_var.set(f"Logs exportados a {file_path}")
-            self.add_to_log(f"Logs exportados a {file_path}", "success")
+                    if "data" in entry:
+                        json.dump(entry["data"], f, indent=4, ensure_ascii=False, default=json_default)
+                        f.write("\n")
+            
+            self.output_queue.put((f"Logs exportados a {file_path}", "status"))
+            self.output_queue.put((f"Logs exportados a {file_path}", "success"))
             
         except Exception as e:
-            self.add_to_log(f"Error al exportar logs: {str(e)}", "error")
+            self.output_queue.put((f"Error al exportar logs: {str(e)}", "error"))
     def list_models(self):
         if not self.project_path.get():
             Messagebox.show_error("Por favor selecciona un proyecto Laravel primero.", "Error")
@@ -880,10 +2947,9 @@ class LaravelTinkerApp:
         
         $models = [];
         
-        // Función para buscar recursivamente en subdirectorios
-        function findModelsRecursively($directory, $namespace) {
-            global $models;
-            
+        // Función para buscar recursivamente en subdirectorios (un closure:
+        // cada ejecución tiene su propio ámbito y no deja funciones globales)
+        $findModelsRecursively = function ($directory, $namespace) use (&$findModelsRecursively, &$models) {
             if (!file_exists($directory) || !is_dir($directory)) {
                 return;
             }
@@ -899,7 +2965,7 @@ class LaravelTinkerApp:
                 if (is_dir($path)) {
                     // Si es un directorio, buscamos recursivamente
                     $subNamespace = $namespace . '\\\\' . $file;
-                    findModelsRecursively($path, $subNamespace);
+                    $findModelsRecursively($path, $subNamespace);
                 } elseif (is_file($path) && pathinfo($path, PATHINFO_EXTENSION) === 'php') {
                     // Si es un archivo PHP, verificamos si es un modelo
                     $content = file_get_contents($path);
@@ -915,12 +2981,12 @@ class LaravelTinkerApp:
                     }
                 }
             }
-        }
+        };
         
         // Buscar en app/Models recursivamente
         if ($modelsExist) {
             echo "Buscando modelos en {$modelsPath} y subdirectorios...\\n";
-            findModelsRecursively($modelsPath, 'App\\\\Models');
+            $findModelsRecursively($modelsPath, 'App\\\\Models');
         }
         
         // Buscar directamente en app/ para Laravel < 8
@@ -982,8 +3048,7 @@ class LaravelTinkerApp:
         self.add_to_log("Listando modelos del proyecto...", "info")
         
         # Ejecutar el código para listar modelos
-        self.code_editor.delete(1.0, tk.END)
-        self.code_editor.insert(tk.END, code)
+        self._set_editor_text(code)
         self.execute_code()
         
     def model_query_dialog(self):
@@ -1043,7 +3108,7 @@ class LaravelTinkerApp:
                 
                 # Tipo de consulta
                 query_types = [
-                    "Obtener todo (all())",
+                    "Obtener todo (tabla paginada por clave primaria)",
                     "Primero (first())",
                     "Encontrar por ID (find())",
                     "Contar (count())",
@@ -1075,8 +3140,11 @@ class LaravelTinkerApp:
                         return
                     
                     # Generar el código para la consulta
-                    if query_type == "Obtener todo (all())":
-                        code = f"echo formatOutput({model_name}::all());"
+                    if query_type == "Obtener todo (tabla paginada por clave primaria)":
+                        # Sin ejecutar all(): la tabla pide las páginas que se van viendo
+                        query_dialog.destroy()
+                        self.open_paged_table(model_name, params)
+                        return
                     elif query_type == "Primero (first())":
                         code = f"echo formatOutput({model_name}::first());"
                     elif query_type == "Encontrar por ID (find())":
@@ -1104,8 +3172,7 @@ class LaravelTinkerApp:
                     # Registrar la consulta en los logs
                     self.add_to_log(f"Ejecutando consulta para modelo {model_name} ({query_type})", "info")
                     
-                    self.code_editor.delete(1.0, tk.END)
-                    self.code_editor.insert(tk.END, full_code)
+                    self._set_editor_text(full_code)
                     self.execute_code()
                 
                 # Botones de acción
@@ -1162,7 +3229,7 @@ class LaravelTinkerApp:
     def _show_query_dialog(self, model_name):
         # Diálogo para seleccionar el tipo de consulta
         query_types = [
-            "Obtener todo (all())",
+            "Obtener todo (tabla paginada por clave primaria)",
             "Primero (first())",
             "Encontrar por ID (find())",
             "Contar (count())",
@@ -1200,8 +3267,10 @@ class LaravelTinkerApp:
                 return
             
             # Generar el código para la consulta
-            if query_type == "Obtener todo (all())":
-                code = f"echo formatOutput({model_name}::all());"
+            if query_type == "Obtener todo (tabla paginada por clave primaria)":
+                query_dialog.destroy()
+                self.open_paged_table(model_name, params)
+                return
             elif query_type == "Primero (first())":
                 code = f"echo formatOutput({model_name}::first());"
             elif query_type == "Encontrar por ID (find())":
@@ -1229,8 +3298,7 @@ class LaravelTinkerApp:
             # Registrar la consulta en los logs
             self.add_to_log(f"Ejecutando consulta para modelo {model_name} ({query_type})", "info")
             
-            self.code_editor.delete(1.0, tk.END)
-            self.code_editor.insert(tk.END, full_code)
+            self._set_editor_text(full_code)
             self.execute_code()
         
         # Botones
@@ -1267,39 +3335,52 @@ class LaravelTinkerApp:
         self.add_to_log(f"Ejecutando comando artisan: {command}", "info")
         
         # Ejecutar el comando artisan en un hilo separado
+        run = StreamedRun(
+            self.output_queue,
+            f"Resultado de 'php artisan {command}'",
+            self.output_cap_mb.get() * 1024 * 1024,
+            error_label=f"Error al ejecutar 'php artisan {command}'"
+        )
         threading.Thread(
             target=self._execute_artisan, 
-            args=(command,), 
+            args=(command, self.project_path.get(), run) + self._execution_limits(), 
             daemon=True
         ).start()
     
-    def _execute_artisan(self, command):
+    def _execute_artisan(self, command, project_path, run, timeout=None, memory_limit=None):
         try:
             process = subprocess.Popen(
-                ['php', 'artisan', command, '--no-ansi'],
+                php_command(['artisan', command, '--no-ansi'], memory_limit),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                cwd=self.project_path.get(),
-                text=True
+                cwd=project_path,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                bufsize=1,
+                **PROCESS_GROUP_KWARGS
             )
             
-            stdout, stderr = process.communicate()
-            
-            if stdout:
-                self.output_queue.put((f"Resultado de 'php artisan {command}':\n\n{stdout}", "normal"))
+            # Mostrar la salida a medida que llega (migraciones, comandos largos...)
+            self._stream_process(process, run, timeout)
+            run.close()
+            self._report_spilled_output(run)
             
-            if stderr:
-                self.output_queue.put((f"Error al ejecutar 'php artisan {command}':\n\n{stderr}", "error"))
+            if run.interrupted:
+                self.output_queue.put((ExecutionInterrupted.MESSAGES[run.interrupted] + 
+                                       " Se muestra la salida parcial.", "error"))
+                self.output_queue.put((f"Comando 'php artisan {command}' interrumpido", "status"))
+                return
                 
-            if not stdout and not stderr:
+            if not run.stdout.total_bytes and not run.stderr.total_bytes:
                 self.output_queue.put((f"Comando 'php artisan {command}' ejecutado sin salida.", "success"))
             
-            self.output_queue.put(("status", "Comando artisan completado."))
+            self.output_queue.put(("Comando artisan completado.", "status"))
             self.output_queue.put((f"Comando 'php artisan {command}' finalizado", "status"))
             
         except Exception as e:
             self.output_queue.put((f"Error al ejecutar artisan: {str(e)}", "error"))
-            self.output_queue.put(("status", "Error en el comando artisan."))
+            self.output_queue.put(("Error en el comando artisan.", "status"))
     
     def show_about(self):
         Messagebox.show_info(
@@ -1316,110 +3397,11 @@ class LaravelTinkerApp:
 
     def transform_code(self, code):
         """
-        Transforma el código ingresado por el usuario para adaptarlo automáticamente
-        al formato requerido por Tinker.
-
-        Transformaciones:
-        - ModelName::método() → echo formatOutput(App\\Models\\ModelName::método());
-        - App\\ModelName::método() → echo formatOutput(App\\ModelName::método());
-
-        Args:
-            code (str): Código ingresado por el usuario
-
-        Returns:
-            str: Código transformado
+        Transforma el código del editor (ver tinker_engine.transform_code)
+        registrando los cambios en el log
         """
-        try:
-            # Eliminar espacios al inicio y final
-            code = code.strip()
-
-            # Eliminar punto y coma al final si existe
-            if code.endswith(';'):
-                code = code[:-1]
-
-            # Si ya contiene "echo formatOutput", no aplicar transformación
-            if "echo formatOutput" in code:
-                return code
-
-            # Si ya está formateado con var_dump o dd, devolverlo sin cambios
-            if code.startswith("var_dump(") or code.startswith("dd("):
-                return code
-
-            # Si es un código generado por consulta de modelo, no transformar
-            if "// Consulta al modelo" in code:
-                return code
-
-            # Si es un comando de Laravel (como DB::), no lo transformamos
-            if code.startswith("DB::") or code.startswith("\\DB::") or code.startswith("Schema::"):
-                # Simplemente añadir echo si no está ya
-                if not code.startswith("echo"):
-                    return f"echo formatOutput({code});"
-                return code
-
-            # Verificar si es una consulta de modelo simple (Modelo::método())
-            # Patrón: palabra::método(args) - sin espacios antes de ::
-            model_method_pattern = r'^([A-Za-z0-9_]+)::([A-Za-z0-9_]+\(.*\))(.*)$'
-            import re
-            match = re.match(model_method_pattern, code)
-
-            if match:
-                model_name = match.group(1)
-                method_call = match.group(2)
-                rest_of_code = match.group(3)
-
-                # Si parece ser un nombre de modelo (primera letra mayúscula)
-                if model_name[0].isupper():
-                    # Transformar a formato completo con namespace
-                    transformed = f"echo formatOutput(App\\Models\\{model_name}::{method_call}{rest_of_code});"
-
-                    # Registrar la transformación
-                    self.add_to_log(f"Código transformado: {code} → {transformed}", "info")
-
-                    return transformed
-
-            # Verificar si ya tiene namespace App pero sin formatOutput
-            namespace_pattern = r'^App\\([A-Za-z0-9_\\]+)::([A-Za-z0-9_]+\(.*\))(.*)$'
-            match = re.match(namespace_pattern, code)
-
-            if match:
-                namespace = match.group(1)
-                method_call = match.group(2)
-                rest_of_code = match.group(3)
-
-                # Transformar a formato con formatOutput
-                transformed = f"echo formatOutput(App\\{namespace}::{method_call}{rest_of_code});"
-
-                # Registrar la transformación
-                self.add_to_log(f"Código transformado: {code} → {transformed}", "info")
-
-                return transformed
-
-            # Si no coincide con ningún patrón pero parece código PHP válido
-            if "::" in code or "->" in code:
-                # Verificar si el código comienza con un nombre de clase
-                # que podría ser un modelo Eloquent
-                class_pattern = r'^([A-Z][A-Za-z0-9_]*)(::|\->)'
-                class_match = re.match(class_pattern, code)
-                if class_match and "::" in code[:10]:  # Si hay una clase y usa ::
-                    model_name = class_match.group(1)
-                    # Asegurarnos que tenga el namespace completo
-                    if not code.startswith("App\\"):
-                        transformed = f"echo formatOutput(App\\Models\\{code});"
-                        self.add_to_log(f"Código transformado: {code} → {transformed}", "info")
-                        return transformed
-
-                # Si no es una clase o ya tiene namespace, simplemente envolver
-                transformed = f"echo formatOutput({code});"
-                self.add_to_log(f"Código transformado: {code} → {transformed}", "info")
-                return transformed
-
-            # Si no coincide con ningún patrón, devolver el código original
-            return code
+        return transform_code(code, self.add_to_log)
 
-        except Exception as e:
-            # Si hay algún error en la transformación, devolver el código original
-            self.add_to_log(f"Error al transformar código: {str(e)}", "error")
-            return code
 
 def main():
     try:
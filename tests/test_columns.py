@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""Pruebas de ColumnStore con columnas que mezclan enteros y decimales"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tinker_columns import ColumnStore, cell_text, export_store, json_default  # noqa: E402
+
+
+class MixedNumberColumnTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        # Primer lote entero y segundo decimal: la columna se promociona a 'float'
+        self.store = ColumnStore.from_rows([{'id': 1, 'price': 5}, {'id': 2, 'price': None}])
+        self.store.extend([{'id': 3, 'price': 5.5}, {'id': 4, 'price': 7}, {'id': 5, 'price': 2.0}])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_column_is_float(self):
+        self.assertEqual(self.store._columns['price'].kind, 'float')
+
+    def test_integer_cells_round_trip(self):
+        prices = [self.store.value(index, 'price') for index in range(len(self.store))]
+        self.assertEqual(prices, [5, None, 5.5, 7, 2.0])
+        self.assertEqual([type(price) for price in prices], [int, type(None), float, int, float])
+        self.assertEqual(cell_text(prices[0]), "5")
+        self.assertEqual(json.dumps(self.store, default=json_default),
+                         '[{"id": 1, "price": 5}, {"id": 2, "price": null}, {"id": 3, "price": 5.5}, '
+                         '{"id": 4, "price": 7}, {"id": 5, "price": 2.0}]')
+
+    def test_export_after_promotion(self):
+        csv_path = os.path.join(self.tmp, 'out.csv')
+        export_store(self.store, csv_path, columns=['id', 'price'])
+        with open(csv_path, encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), ['id,price', '1,5', '2,', '3,5.5', '4,7', '5,2.0'])
+
+        ndjson_path = os.path.join(self.tmp, 'out.ndjson')
+        export_store(self.store, ndjson_path, columns=['id', 'price'])
+        with open(ndjson_path, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows, [{'id': 1, 'price': 5}, {'id': 2, 'price': None}, {'id': 3, 'price': 5.5},
+                                {'id': 4, 'price': 7}, {'id': 5, 'price': 2.0}])
+        self.assertIs(type(rows[0]['price']), int)
+
+    def test_filter_sort_and_stats(self):
+        self.assertEqual(list(self.store.filter_mask('price = 5')), [1, 0, 0, 0, 0])
+        present, empty = self.store._columns['price'].sort_order(len(self.store))
+        self.assertEqual((present, empty), ([4, 0, 2, 3], [1]))
+        stats = self.store._columns['price'].stats()
+        self.assertEqual((stats['mínimo'], stats['máximo']), (2.0, 7))
+        self.assertIs(type(stats['máximo']), int)
+
+
+if __name__ == '__main__':
+    unittest.main()
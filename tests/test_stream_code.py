@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""Pruebas de to_stream_code (paso de formatOutput a streamOutput)"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tinker_engine import to_stream_code  # noqa: E402
+
+
+class ToStreamCodeTest(unittest.TestCase):
+
+    def test_listing_is_streamed(self):
+        self.assertEqual(
+            to_stream_code("echo formatOutput(App\\Models\\User::all());"),
+            "echo streamOutput(App\\Models\\User::query());",
+        )
+
+    def test_only_last_call_is_rewritten(self):
+        code = ("echo formatOutput(App\\Models\\User::count()); "
+                "echo formatOutput(App\\Models\\Post::all());")
+        self.assertEqual(
+            to_stream_code(code),
+            "echo formatOutput(App\\Models\\User::count()); "
+            "echo streamOutput(App\\Models\\Post::query());",
+        )
+
+    def test_last_call_not_a_listing_is_untouched(self):
+        code = ("echo formatOutput(App\\Models\\Post::all()); "
+                "echo formatOutput(App\\Models\\User::count());")
+        self.assertEqual(to_stream_code(code), code)
+
+    def test_unbalanced_argument_is_untouched(self):
+        code = "echo formatOutput(foo()); bar(App\\Models\\User::all());"
+        self.assertEqual(to_stream_code(code), code)
+        code = "echo formatOutput(User::where('a', ')')->get());"
+        self.assertEqual(to_stream_code(code), "echo streamOutput(User::where('a', ')'));")
+
+
+if __name__ == '__main__':
+    unittest.main()
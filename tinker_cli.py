@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Línea de comandos de Laravel Tinker Tool: ejecuta un fragmento contra un
+proyecto Laravel sin abrir la interfaz y escribe los resultados en STDOUT.
+
+Uso:
+    python -m tinker_cli /ruta/al/proyecto consulta.php --format ndjson
+    echo "User::where('active', 1)->get()" | python -m tinker_cli /ruta/al/proyecto --format csv
+
+Lo que el fragmento imprime con echo va a STDERR; STDOUT queda solo para los
+datos pasados a formatOutput() o streamOutput().
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+from tinker_columns import cell_text
+from tinker_engine import ExecutionInterrupted, run_snippet, format_timing
+
+# Códigos de salida
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_TIMEOUT = 124
+
+
+def result_rows(result):
+    """Filas de un resultado: una lista se recorre y cualquier otro valor es una fila"""
+    if isinstance(result, list):
+        return result
+    return [result]
+
+
+class ResultWriter:
+    """
+    Escribe los resultados en el formato pedido. Las filas de streamOutput()
+    se escriben en cuanto llegan en NDJSON y CSV; en JSON se acumulan.
+
+    En CSV la cabecera de un resultado completo reúne las claves de todas sus
+    filas; en streaming la fija el primer lote y, si después llegan claves
+    nuevas, se descartan con un aviso en `errors`.
+    """
+
+    def __init__(self, output, output_format, errors=None):
+        self.output = output
+        self.format = output_format
+        self.errors = sys.stderr if errors is None else errors
+        self.results = []
+        self._csv = None
+        self._fields = None
+        self._warned = False
+        self._streamed = None
+
+    def write_rows(self, rows):
+        """Recibe un lote de filas en streaming"""
+        if self.format == 'json':
+            if self._streamed is None:
+                self._streamed = []
+                self.results.append(self._streamed)
+            self._streamed.extend(rows)
+            return
+        self._write_rows(rows)
+        self.output.flush()
+
+    def write_result(self, result):
+        """Recibe un resultado completo de formatOutput()"""
+        if self.format == 'json':
+            self.results.append(result)
+            return
+        self._write_rows(result_rows(result))
+        self.output.flush()
+
+    def _write_rows(self, rows):
+        if self.format == 'ndjson':
+            for row in rows:
+                self.output.write(json.dumps(row, ensure_ascii=False) + "\n")
+            return
+
+        rows = [row if isinstance(row, dict) else {'value': row} for row in rows]
+        if self._csv is None:
+            if not rows:
+                return
+            # Unión de las claves del lote, en el orden en que aparecen
+            fields = dict.fromkeys(key for row in rows for key in row)
+            self._fields = set(fields)
+            self._csv = csv.DictWriter(self.output, fieldnames=list(fields), extrasaction='ignore')
+            self._csv.writeheader()
+        for row in rows:
+            if not self._warned and not self._fields.issuperset(row):
+                extra = ", ".join(sorted(str(key) for key in set(row) - self._fields))
+                self.errors.write(f"Aviso: columnas que no están en la cabecera CSV, se descartan: {extra}\n")
+                self._warned = True
+            self._csv.writerow({key: cell_text(value) for key, value in row.items()})
+
+    def close(self):
+        if self.format == 'json':
+            data = self.results[0] if len(self.results) == 1 else self.results
+            json.dump(data, self.output, ensure_ascii=False, indent=2)
+            self.output.write("\n")
+        self.output.flush()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m tinker_cli",
+        description="Ejecuta un fragmento PHP contra un proyecto Laravel y escribe los resultados."
+    )
+    parser.add_argument("project", help="Directorio del proyecto Laravel")
+    parser.add_argument("snippet", nargs="?", default="-",
+                        help="Archivo con el fragmento PHP (por defecto, o con -, se lee de STDIN)")
+    parser.add_argument("-f", "--format", choices=("json", "ndjson", "csv"), default="json",
+                        help="Formato de salida (json por defecto)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Recorrer los listados con streamOutput() en lugar de cargarlos enteros")
+    transform = parser.add_mutually_exclusive_group()
+    transform.add_argument("--transform", dest="transform", action="store_true", default=None,
+                           help="Envolver expresiones de modelo en formatOutput() como la aplicación "
+                                "(por defecto sólo con STDIN)")
+    transform.add_argument("--no-transform", dest="transform", action="store_false",
+                           help="No transformar el fragmento leído de STDIN")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Tiempo máximo de reloj en segundos")
+    parser.add_argument("--memory-limit", default=None,
+                        help="memory_limit de PHP (p. ej. 512M)")
+    parser.add_argument("--timing", action="store_true",
+                        help="Escribir en STDERR el desglose de tiempos y las consultas SQL")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    try:
+        if args.snippet == "-":
+            code = sys.stdin.read()
+        else:
+            with open(args.snippet, encoding="utf-8") as f:
+                code = f.read()
+    except OSError as e:
+        sys.stderr.write(f"No se pudo leer el fragmento: {e}\n")
+        return EXIT_USAGE
+
+    code = code.strip()
+    if code.startswith("<?php"):
+        code = code[len("<?php"):].strip()
+    if not code:
+        sys.stderr.write("No hay código para ejecutar.\n")
+        return EXIT_USAGE
+
+    writer = ResultWriter(sys.stdout, args.format)
+    try:
+        envelope = run_snippet(
+            args.project,
+            code,
+            # Un archivo suele ser un script de varias sentencias que la transformación rompería
+            transform=args.snippet == "-" if args.transform is None else args.transform,
+            stream=args.stream,
+            on_output=sys.stderr.write,
+            on_error=sys.stderr.write,
+            on_rows=writer.write_rows,
+            timeout=args.timeout,
+            memory_limit=args.memory_limit
+        )
+    except ExecutionInterrupted as e:
+        sys.stderr.write(e.stdout + e.stderr + f"{e}\n")
+        return EXIT_TIMEOUT
+    except (RuntimeError, OSError) as e:
+        # Laravel no arrancó o no se encontró el ejecutable de PHP
+        sys.stderr.write(f"{e}\n")
+        return EXIT_ERROR
+
+    for result in envelope['results']:
+        writer.write_result(result)
+    writer.close()
+
+    sys.stderr.write(envelope['stdout'] + envelope['stderr'])
+    if args.timing:
+        sys.stderr.write(f"Tiempos: {format_timing(envelope['timing'])}\n")
+        if envelope['queries']:
+            sql_ms = sum(query['time'] or 0 for query in envelope['queries'])
+            sys.stderr.write(f"Consultas SQL: {len(envelope['queries'])} en {sql_ms:.1f} ms\n")
+
+    exception = envelope['exception']
+    if exception:
+        sys.stderr.write(f"Error: {exception['class']}: {exception['message']}\n"
+                         f"En archivo: {exception['file']} línea: {exception['line']}\n")
+        return EXIT_ERROR
+    if envelope['error']:
+        sys.stderr.write(f"Error fatal: {envelope['error']}\n")
+        return EXIT_ERROR
+    if envelope['status'] not in ('ok', 'exit'):
+        return EXIT_ERROR
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,780 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Almacenamiento columnar de resultados tabulares (listas de diccionarios).
+
+Cada columna guarda sus valores en un solo contenedor según su tipo: enteros,
+decimales y booleanos en un array de tipo fijo, cadenas codificadas por
+diccionario (o internadas si casi todas son distintas) y el resto en una lista.
+Los nulos y las claves ausentes se marcan aparte, sólo en las columnas que los
+tienen. Así las claves no se repiten por fila y los valores repetidos se
+guardan una vez.
+
+export_store escribe un almacenamiento en CSV, TSV o NDJSON (opcionalmente
+comprimidos con gzip) por bloques de filas, leyendo columna a columna.
+"""
+
+import csv
+import gzip
+import itertools
+import json
+import math
+import os
+import re
+import sys
+from array import array
+from operator import itemgetter
+
+
+class _Missing:
+    """Valor de una columna en una fila que no tiene esa clave"""
+
+    def __repr__(self):
+        return "MISSING"
+
+    def __bool__(self):
+        return False
+
+
+MISSING = _Missing()
+
+# Marcas por fila de las columnas con huecos
+_VALUE = 0
+_NULL = 1
+_ABSENT = 2
+
+# Una columna de cadenas deja de codificarse por diccionario si tiene más
+# distintas que esto y más de la mitad de sus filas son distintas
+STR_DICTIONARY_MAX = 65536
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+# Enteros que un double representa exactamente
+_FLOAT_EXACT = 2 ** 53
+_EMPTY_TYPES = (type(None), _Missing)
+_NUMBER_TYPES = {int, float}
+
+
+def _exact_in_float(numbers):
+    """Indica si todos los enteros de `numbers` caben sin pérdida en un double"""
+    numbers = [number for number in numbers if type(number) is int]
+    return not numbers or (-_FLOAT_EXACT <= min(numbers) and max(numbers) <= _FLOAT_EXACT)
+
+
+def _kind_of(types, values, has_gaps):
+    """Tipo de almacenamiento de un lote según los tipos de sus valores (sin contar nulos ni ausentes)"""
+    if not types:
+        return None
+    if types == _NUMBER_TYPES:
+        # Enteros y decimales mezclados (p. ej. un DECIMAL que llega como 5 y 5.5)
+        return 'float' if _exact_in_float(values) else 'object'
+    if len(types) > 1:
+        return 'object'
+    value_type = next(iter(types))
+    if value_type is bool:
+        return 'bool'
+    if value_type is int:
+        numbers = [value for value in values if type(value) is int] if has_gaps else values
+        if _INT64_MIN <= min(numbers) and max(numbers) <= _INT64_MAX:
+            return 'int'
+        return 'object'
+    if value_type is float:
+        return 'float'
+    if value_type is str:
+        return 'str'
+    return 'object'
+
+
+def _object_sort_key(value, text):
+    """Clave comparable para valores de tipos mezclados: números, cadenas, booleanos y estructuras"""
+    if isinstance(value, bool):
+        return (2, value, '')
+    if isinstance(value, (int, float)):
+        return (0, value, '')
+    if isinstance(value, str):
+        return (1, 0, value)
+    return (3, 0, text)
+
+
+def _safe_test(test, value):
+    try:
+        return bool(test(value))
+    except (TypeError, ValueError):
+        return False
+
+
+# Codificador reutilizado: json.dumps con opciones crea uno nuevo en cada llamada
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def cell_text(value):
+    """
+    Texto de una celda. Es el único aplanado de valores: lo usan la vista de
+    tabla, el filtro, la exportación a CSV/TSV y la línea de comandos. Nulos y
+    ausentes quedan vacíos, los booleanos como true/false (igual que dentro de
+    los valores anidados) y los objetos y listas como JSON.
+    """
+    if value is None or value is MISSING:
+        return ""
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, (dict, list)):
+        return _encode_json(value)
+    return str(value)
+
+
+class Column:
+    """
+    Valores de una columna. kind es None mientras no tenga ningún valor, o
+    'int', 'float', 'bool', 'str' (diccionario), 'text' (cadenas internadas)
+    u 'object'. Enteros y decimales juntos se guardan como 'float' y se
+    recuerda qué celdas eran enteras, para devolverlas como int (5 y no 5.0);
+    si llegan valores de otro tipo la columna pasa a 'object'.
+    """
+
+    def __init__(self, length=0):
+        self.kind = None
+        self.values = None
+        self.dictionary = None
+        self._codes = None
+        self.flags = None
+        # En una columna 'float' con enteros: 1 en las celdas que llegaron como int
+        self.int_cells = None
+        self.length = 0
+        # (filas, índices con valor ordenados, índices nulos o ausentes) del último orden calculado
+        self._sorted = None
+        # Texto de cada celda de una columna 'object', para buscar y ordenar estructuras
+        self._texts = None
+        if length:
+            self.extend([MISSING] * length)
+
+    def __len__(self):
+        return self.length
+
+    def get(self, index):
+        """Valor de la fila `index`: None si es nulo y MISSING si la fila no tiene la clave"""
+        if self.flags is not None and self.flags[index]:
+            return None if self.flags[index] == _NULL else MISSING
+        return self._raw(index)
+
+    def take(self, indices):
+        """Valores de las filas dadas, como get()"""
+        if self.flags is None and self.int_cells is None:
+            values = map(self.values.__getitem__, indices)
+            if self.kind == 'str':
+                return list(map(self.dictionary.__getitem__, values))
+            if self.kind == 'bool':
+                return list(map(bool, values))
+            return list(values)
+        return list(map(self.get, indices))
+
+    def _raw(self, index):
+        if self.kind == 'str':
+            return self.dictionary[self.values[index]]
+        if self.kind == 'bool':
+            return bool(self.values[index])
+        if self.int_cells is not None and self.int_cells[index]:
+            return int(self.values[index])
+        return self.values[index]
+
+    def _start(self, kind):
+        """Crea el contenedor de `kind` con huecos para las filas anteriores"""
+        self.kind = kind
+        if kind == 'int':
+            self.values = array('q', [0]) * self.length
+        elif kind == 'float':
+            self.values = array('d', [0.0]) * self.length
+        elif kind == 'bool':
+            self.values = array('b', [0]) * self.length
+        elif kind == 'str':
+            self.values = array('i', [0]) * self.length
+            self.dictionary = []
+            self._codes = {}
+        else:
+            self.values = [None] * self.length
+
+    def _to_list(self, kind):
+        """Pasa la columna a una lista de objetos ('text' u 'object')"""
+        self.values = [self._raw(index) for index in range(self.length)]
+        self.kind = kind
+        self.dictionary = None
+        self._codes = None
+        self.int_cells = None
+
+    def extend(self, values):
+        """
+        Añade un lote de valores (MISSING para las filas sin la clave)
+
+        Args:
+            values (list): Valores de las nuevas filas
+        """
+        self._sorted = None
+        self._texts = None
+        types = set(map(type, values))
+        has_gaps = bool(types.intersection(_EMPTY_TYPES))
+        types.difference_update(_EMPTY_TYPES)
+        kind = _kind_of(types, values, has_gaps)
+
+        if kind is not None:
+            if self.kind is None:
+                self._start(kind)
+            elif kind == 'int' and self.kind == 'float' and _exact_in_float(values):
+                pass
+            elif kind == 'float' and self.kind == 'int' and _exact_in_float(self.values):
+                self.values = array('d', self.values)
+                self.kind = 'float'
+                self.int_cells = bytearray([1]) * self.length
+            elif kind != self.kind and not (kind == 'str' and self.kind == 'text'):
+                self._to_list('object')
+
+        if has_gaps:
+            if self.flags is None:
+                self.flags = bytearray(self.length)
+            self.flags.extend(
+                _NULL if value is None else _ABSENT if value is MISSING else _VALUE for value in values
+            )
+        elif self.flags is not None:
+            self.flags.extend(bytes(len(values)))
+
+        if self.kind == 'str':
+            codes = self._codes
+            new_values = set(values)
+            new_values.difference_update(codes)
+            new_values.discard(None)
+            new_values.discard(MISSING)
+            distinct = len(codes) + len(new_values)
+            if distinct > STR_DICTIONARY_MAX and distinct > (self.length + len(values)) // 2:
+                # Casi todas distintas: el diccionario no ahorra nada
+                self._to_list('text')
+            else:
+                for value in new_values:
+                    codes[value] = len(self.dictionary)
+                    self.dictionary.append(value)
+                # Los nulos y ausentes no están en el diccionario: código 0
+                self.values.extend(map(codes.get, values, itertools.repeat(0)))
+                self.length += len(values)
+                return
+
+        if self.kind == 'float' and (self.int_cells is not None or int in types):
+            if self.int_cells is None:
+                self.int_cells = bytearray(self.length)
+            self.int_cells.extend(type(value) is int for value in values)
+        if self.kind in ('int', 'float', 'bool'):
+            if has_gaps:
+                empty = 0.0 if self.kind == 'float' else 0
+                values = [empty if value is None or value is MISSING else value for value in values]
+            self.values.extend(values)
+        elif self.kind == 'text':
+            if has_gaps:
+                self.values.extend(sys.intern(value) if type(value) is str else None for value in values)
+            else:
+                self.values.extend(map(sys.intern, values))
+        elif self.kind == 'object':
+            self.values.extend(None if value is MISSING else value for value in values)
+        self.length += len(values)
+
+    def sort_order(self, length):
+        """
+        Orden ascendente de las primeras `length` filas según claves que
+        respetan el tipo (números como números, cadenas por diccionario). Se
+        guarda y se reutiliza mientras la columna no crezca.
+
+        Returns:
+            tuple: (índices con valor ordenados, índices nulos o ausentes)
+        """
+        cached = self._sorted
+        if cached is not None and cached[0] == length:
+            return cached[1], cached[2]
+
+        flags = self.flags
+        if flags is None:
+            present = list(range(length))
+            empty = []
+        else:
+            present = [index for index in range(length) if not flags[index]]
+            empty = [index for index in range(length) if flags[index]]
+
+        values = self.values
+        if self.kind == 'str':
+            # Rango de cada código en el diccionario ordenado: se ordenan enteros, no cadenas
+            dictionary = self.dictionary
+            ranks = [0] * len(dictionary)
+            for rank, code in enumerate(sorted(range(len(dictionary)), key=dictionary.__getitem__)):
+                ranks[code] = rank
+            present.sort(key=list(map(ranks.__getitem__, values)).__getitem__)
+        elif self.kind == 'object':
+            keys = list(map(_object_sort_key, values, self.texts(length)))
+            present.sort(key=keys.__getitem__)
+        elif self.kind is not None:
+            present.sort(key=values.__getitem__)
+
+        self._sorted = (length, present, empty)
+        return present, empty
+
+    def matches(self, test, length):
+        """
+        Marca las primeras `length` filas con valor que cumplen `test`
+
+        Args:
+            test (callable): Recibe el valor de la celda y devuelve si coincide
+            length (int): Filas a comprobar
+
+        Returns:
+            bytearray: 1 en las filas que coinciden
+        """
+        if self.kind is None:
+            return bytearray(length)
+        if self.int_cells is not None:
+            values = map(self._raw, range(length))
+        else:
+            values = itertools.islice(self.values, length)
+        if self.kind == 'str':
+            # La prueba se hace una vez por valor distinto
+            hits = bytes(_safe_test(test, value) for value in self.dictionary)
+            mask = bytearray(map(hits.__getitem__, values))
+        elif self.kind == 'bool':
+            mask = bytearray(_safe_test(test, bool(value)) for value in values)
+        else:
+            mask = bytearray(_safe_test(test, value) for value in values)
+        if self.flags is not None:
+            for index, flag in enumerate(itertools.islice(self.flags, length)):
+                if flag:
+                    mask[index] = 0
+        return mask
+
+    def texts(self, length):
+        """Texto de las primeras `length` celdas de una columna 'object' (se guarda mientras no crezca)"""
+        if self._texts is None or len(self._texts) < length:
+            self._texts = list(map(cell_text, itertools.islice(self.values, length)))
+        return self._texts
+
+    def contains(self, needle, length):
+        """
+        Marca las primeras `length` filas cuyo texto contiene `needle`
+
+        Args:
+            needle (str): Texto buscado, ya en minúsculas (casefold)
+            length (int): Filas a comprobar
+
+        Returns:
+            bytearray: 1 en las filas que coinciden
+        """
+        if self.kind == 'object':
+            mask = bytearray(needle in text.casefold() for text in itertools.islice(self.texts(length), length))
+            if self.flags is not None:
+                for index, flag in enumerate(itertools.islice(self.flags, length)):
+                    if flag:
+                        mask[index] = 0
+            return mask
+        return self.matches(lambda value: needle in cell_text(value).casefold(), length)
+
+    def flagged(self, flag, length):
+        """Marca las primeras `length` filas con la marca dada (_VALUE, _NULL o _ABSENT)"""
+        if self.flags is None:
+            return bytearray([flag == _VALUE]) * length
+        return bytearray(value == flag for value in itertools.islice(self.flags, length))
+
+    def estimate_bytes(self):
+        """Tamaño aproximado de la columna en memoria"""
+        size = len(self.flags) if self.flags is not None else 0
+        size += len(self.int_cells) if self.int_cells is not None else 0
+        if self.kind in ('int', 'float', 'bool', 'str'):
+            size += len(self.values) * self.values.itemsize
+        if self.kind == 'str':
+            size += estimate_bytes(self.dictionary)
+        elif self.kind in ('text', 'object'):
+            size += estimate_bytes(self.values)
+        return size
+
+    def stats(self):
+        """
+        Resumen de la columna
+
+        Returns:
+            dict: tipo, valores, nulos, ausentes, distintos, mínimo, máximo y media
+        """
+        nulls = absent = 0
+        if self.flags is not None:
+            nulls = self.flags.count(_NULL)
+            absent = self.flags.count(_ABSENT)
+        result = {
+            'tipo': self.kind or 'null',
+            'valores': self.length - nulls - absent,
+            'nulos': nulls,
+            'ausentes': absent,
+            'distintos': None,
+            'mínimo': None,
+            'máximo': None,
+            'media': None,
+        }
+        if self.kind is None or self.kind == 'object':
+            return result
+
+        if self.flags is None:
+            present = self.values
+        else:
+            present = [self.values[index] for index, flag in enumerate(self.flags) if not flag]
+        if not present:
+            return result
+
+        if self.kind == 'str':
+            used = set(present)
+            result['distintos'] = len(used)
+            words = sorted(self.dictionary[code] for code in used)
+            result['mínimo'], result['máximo'] = words[0], words[-1]
+            return result
+
+        result['distintos'] = len(set(present))
+        if self.kind == 'bool':
+            result['mínimo'], result['máximo'] = bool(min(present)), bool(max(present))
+            return result
+        result['mínimo'], result['máximo'] = min(present), max(present)
+        if self.int_cells is not None:
+            # Mínimo y máximo tal como llegaron (int si la celda era entera)
+            indices = [index for index in range(self.length) if self.flags is None or not self.flags[index]]
+            result['mínimo'] = self._raw(min(indices, key=self.values.__getitem__))
+            result['máximo'] = self._raw(max(indices, key=self.values.__getitem__))
+        if self.kind in ('int', 'float'):
+            total = math.fsum(present)
+            result['media'] = round(total / len(present), 6)
+        return result
+
+
+class ColumnStore:
+    """
+    Resultado tabular guardado por columnas. Se comporta como una secuencia
+    de filas (store[i] reconstruye el diccionario) para el código que sólo
+    necesita recorrerlas, y ofrece value() para leer una celda sin crear la fila.
+    """
+
+    def __init__(self):
+        # Columnas en el orden en que aparecen por primera vez
+        self.columns = []
+        self._columns = {}
+        self.length = 0
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Args:
+            rows (list): Lista de diccionarios
+
+        Returns:
+            ColumnStore: Resultado por columnas
+        """
+        store = cls()
+        store.extend(rows)
+        return store
+
+    @staticmethod
+    def is_tabular(data):
+        """True si data es una lista no vacía de diccionarios"""
+        return isinstance(data, list) and bool(data) and all(isinstance(row, dict) for row in data)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        return self.row(index)
+
+    def __iter__(self):
+        for index in range(self.length):
+            yield self.row(index)
+
+    def extend(self, rows):
+        """
+        Añade filas (diccionarios); las claves nuevas crean columnas al final
+
+        Raises:
+            TypeError: Si alguna fila no es un diccionario (comprobar antes con is_tabular)
+        """
+        if not rows:
+            return
+        if not all(isinstance(row, dict) for row in rows):
+            raise TypeError("Las filas de un ColumnStore deben ser diccionarios")
+        for key in dict.fromkeys(itertools.chain.from_iterable(rows)):
+            if key not in self._columns:
+                self._columns[key] = Column(self.length)
+                self.columns.append(key)
+        for key, column in self._columns.items():
+            try:
+                values = list(map(itemgetter(key), rows))
+            except KeyError:
+                values = [row.get(key, MISSING) for row in rows]
+            column.extend(values)
+        self.length += len(rows)
+
+    def value(self, index, column):
+        """Valor de una celda: None si es nulo, MISSING si la fila no tiene la columna"""
+        stored = self._columns.get(column)
+        if stored is None:
+            return MISSING
+        return stored.get(index)
+
+    def row(self, index):
+        """Fila `index` como diccionario, sin las claves ausentes"""
+        row = {}
+        for key, column in self._columns.items():
+            value = column.get(index)
+            if value is not MISSING:
+                row[key] = value
+        return row
+
+    def to_rows(self):
+        """Lista de diccionarios equivalente (p. ej. para serializar a JSON)"""
+        return [self.row(index) for index in range(self.length)]
+
+    def filter_mask(self, text, length=None):
+        """
+        Filas que cumplen un filtro: una expresión (ver parse_filter) o, si no
+        lo es, una subcadena buscada sin distinguir mayúsculas en todas las columnas
+
+        Args:
+            text (str): Texto del filtro
+            length (int): Filas a considerar (por defecto todas)
+
+        Returns:
+            bytearray: 1 en las filas que cumplen el filtro
+        """
+        length = self.length if length is None else length
+        conditions = parse_filter(text, self.columns)
+        if conditions is None:
+            needle = text.strip().casefold()
+            mask = bytearray(length)
+            for column in self._columns.values():
+                hits = column.contains(needle, length)
+                mask = bytearray(map(max, mask, hits))
+            return mask
+
+        mask = None
+        for name, operator, value, raw in conditions:
+            column = self._columns[name]
+            if value is None and operator in ('=', '==', '!='):
+                # `= null` y `!= null` miran las marcas de nulo
+                hits = column.flagged(_NULL, length)
+                if operator == '!=':
+                    hits = column.flagged(_VALUE, length)
+            elif operator == '~':
+                hits = column.contains(raw.strip('"').casefold(), length)
+            elif operator in ('=', '==', '!='):
+                def equal(cell, value=value, raw=raw):
+                    return cell == value or cell_text(cell) == raw
+                hits = column.matches(equal, length)
+                if operator == '!=':
+                    present = column.flagged(_VALUE, length)
+                    hits = bytearray(has and not hit for has, hit in zip(present, hits))
+            else:
+                compare = _COMPARISONS[operator]
+                hits = column.matches(lambda cell, value=value: compare(cell, value), length)
+            mask = hits if mask is None else bytearray(map(min, mask, hits))
+        return mask
+
+    def view_order(self, sort_column=None, descending=False, filter_text='', length=None):
+        """
+        Índices de las filas a mostrar, filtradas y ordenadas. Los nulos y
+        ausentes quedan al final en los dos sentidos.
+
+        Args:
+            sort_column (str): Columna por la que ordenar (None = orden original)
+            descending (bool): Orden descendente
+            filter_text (str): Filtro (ver filter_mask); vacío = sin filtro
+            length (int): Filas a considerar (por defecto todas; permite
+                trabajar sobre una instantánea mientras llegan filas)
+
+        Returns:
+            list: Índices de fila, o None si no hay ni orden ni filtro
+        """
+        length = self.length if length is None else length
+        mask = self.filter_mask(filter_text, length) if filter_text.strip() else None
+        column = self._columns.get(sort_column) if sort_column is not None else None
+
+        if column is None:
+            if mask is None:
+                return None
+            return list(itertools.compress(range(length), mask))
+
+        present, empty = column.sort_order(length)
+        order = (present[::-1] if descending else present) + empty
+        if mask is not None:
+            order = [index for index in order if mask[index]]
+        return order
+
+    def column_stats(self):
+        """
+        Returns:
+            list: Un diccionario de estadísticas por columna (ver Column.stats)
+        """
+        stats = []
+        for key in self.columns:
+            entry = {'columna': key}
+            entry.update(self._columns[key].stats())
+            stats.append(entry)
+        return stats
+
+
+# Condición de un filtro: columna, operador y valor (p. ej. `total >= 100`, `email ~ gmail`)
+_FILTER_CONDITION = re.compile(r'^\s*(`[^`]+`|[^\s=!<>~]+)\s*(==|=|!=|>=|<=|>|<|~)\s*(.*?)\s*$', re.S)
+_FILTER_AND = re.compile(r'\s+(?:and|y|&&)\s+', re.I)
+
+
+def parse_filter(text, columns):
+    """
+    Interpreta un filtro como expresión: condiciones `columna operador valor`
+    unidas con and/y/&&. Operadores: = == != > >= < <= y ~ (contiene). El
+    valor se lee como literal JSON si lo es (números, true, false, null,
+    "cadena"); si no, como texto.
+
+    Args:
+        text (str): Texto del filtro
+        columns (list): Columnas existentes
+
+    Returns:
+        list: Tuplas (columna, operador, valor, texto del valor), o None si el
+        texto no es una expresión válida (entonces se busca como subcadena)
+    """
+    conditions = []
+    for part in _FILTER_AND.split(text.strip()):
+        match = _FILTER_CONDITION.match(part)
+        if not match:
+            return None
+        column, operator, raw = match.groups()
+        column = column.strip('`')
+        if column not in columns:
+            return None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        conditions.append((column, operator, value, raw))
+    return conditions or None
+
+
+_COMPARISONS = {
+    '>': lambda cell, value: cell > value,
+    '>=': lambda cell, value: cell >= value,
+    '<': lambda cell, value: cell < value,
+    '<=': lambda cell, value: cell <= value,
+}
+
+
+def estimate_bytes(value, sample=64):
+    """
+    Tamaño aproximado en memoria de un valor sin recorrerlo entero: los
+    arrays por su longitud y las listas y diccionarios grandes por una
+    muestra de `sample` elementos (menor en cada nivel de anidación)
+
+    Returns:
+        int: Bytes estimados
+    """
+    if isinstance(value, ColumnStore):
+        return sum(column.estimate_bytes() for column in value._columns.values())
+    if isinstance(value, str):
+        return 50 + len(value)
+    if isinstance(value, (list, dict)):
+        count = len(value)
+        if not count:
+            return 64
+        inner = max(sample // 4, 1)
+        if isinstance(value, dict):
+            picked = itertools.islice(value.items(), sample)
+            sizes = [estimate_bytes(key, inner) + estimate_bytes(item, inner) for key, item in picked]
+        else:
+            step = max(count // sample, 1)
+            sizes = [estimate_bytes(item, inner) for item in itertools.islice(value, 0, None, step)][:sample]
+        return 64 + 8 * count + sum(sizes) * count // len(sizes)
+    return 32
+
+
+def json_default(value):
+    """Función default de json.dump para valores que no son JSON nativo"""
+    if isinstance(value, ColumnStore):
+        return value.to_rows()
+    return str(value)
+
+
+# Formato de exportación según la extensión del archivo (sin .gz)
+EXPORT_FORMATS = {'.csv': 'csv', '.tsv': 'tsv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+# Filas que se escriben por bloque; tras cada bloque se informa del progreso
+EXPORT_CHUNK_ROWS = 5000
+
+_encode_json_row = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=json_default).encode
+
+
+def export_format(path):
+    """
+    Formato de exportación de un archivo según su extensión
+
+    Returns:
+        tuple: ('csv', 'tsv' o 'ndjson', si va comprimido con gzip); CSV si la extensión no se conoce
+    """
+    base, extension = os.path.splitext(path.lower())
+    compressed = extension == '.gz'
+    if compressed:
+        extension = os.path.splitext(base)[1]
+    return EXPORT_FORMATS.get(extension, 'csv'), compressed
+
+
+def export_store(store, path, columns=None, indices=None, progress=None, cancel=None):
+    """
+    Escribe filas de un almacenamiento en un archivo CSV, TSV o NDJSON según
+    su extensión (.csv, .tsv, .ndjson/.jsonl, con .gz para comprimir). Se
+    escribe en un archivo temporal junto al destino que sólo lo sustituye al
+    terminar; si se cancela o falla, se borra.
+
+    Args:
+        store (ColumnStore): Datos
+        path (str): Archivo de destino
+        columns (list): Columnas en el orden de salida (por defecto todas, ordenadas)
+        indices (list): Índices de las filas a escribir, en orden (por defecto todas)
+        progress (callable): progress(filas escritas, total) tras cada bloque
+        cancel (threading.Event): Si se activa, la exportación se detiene
+
+    Returns:
+        int: Filas escritas, o None si se canceló
+    """
+    columns = sorted(store.columns) if columns is None else list(columns)
+    indices = range(len(store)) if indices is None else indices
+    total = len(indices)
+    file_format, compressed = export_format(path)
+    partial = path + ".part"
+    opener = gzip.open if compressed else open
+
+    try:
+        with opener(partial, 'wt', encoding='utf-8', newline='') as f:
+            writer = None
+            if file_format != 'ndjson':
+                writer = csv.writer(f, dialect='excel-tab' if file_format == 'tsv' else 'excel')
+                writer.writerow(columns)
+            for start in range(0, total, EXPORT_CHUNK_ROWS):
+                if cancel is not None and cancel.is_set():
+                    break
+                chunk = indices[start:start + EXPORT_CHUNK_ROWS]
+                cells = [store._columns[column].take(chunk) for column in columns]
+                if writer is not None:
+                    writer.writerows(zip(*[list(map(cell_text, values)) for values in cells]))
+                else:
+                    f.write("".join(
+                        _encode_json_row({
+                            column: value for column, value in zip(columns, row) if value is not MISSING
+                        }) + "\n"
+                        for row in zip(*cells)
+                    ))
+                if progress is not None:
+                    progress(min(start + EXPORT_CHUNK_ROWS, total), total)
+        if cancel is not None and cancel.is_set():
+            os.remove(partial)
+            return None
+        os.replace(partial, path)
+        return total
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
@@ -0,0 +1,2064 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Motor de ejecución de Laravel Tinker Tool, sin dependencias de interfaz.
+
+Contiene el worker PHP persistente y su pool, la transformación de fragmentos,
+la decodificación del sobre de resultados y las utilidades de análisis
+(consultas SQL, EXPLAIN, benchmark). Lo usan la aplicación de escritorio y la
+línea de comandos (tinker_cli).
+"""
+
+import os
+import subprocess
+import threading
+import queue
+import re
+import io
+import json
+import math
+import time
+import tempfile
+import hashlib
+import itertools
+import signal
+import collections
+
+from tinker_columns import ColumnStore, MISSING, json_default
+
+
+# Script PHP del worker persistente. Arranca Laravel una sola vez y ejecuta los
+# fragmentos que recibe por STDIN (un trabajo JSON por línea). Cada respuesta es
+# una línea JSON en STDOUT: lo que el fragmento imprime llega en tramas "out"
+# por líneas completas, las filas de streamOutput() en tramas "rows" y el
+# trabajo se cierra con una trama "done" que lleva los datos pasados a
+# formatOutput(), las consultas SQL ejecutadas, la excepción, los tiempos y la
+# memoria pico. Los avisos de PHP van a STDERR.
+WORKER_PHP_SCRIPT = r'''<?php
+ini_set('display_errors', 'stderr');
+ini_set('display_startup_errors', 1);
+error_reporting(E_ALL);
+
+$__tinker_base = $argv[1];
+// Con --once el proceso termina tras el primer trabajo
+$__tinker_once = in_array('--once', $argv, true);
+chdir($__tinker_base);
+
+function __tinker_encode(array $frame) {
+    $flags = JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES | JSON_PARTIAL_OUTPUT_ON_ERROR;
+    if (defined('JSON_INVALID_UTF8_SUBSTITUTE')) {
+        $flags |= JSON_INVALID_UTF8_SUBSTITUTE;
+    }
+    return json_encode($frame, $flags);
+}
+
+function __tinker_write($json) {
+    fwrite(STDOUT, $json . "\n");
+    fflush(STDOUT);
+}
+
+function __tinker_emit(array $frame) {
+    __tinker_write(__tinker_encode($frame));
+}
+
+// Manejador de salida del fragmento: reenvía las líneas completas en cuanto se escriben
+function __tinker_stream_output($buffer, $phase) {
+    static $pending = '';
+    global $__tinker_job;
+
+    $pending .= $buffer;
+    if (($phase & PHP_OUTPUT_HANDLER_FINAL) || strlen($pending) >= 65536) {
+        $chunk = $pending;
+        $pending = '';
+    } else {
+        $cut = strrpos($pending, "\n");
+        if ($cut === false) {
+            return '';
+        }
+        $chunk = substr($pending, 0, $cut + 1);
+        $pending = (string) substr($pending, $cut + 1);
+    }
+
+    if ($chunk !== '' && $__tinker_job !== null) {
+        __tinker_emit(['type' => 'out', 'id' => $__tinker_job['id'], 'data' => $chunk]);
+    }
+    return '';
+}
+
+function __tinker_flush_output($level) {
+    while (ob_get_level() > $level) {
+        ob_end_flush();
+    }
+}
+
+function __tinker_finish($frame) {
+    global $__tinker_serialize_seconds;
+    // Marca en STDERR para que Python sepa que ya recibió todos los avisos del trabajo
+    fwrite(STDERR, "\0__tinker_done__\n");
+    fflush(STDERR);
+
+    // El tiempo de serialización y la hora de envío se añaden al JSON ya codificado
+    $started = microtime(true);
+    $json = __tinker_encode($frame);
+    $serialize_ms = ($__tinker_serialize_seconds + microtime(true) - $started) * 1000;
+    __tinker_write(substr($json, 0, -1)
+        . ',"serialize_ms":' . round($serialize_ms, 3)
+        . ',"sent_at":' . sprintf('%.6F', microtime(true)) . '}');
+}
+
+$__tinker_boot_started = microtime(true);
+try {
+    require $__tinker_base.'/vendor/autoload.php';
+    $app = require_once $__tinker_base.'/bootstrap/app.php';
+    $kernel = $app->make(Illuminate\Contracts\Console\Kernel::class);
+    $kernel->bootstrap();
+} catch (\Throwable $e) {
+    __tinker_emit([
+        'type' => 'boot_error',
+        'message' => "Error al inicializar Laravel: " . $e->getMessage() . "\nEn archivo: " . $e->getFile() . " línea: " . $e->getLine(),
+    ]);
+    exit(1);
+}
+
+// Los datos estructurados viajan en la trama "done"; los escalares se imprimen
+function formatOutput($data) {
+    global $__tinker_results;
+    if (is_object($data) && method_exists($data, 'toArray')) {
+        $__tinker_results[] = $data->toArray();
+    } elseif ($data instanceof JsonSerializable) {
+        $__tinker_results[] = $data->jsonSerialize();
+    } elseif (is_object($data) && method_exists($data, 'toJson')) {
+        $__tinker_results[] = json_decode($data->toJson(), true);
+    } elseif (is_array($data)) {
+        $__tinker_results[] = $data;
+    } else {
+        return var_export($data, true);
+    }
+    return '';
+}
+
+// Filas de streamOutput() que se envían juntas en una trama "rows"
+const __TINKER_ROWS_BATCH = 500;
+const __TINKER_ROWS_INTERVAL = 0.05;
+
+function __tinker_row($row) {
+    if ($row instanceof Illuminate\Contracts\Support\Arrayable) {
+        return $row->toArray();
+    }
+    if ($row instanceof JsonSerializable) {
+        $row = $row->jsonSerialize();
+    }
+    if (is_object($row)) {
+        return get_object_vars($row);
+    }
+    return is_array($row) ? $row : ['value' => $row];
+}
+
+function __tinker_emit_rows(array $rows) {
+    global $__tinker_job, $__tinker_streamed, $__tinker_serialize_seconds;
+    $__tinker_streamed += count($rows);
+    $started = microtime(true);
+    $json = __tinker_encode(['type' => 'rows', 'id' => $__tinker_job['id'], 'rows' => $rows]);
+    $__tinker_serialize_seconds += microtime(true) - $started;
+    __tinker_write($json);
+}
+
+// Modo streaming: recorre la consulta por partes (lazyById/lazy/cursor) y
+// envía las filas en tramas "rows" sin cargar el resultado completo en memoria
+function streamOutput($source, $chunkSize = 1000) {
+    if (is_string($source) && class_exists($source)) {
+        $source = $source::query();
+    }
+
+    $orders = null;
+    if ($source instanceof Illuminate\Database\Eloquent\Builder) {
+        $orders = $source->getQuery()->orders;
+    } elseif ($source instanceof Illuminate\Database\Query\Builder) {
+        $orders = $source->orders;
+    }
+
+    if ($orders !== null && empty($orders) && method_exists($source, 'lazyById')) {
+        // Paginación por clave: no se degrada con OFFSET en tablas grandes
+        $rows = $source->lazyById($chunkSize);
+    } elseif (is_object($source) && method_exists($source, 'lazy')) {
+        $rows = $source->lazy($chunkSize);
+    } elseif (is_object($source) && method_exists($source, 'cursor')) {
+        $rows = $source->cursor();
+    } elseif (is_iterable($source)) {
+        $rows = $source;
+    } else {
+        $rows = [$source];
+    }
+
+    $batch = [];
+    $flushed = microtime(true);
+    foreach ($rows as $row) {
+        $batch[] = __tinker_row($row);
+        if (count($batch) >= __TINKER_ROWS_BATCH || microtime(true) - $flushed >= __TINKER_ROWS_INTERVAL) {
+            __tinker_emit_rows($batch);
+            $batch = [];
+            $flushed = microtime(true);
+        }
+    }
+    if ($batch) {
+        __tinker_emit_rows($batch);
+    }
+    return '';
+}
+
+$__tinker_job = null;
+$__tinker_level = ob_get_level();
+$__tinker_results = [];
+$__tinker_streamed = 0;
+$__tinker_started = 0.0;
+$__tinker_code_ms = null;
+$__tinker_serialize_seconds = 0.0;
+$__tinker_queries = [];
+$__tinker_queries_dropped = 0;
+// Con false las consultas sólo se cuentan (sin SQL, bindings ni backtrace), p. ej. al medir un benchmark
+$__tinker_capture_queries = true;
+
+// Registro de consultas SQL del fragmento (equivale a DB::listen, sin abrir la conexión por defecto)
+const __TINKER_QUERY_LIMIT = 5000;
+
+function __tinker_binding($value) {
+    if ($value instanceof DateTimeInterface) {
+        return $value->format('Y-m-d H:i:s');
+    }
+    if (is_object($value)) {
+        return method_exists($value, '__toString') ? (string) $value : get_class($value);
+    }
+    if (is_resource($value)) {
+        return '(resource)';
+    }
+    if (is_string($value) && strlen($value) > 1000) {
+        return substr($value, 0, 1000) . '...';
+    }
+    return $value;
+}
+
+// Línea del fragmento que lanzó la consulta y relación cargada de forma diferida, si la hay
+function __tinker_query_origin() {
+    $origin = ['line' => null, 'relation' => null];
+    foreach (debug_backtrace(DEBUG_BACKTRACE_PROVIDE_OBJECT, 80) as $frame) {
+        if ($origin['relation'] === null && isset($frame['function'], $frame['object'], $frame['args'][0])
+            && $frame['function'] === 'getRelationshipFromMethod') {
+            $origin['relation'] = ['model' => get_class($frame['object']), 'name' => $frame['args'][0]];
+        }
+        if (isset($frame['file']) && strpos($frame['file'], "eval()'d code") !== false) {
+            $origin['line'] = $frame['line'];
+            break;
+        }
+    }
+    return $origin;
+}
+
+$app['events']->listen(Illuminate\Database\Events\QueryExecuted::class, function ($query) {
+    global $__tinker_job, $__tinker_queries, $__tinker_queries_dropped, $__tinker_capture_queries;
+    if ($__tinker_job === null) {
+        return;
+    }
+    if (!$__tinker_capture_queries || count($__tinker_queries) >= __TINKER_QUERY_LIMIT) {
+        $__tinker_queries_dropped++;
+        return;
+    }
+    $__tinker_queries[] = [
+        'sql' => $query->sql,
+        'bindings' => array_map('__tinker_binding', $query->bindings),
+        'time' => $query->time,
+        'connection' => $query->connectionName,
+    ] + __tinker_query_origin();
+});
+
+// Cada fragmento se evalúa en el ámbito nuevo de esta función: sus variables
+// no pasan a la siguiente ejecución (que puede caer en otro worker del pool) ni
+// pueden pisar $app, $kernel o el estado $__tinker_* del bucle
+function __tinker_eval($__tinker_code) {
+    return eval($__tinker_code);
+}
+
+function __tinker_done_frame($status, array $extra) {
+    global $__tinker_job, $__tinker_results, $__tinker_streamed, $__tinker_started, $__tinker_code_ms;
+    global $__tinker_queries, $__tinker_queries_dropped;
+    return array_merge([
+        'type' => 'done',
+        'id' => $__tinker_job['id'],
+        'status' => $status,
+        'results' => $__tinker_results,
+        'streamed' => $__tinker_streamed,
+        'queries' => $__tinker_queries,
+        'queries_dropped' => $__tinker_queries_dropped,
+        'exception' => null,
+        'error' => null,
+        'code_ms' => $__tinker_code_ms !== null ? $__tinker_code_ms : round((microtime(true) - $__tinker_started) * 1000, 3),
+        'memory_peak' => memory_get_peak_usage(true),
+    ], $extra);
+}
+
+// exit(), dd() o un error fatal dentro del fragmento terminan el proceso:
+// cerrar el trabajo en curso antes de morir para que Python no quede esperando
+register_shutdown_function(function () {
+    global $__tinker_job, $__tinker_level;
+    if ($__tinker_job === null) {
+        return;
+    }
+    $error = error_get_last();
+    $fatal = $error && in_array($error['type'], [E_ERROR, E_PARSE, E_CORE_ERROR, E_COMPILE_ERROR], true);
+    __tinker_flush_output($__tinker_level);
+    __tinker_finish(__tinker_done_frame($fatal ? 'fatal' : 'exit', [
+        'error' => $fatal ? $error['message'] . " en " . $error['file'] . " línea " . $error['line'] : null,
+    ]));
+});
+
+__tinker_emit(['type' => 'ready', 'pid' => getmypid(), 'boot_ms' => round((microtime(true) - $__tinker_boot_started) * 1000, 3)]);
+
+while (($__tinker_line = fgets(STDIN)) !== false) {
+    $__tinker_job = json_decode($__tinker_line, true);
+    if (!is_array($__tinker_job) || !isset($__tinker_job['code'])) {
+        $__tinker_job = null;
+        continue;
+    }
+
+    $__tinker_memory_limit = ini_get('memory_limit');
+    if (!empty($__tinker_job['memory_limit'])) {
+        ini_set('memory_limit', $__tinker_job['memory_limit']);
+    }
+
+    if (function_exists('memory_reset_peak_usage')) {
+        memory_reset_peak_usage();
+    }
+    $__tinker_results = [];
+    $__tinker_streamed = 0;
+    $__tinker_queries = [];
+    $__tinker_queries_dropped = 0;
+    $__tinker_capture_queries = true;
+    $__tinker_exception = null;
+    $__tinker_code_ms = null;
+    $__tinker_serialize_seconds = 0.0;
+    $__tinker_started = microtime(true);
+
+    ob_start('__tinker_stream_output', 1);
+    try {
+        __tinker_eval($__tinker_job['code']);
+    } catch (\Throwable $e) {
+        $__tinker_exception = [
+            'class' => get_class($e),
+            'message' => $e->getMessage(),
+            'file' => $e->getFile(),
+            'line' => $e->getLine(),
+        ];
+    }
+    $__tinker_code_ms = round((microtime(true) - $__tinker_started) * 1000, 3);
+
+    __tinker_flush_output($__tinker_level);
+    __tinker_finish(__tinker_done_frame($__tinker_exception ? 'exception' : 'ok', [
+        'exception' => $__tinker_exception,
+    ]));
+    ini_set('memory_limit', $__tinker_memory_limit);
+    $__tinker_job = null;
+    if ($__tinker_once) {
+        break;
+    }
+}
+'''
+
+# Marca que el worker escribe en STDERR al terminar cada trabajo
+WORKER_DONE_MARKER = "\0__tinker_done__"
+
+# Clases que no son modelos y no necesitan importación de App\Models
+NON_MODEL_CLASSES = {'DB', 'Schema', 'Route', 'Auth', 'Storage', 'Config', 'Log', 'Cache', 'View',
+                     'Response', 'Request'}
+
+# Facades importadas en todos los fragmentos
+FACADE_IMPORTS = ['DB', 'Schema', 'Auth', 'Route', 'Storage', 'Cache', 'Config', 'Log']
+
+
+def build_use_statements(code):
+    """
+    Genera las sentencias use de facades y modelos detectados en el código
+
+    Args:
+        code (str): Código del usuario
+
+    Returns:
+        str: Sentencias use, una por línea
+    """
+    # Extraer posibles nombres de modelos del código
+    model_names = set(re.findall(r'([A-Z][A-Za-z0-9_]*)::', code))
+    model_names = {model for model in model_names if model not in NON_MODEL_CLASSES}
+
+    lines = [f"use Illuminate\\Support\\Facades\\{facade};" for facade in FACADE_IMPORTS]
+    lines.extend(f"use App\\Models\\{model};" for model in sorted(model_names))
+    return "\n".join(lines) + "\n"
+
+
+def ensure_worker_script():
+    """
+    Escribe el script del worker en el directorio temporal del sistema (una vez
+    por versión del script) y devuelve su ruta
+    """
+    digest = hashlib.sha1(WORKER_PHP_SCRIPT.encode('utf-8')).hexdigest()[:12]
+    script_path = os.path.join(tempfile.gettempdir(), f"py_tinker_worker_{digest}.php")
+    if not os.path.exists(script_path):
+        fd, tmp_path = tempfile.mkstemp(suffix='.php', dir=tempfile.gettempdir())
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(WORKER_PHP_SCRIPT)
+        os.replace(tmp_path, script_path)
+    return script_path
+
+
+# Argumentos de Popen para que el proceso PHP y sus hijos formen un grupo que
+# se pueda terminar de una vez
+if os.name == 'nt':
+    PROCESS_GROUP_KWARGS = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    PROCESS_GROUP_KWARGS = {'start_new_session': True}
+
+
+def php_command(args, memory_limit=None):
+    """
+    Línea de comandos de PHP con el memory_limit indicado
+    """
+    command = ['php']
+    if memory_limit:
+        command.extend(['-d', f'memory_limit={memory_limit}'])
+    return command + list(args)
+
+
+def kill_process_tree(process):
+    """
+    Termina un proceso lanzado con PROCESS_GROUP_KWARGS junto con todos sus hijos
+    """
+    if process is None or process.poll() is not None:
+        return
+    try:
+        if os.name == 'nt':
+            subprocess.run(
+                ['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        process.kill()
+
+
+class ExecutionInterrupted(Exception):
+    """
+    La ejecución se detuvo por tiempo máximo o por cancelación.
+    Conserva la salida parcial que no se entregó por partes.
+    """
+
+    MESSAGES = {
+        'timeout': "Tiempo máximo de ejecución superado; proceso PHP detenido.",
+        'cancelled': "Ejecución cancelada; proceso PHP detenido.",
+    }
+
+    def __init__(self, reason, stdout='', stderr=''):
+        super().__init__(self.MESSAGES.get(reason, reason))
+        self.reason = reason
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+def make_envelope(status, stdout='', stderr='', frame=None):
+    """
+    Sobre con el resultado de un trabajo, a partir de la trama "done" del worker
+
+    Args:
+        status (str): 'ok', 'exception', 'exit', 'fatal' o 'crash'
+        stdout (str): Salida impresa que no se entregó por partes
+        stderr (str): Avisos de PHP que no se entregaron por partes
+        frame (dict): Trama "done" ya decodificada, si la hubo
+    """
+    frame = frame or {}
+    return {
+        'status': status,
+        'stdout': stdout,
+        'stderr': stderr,
+        'results': frame.get('results') or [],
+        'streamed': frame.get('streamed') or 0,
+        'queries': frame.get('queries') or [],
+        'queries_dropped': frame.get('queries_dropped') or 0,
+        'exception': frame.get('exception'),
+        'error': frame.get('error'),
+        'code_ms': frame.get('code_ms'),
+        'memory_peak': frame.get('memory_peak'),
+        'timing': {},
+    }
+
+
+def project_fingerprint(project_path):
+    """
+    Huella de los archivos que invalidan un Laravel ya arrancado:
+    .env, composer.lock y todo lo que hay en config/
+
+    Returns:
+        tuple: (ruta, mtime, tamaño) de cada archivo relevante
+    """
+    entries = []
+    candidates = [os.path.join(project_path, '.env'), os.path.join(project_path, 'composer.lock')]
+    for root, _dirs, files in os.walk(os.path.join(project_path, 'config')):
+        candidates.extend(os.path.join(root, name) for name in files)
+
+    for path in sorted(candidates):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+class TinkerWorker:
+    """
+    Proceso PHP persistente con Laravel ya arrancado para un proyecto.
+
+    Se reinicia solo cuando el proceso muere o cuando cambian .env,
+    config/ o composer.lock. php_binary puede ser una lista (p. ej. un
+    intérprete y un script que imite a PHP en los benchmarks).
+    """
+
+    # Segundos entre comprobaciones del vigilante
+    WATCH_INTERVAL = 2.0
+
+    def __init__(self, project_path, php_binary='php', once=False):
+        self.project_path = project_path
+        self.php_binary = php_binary
+        self.once = once
+        self.process = None
+        self.fingerprint = None
+        self.boot_seconds = None
+        self.boot_ms = None
+        # Milisegundos desde lanzar el proceso hasta que PHP empieza a arrancar Laravel
+        self.spawn_ms = None
+        self.starts = 0
+        self._lock = threading.Lock()
+        self._stderr_lines = []
+        self._stderr_done = threading.Event()
+        self._on_stderr = None
+        self._interrupt_reason = None
+        self._next_id = 0
+        self._stopped = False
+        self._stdin = None
+        # Contadores del trabajo en curso (bytes leídos, segundos en json.loads)
+        self._bytes_read = 0
+        self._parse_seconds = 0.0
+        self._last_read_at = None
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """
+        Lanza el proceso PHP y espera a que Laravel termine de arrancar
+
+        Raises:
+            RuntimeError: Si Laravel no puede arrancar
+        """
+        script_path = ensure_worker_script()
+        self.fingerprint = project_fingerprint(self.project_path)
+        started = time.time()
+
+        if isinstance(self.php_binary, (list, tuple)):
+            command = list(self.php_binary)
+        else:
+            command = [self.php_binary]
+        command += [script_path, self.project_path]
+        if self.once:
+            command.append('--once')
+        # STDOUT se lee en binario para contar los bytes recibidos
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.project_path,
+            **PROCESS_GROUP_KWARGS
+        )
+        self._stdin = io.TextIOWrapper(self.process.stdin, encoding='utf-8', write_through=True)
+        threading.Thread(target=self._drain_stderr, args=(self.process,), daemon=True).start()
+
+        stray_output = []
+        while True:
+            frame = self._read_frame(stray_output.append)
+            if frame is None:
+                self.stop()
+                details = "".join(stray_output) + "".join(self._take_stderr())
+                raise RuntimeError(f"El worker PHP terminó durante el arranque.\n{details}".strip())
+            if frame.get('type') == 'boot_error':
+                self.stop()
+                raise RuntimeError(frame.get('message', 'Error al inicializar Laravel'))
+            if frame.get('type') == 'ready':
+                break
+
+        self._take_stderr()
+        self.boot_seconds = time.time() - started
+        self.boot_ms = frame.get('boot_ms') or 0.0
+        self.spawn_ms = max(0.0, self.boot_seconds * 1000 - self.boot_ms)
+        self.starts += 1
+
+    def stop(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            kill_process_tree(process)
+
+    def kill(self, reason):
+        """
+        Termina el proceso PHP y sus hijos en mitad de un trabajo. Puede llamarse
+        desde cualquier hilo; execute() lanzará ExecutionInterrupted(reason).
+        """
+        process = self.process
+        if process is None:
+            return
+        self._interrupt_reason = reason
+        kill_process_tree(process)
+
+    def shutdown(self):
+        """Detiene el worker y su vigilante de forma definitiva"""
+        self._stopped = True
+        with self._lock:
+            self.stop()
+
+    def restart(self):
+        with self._lock:
+            self.stop()
+            self.start()
+
+    def needs_restart(self):
+        return not self.is_alive() or project_fingerprint(self.project_path) != self.fingerprint
+
+    def ensure_started(self):
+        """Arranca el worker si no está vivo o si su configuración quedó obsoleta"""
+        with self._lock:
+            self._ensure_started()
+
+    def _ensure_started(self):
+        if self.needs_restart():
+            self.stop()
+            self.start()
+
+    def execute(self, code, on_output=None, on_error=None, timeout=None, memory_limit=None, on_rows=None):
+        """
+        Ejecuta un fragmento en el Laravel ya arrancado
+
+        Args:
+            code (str): Código PHP sin etiqueta de apertura
+            on_output (callable): Recibe la salida a medida que llega; si se indica,
+                esa salida no se acumula en el stdout devuelto
+            on_error (callable): Igual que on_output para los avisos de STDERR
+            timeout (float): Segundos de reloj antes de matar el proceso (None = sin límite)
+            memory_limit (str): memory_limit de PHP para este fragmento (p. ej. "512M")
+            on_rows (callable): Recibe cada lote de filas de streamOutput(); sin él,
+                las filas se devuelven juntas como un resultado más
+
+        Returns:
+            dict: Sobre con el resultado: status ('ok', 'exception', 'exit', 'fatal'
+                o 'crash'), stdout, stderr, results (datos pasados a formatOutput),
+                streamed (filas enviadas por streamOutput), queries (consultas SQL
+                con sql, bindings, time en ms, connection, line del fragmento y
+                relation cargada de forma diferida), exception, error,
+                code_ms, memory_peak y timing (desglose de tiempos en ms y bytes
+                recibidos; el arranque sólo cuenta si este trabajo lanzó el proceso)
+
+        Raises:
+            ExecutionInterrupted: Si se superó el tiempo máximo o se canceló
+        """
+        with self._lock:
+            started = time.perf_counter()
+            starts = self.starts
+            self._ensure_started()
+            cold = self.starts != starts
+
+            self._next_id += 1
+            job_id = self._next_id
+            self._stderr_done.clear()
+            self._take_stderr()
+            self._on_stderr = on_error
+            self._interrupt_reason = None
+            job = {'id': job_id, 'code': code}
+            if memory_limit:
+                job['memory_limit'] = memory_limit
+            self._bytes_read = 0
+            self._parse_seconds = 0.0
+            try:
+                self._stdin.write(json.dumps(job) + "\n")
+                self._stdin.flush()
+            except OSError:
+                self.stop()
+                stderr = "".join(self._take_stderr()) or "No se pudo enviar el código al worker PHP."
+                return make_envelope('crash', stderr=stderr)
+
+            timer = None
+            if timeout:
+                timer = threading.Timer(timeout, self.kill, args=('timeout',))
+                timer.daemon = True
+                timer.start()
+            try:
+                envelope = self._collect_job(job_id, on_output, on_rows)
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                self._on_stderr = None
+
+            envelope['timing'].update({
+                'spawn_ms': self.spawn_ms if cold else 0.0,
+                'bootstrap_ms': self.boot_ms if cold else 0.0,
+                'parse_ms': self._parse_seconds * 1000,
+                'total_ms': (time.perf_counter() - started) * 1000,
+                'bytes_received': self._bytes_read,
+            })
+            return envelope
+
+    def _collect_job(self, job_id, on_output, on_rows=None):
+        output = []
+        rows = []
+        sink = on_output if on_output is not None else output.append
+        rows_sink = on_rows if on_rows is not None else rows.extend
+        while True:
+            frame = self._read_frame(sink)
+            if frame is None:
+                # El proceso murió sin cerrar el trabajo
+                self.stop()
+                stderr = "".join(self._take_stderr())
+                if self._interrupt_reason:
+                    raise ExecutionInterrupted(self._interrupt_reason, "".join(output), stderr)
+                return make_envelope('crash', "".join(output), stderr or "El worker PHP terminó inesperadamente.")
+            if frame.get('id') != job_id:
+                continue
+            if frame.get('type') == 'out':
+                sink(frame.get('data', ''))
+            elif frame.get('type') == 'rows':
+                rows_sink(frame.get('rows') or [])
+            elif frame.get('type') == 'done':
+                break
+
+        self._stderr_done.wait(timeout=1)
+        if frame.get('status') not in ('ok', 'exception'):
+            # exit(), dd() o error fatal: el proceso ya no sirve
+            self.stop()
+        envelope = make_envelope(frame.get('status', 'ok'), "".join(output), "".join(self._take_stderr()), frame)
+        sent_at = frame.get('sent_at')
+        envelope['timing'] = {
+            'code_ms': frame.get('code_ms'),
+            'serialize_ms': frame.get('serialize_ms'),
+            'transfer_ms': max(0.0, (self._last_read_at - sent_at) * 1000) if sent_at else None,
+            'memory_peak': frame.get('memory_peak'),
+        }
+        if rows:
+            envelope['results'].append(rows)
+        return envelope
+
+    def watch(self):
+        """Arranca el vigilante que reinicia el worker si muere o cambia la configuración"""
+        threading.Thread(target=self._watch_loop, daemon=True).start()
+
+    def _watch_loop(self):
+        while not self._stopped:
+            time.sleep(self.WATCH_INTERVAL)
+            if self._stopped or not self._lock.acquire(blocking=False):
+                continue
+            try:
+                # Solo workers que ya arrancaron alguna vez
+                if self.fingerprint is not None:
+                    self._ensure_started()
+            except Exception:
+                # Se volverá a intentar en el siguiente trabajo
+                self.fingerprint = None
+            finally:
+                self._lock.release()
+
+    def _read_frame(self, on_stray):
+        """Lee la siguiente línea JSON del worker; None si el proceso terminó"""
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                return None
+            self._last_read_at = time.time()
+            self._bytes_read += len(line)
+            parse_started = time.perf_counter()
+            try:
+                frame = json.loads(line)
+            except ValueError:
+                try:
+                    frame = json.loads(line.decode('utf-8', 'replace'))
+                except ValueError:
+                    frame = None
+            self._parse_seconds += time.perf_counter() - parse_started
+            if isinstance(frame, dict) and 'type' in frame:
+                return frame
+            # Salida que no pasó por el buffer del fragmento
+            on_stray(line.decode('utf-8', 'replace'))
+
+    def _drain_stderr(self, process):
+        for line in io.TextIOWrapper(process.stderr, encoding='utf-8', errors='replace'):
+            if line.startswith(WORKER_DONE_MARKER):
+                self._stderr_done.set()
+                continue
+            on_stderr = self._on_stderr
+            if on_stderr is not None:
+                on_stderr(line)
+            else:
+                self._stderr_lines.append(line)
+        self._stderr_done.set()
+
+    def _take_stderr(self):
+        lines, self._stderr_lines = self._stderr_lines, []
+        return lines
+
+
+# Prioridades de la cola de trabajos (menor número = antes)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+# Trabajos de fondo (páginas de tablas paginadas): nunca por delante de los fragmentos del usuario
+PRIORITY_LOW = 2
+_PRIORITY_STOP = -1
+
+# Llamadas que suelen devolver pocos registros y conviene adelantar en la cola
+_QUICK_CALLS = re.compile(r'(::|->)(find|findOrFail|first|firstOrFail|count|exists|value)\(')
+_SLOW_CALLS = re.compile(r'(::|->)(all|get|chunk|chunkById|each|cursor|lazy|paginate)\(')
+
+
+def snippet_priority(code):
+    """
+    Estima la prioridad de un fragmento: las búsquedas puntuales
+    (find, first, count...) se adelantan a los listados completos
+    """
+    if _QUICK_CALLS.search(code) and not _SLOW_CALLS.search(code):
+        return PRIORITY_HIGH
+    return PRIORITY_NORMAL
+
+
+class WorkerPool:
+    """
+    Pool acotado de workers PHP arrancados para un proyecto.
+
+    Los trabajos esperan en una cola y cada worker toma el siguiente en cuanto
+    queda libre. Con planificación "fifo" se atienden por orden de llegada; con
+    "priority" primero los de menor número de prioridad.
+    """
+
+    def __init__(self, project_path, size=2, scheduling='priority', on_event=None, php_binary='php'):
+        self.project_path = project_path
+        self.scheduling = scheduling
+        self.php_binary = php_binary
+        self.on_event = on_event
+        self.jobs = queue.PriorityQueue()
+        self.workers = []
+        self._job_ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._active = {}
+        self._lock = threading.Lock()
+        self.resize(size)
+
+    def new_job_id(self):
+        """Reserva un identificador de trabajo antes de encolarlo"""
+        return next(self._job_ids)
+
+    def submit(self, code, callback, priority=PRIORITY_NORMAL, on_output=None, on_error=None, job_id=None,
+               timeout=None, memory_limit=None, on_rows=None):
+        """
+        Encola un fragmento
+
+        Args:
+            code (str): Código PHP listo para el worker
+            callback (callable): callback(job_id, envelope, error) al terminar,
+                llamado desde el hilo del worker
+            priority (int): Prioridad del trabajo (se ignora en modo fifo)
+            on_output (callable): Recibe la salida del fragmento a medida que llega
+            on_error (callable): Recibe los avisos de STDERR a medida que llegan
+            job_id (int): Identificador reservado con new_job_id(), si lo hay
+            timeout (float): Segundos de reloj antes de matar el proceso (None = sin límite)
+            memory_limit (str): memory_limit de PHP para el fragmento
+            on_rows (callable): Recibe los lotes de filas de streamOutput()
+
+        Returns:
+            int: Identificador del trabajo
+        """
+        if job_id is None:
+            job_id = self.new_job_id()
+        if self.scheduling == 'fifo':
+            priority = PRIORITY_NORMAL
+        job = {'id': job_id, 'code': code, 'callback': callback, 'priority': priority,
+               'on_output': on_output, 'on_error': on_error, 'on_rows': on_rows,
+               'timeout': timeout, 'memory_limit': memory_limit}
+        self.jobs.put((priority, next(self._seq), job))
+        return job_id
+
+    def pending(self):
+        """Número de trabajos esperando un worker libre"""
+        return self.jobs.qsize()
+
+    def running(self):
+        """Número de trabajos en ejecución"""
+        return len(self._active)
+
+    def cancel(self, job_id=None, running=True):
+        """
+        Cancela un trabajo (o todos si job_id es None): los que esperan en la cola
+        se descartan y los que están en ejecución matan su proceso PHP
+
+        Args:
+            job_id (int): Trabajo a cancelar (None = todos)
+            running (bool): Cancelar también los que ya están en ejecución
+
+        Returns:
+            int: Número de trabajos cancelados
+        """
+        cancelled = 0
+        kept = []
+        while True:
+            try:
+                item = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            job = item[2]
+            if job is not None and (job_id is None or job['id'] == job_id):
+                job['callback'](job['id'], None, ExecutionInterrupted('cancelled'))
+                cancelled += 1
+            else:
+                kept.append(item)
+        for item in kept:
+            self.jobs.put(item)
+        if not running:
+            return cancelled
+
+        with self._lock:
+            active = [(active_id, worker) for active_id, worker in self._active.items()
+                      if job_id is None or active_id == job_id]
+        for _active_id, worker in active:
+            worker.kill('cancelled')
+            cancelled += 1
+        return cancelled
+
+    def size(self):
+        with self._lock:
+            return len(self.workers)
+
+    def resize(self, size):
+        """Ajusta el número de workers; los que sobran terminan al quedar libres"""
+        size = max(1, int(size))
+        with self._lock:
+            missing = size - len(self.workers)
+            for _ in range(missing):
+                worker = TinkerWorker(self.project_path, self.php_binary)
+                self.workers.append(worker)
+                worker.watch()
+                threading.Thread(target=self._dispatch_loop, args=(worker,), daemon=True).start()
+        for _ in range(-missing):
+            self.jobs.put((_PRIORITY_STOP, next(self._seq), None))
+
+    def restart_all(self):
+        with self._lock:
+            workers = list(self.workers)
+        for worker in workers:
+            worker.restart()
+
+    def shutdown(self):
+        with self._lock:
+            workers = list(self.workers)
+        for _ in workers:
+            self.jobs.put((_PRIORITY_STOP, next(self._seq), None))
+        for worker in workers:
+            worker.shutdown()
+
+    def _emit(self, message, msg_type):
+        if self.on_event is not None:
+            self.on_event(message, msg_type)
+
+    def _dispatch_loop(self, worker):
+        # Arrancar Laravel antes de recibir el primer trabajo
+        try:
+            worker.ensure_started()
+            self._emit(f"Worker PHP listo en {worker.boot_seconds:.2f}s", "info")
+        except Exception as e:
+            self._emit(f"No se pudo arrancar el worker PHP: {str(e)}", "error")
+
+        while True:
+            _priority, _seq, job = self.jobs.get()
+            if job is None:
+                break
+
+            with self._lock:
+                self._active[job['id']] = worker
+            try:
+                envelope = worker.execute(
+                    job['code'], job['on_output'], job['on_error'], job['timeout'], job['memory_limit'],
+                    job['on_rows']
+                )
+                error = None
+            except Exception as e:
+                envelope, error = None, e
+            finally:
+                with self._lock:
+                    self._active.pop(job['id'], None)
+            job['callback'](job['id'], envelope, error)
+
+        with self._lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+        worker.shutdown()
+
+
+class OutputSpool:
+    """
+    Acumula la salida de un proceso hasta un tope en memoria. Lo que pasa del
+    tope se escribe en un archivo temporal en lugar de llegar a la interfaz.
+    """
+
+    def __init__(self, cap_bytes):
+        self.cap_bytes = cap_bytes
+        self.total_bytes = 0
+        self.memory_bytes = 0
+        self.spill_path = None
+        self._chunks = []
+        self._spill_file = None
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        """
+        Guarda un fragmento de salida
+
+        Returns:
+            bool: True si quedó en memoria, False si se desvió al archivo temporal
+        """
+        size = len(text.encode('utf-8', 'replace'))
+        with self._lock:
+            self.total_bytes += size
+            if self._spill_file is None and self.memory_bytes + size <= self.cap_bytes:
+                self._chunks.append(text)
+                self.memory_bytes += size
+                return True
+
+            if self._spill_file is None:
+                fd, self.spill_path = tempfile.mkstemp(prefix='py_tinker_output_', suffix='.log')
+                self._spill_file = os.fdopen(fd, 'w', encoding='utf-8', errors='replace')
+            self._spill_file.write(text)
+            return False
+
+    def getvalue(self):
+        """Salida guardada en memoria"""
+        with self._lock:
+            return "".join(self._chunks)
+
+    def spilled_bytes(self):
+        return self.total_bytes - self.memory_bytes
+
+    def close(self):
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.close()
+
+
+class LogArchive:
+    """
+    Archivo JSONL rotativo con las entradas del log que ya no caben en memoria.
+
+    Las entradas se escriben en un hilo aparte para no bloquear la interfaz.
+    Cuando el archivo actual pasa de max_bytes se renombra a log.1.jsonl (el
+    anterior log.1 pasa a log.2, etc.) y se descartan los que exceden max_files.
+    """
+
+    def __init__(self, directory=None, max_bytes=50 * 1024 * 1024, max_files=5):
+        """
+        Args:
+            directory (str): Carpeta de los archivos (por defecto, una nueva en el directorio temporal)
+            max_bytes (int): Tamaño a partir del cual se rota el archivo actual
+            max_files (int): Archivos rotados que se conservan además del actual
+        """
+        self.directory = directory or tempfile.mkdtemp(prefix='py_tinker_logs_')
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.archived = 0
+        self._file = None
+        self._size = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def _path(self, index=0):
+        if index == 0:
+            return os.path.join(self.directory, 'log.jsonl')
+        return os.path.join(self.directory, f'log.{index}.jsonl')
+
+    def append(self, entry):
+        """Encola una entrada (dict serializable a JSON) para escribirla"""
+        self.archived += 1
+        self._queue.put(('entry', entry))
+
+    def clear(self):
+        """Borra las entradas archivadas"""
+        self.archived = 0
+        self._queue.put(('clear', None))
+
+    def flush(self):
+        """Espera a que todo lo encolado esté escrito en disco"""
+        self._queue.join()
+
+    def close(self, remove=False):
+        """
+        Termina el hilo de escritura
+
+        Args:
+            remove (bool): Borrar también los archivos
+        """
+        self._queue.put(('close', remove))
+        self._thread.join()
+
+    def iter_entries(self):
+        """
+        Recorre las entradas archivadas de la más antigua a la más reciente
+        leyendo los archivos línea a línea
+
+        Yields:
+            dict: Entrada del log
+        """
+        self.flush()
+        for index in range(self.max_files, -1, -1):
+            try:
+                f = open(self._path(index), encoding='utf-8')
+            except FileNotFoundError:
+                continue
+            with f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for index in range(self.max_files, 0, -1):
+            source = self._path(index - 1)
+            if os.path.exists(source):
+                # os.replace sobrescribe el más antiguo
+                os.replace(source, self._path(index))
+
+    def _remove_files(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for index in range(self.max_files + 1):
+            try:
+                os.remove(self._path(index))
+            except FileNotFoundError:
+                pass
+
+    def _write_loop(self):
+        while True:
+            command, value = self._queue.get()
+            try:
+                if command == 'entry':
+                    if self._file is None:
+                        self._file = open(self._path(), 'a', encoding='utf-8')
+                        self._size = self._file.tell()
+                    line = json.dumps(value, ensure_ascii=False, default=json_default) + "\n"
+                    self._file.write(line)
+                    self._size += len(line.encode('utf-8'))
+                    if self._size >= self.max_bytes:
+                        self._rotate()
+                elif command == 'clear':
+                    self._remove_files()
+                elif command == 'close':
+                    if value:
+                        self._remove_files()
+                        try:
+                            os.rmdir(self.directory)
+                        except OSError:
+                            pass
+                    elif self._file is not None:
+                        self._file.close()
+                        self._file = None
+                    return
+
+                # Volcar a disco sólo cuando la cola se queda vacía
+                if self._file is not None and self._queue.empty():
+                    self._file.flush()
+            except OSError:
+                # Un fallo de disco no debe tirar el log en memoria
+                pass
+            finally:
+                self._queue.task_done()
+
+
+_FORMAT_OUTPUT_CALL = 'echo formatOutput('
+_LISTING_CALL = re.compile(r'(::all\(\)|->get\(\)|::query\(\)|(::|->)(cursor|lazy|lazyById)\([^()]*\))$')
+
+
+def _single_expression(expression):
+    """
+    Indica si `expression` es una sola expresión PHP: paréntesis, corchetes y
+    llaves equilibrados y ningún `;` fuera de ellos (sin contar los que van
+    dentro de cadenas)
+    """
+    closing = {')': '(', ']': '[', '}': '{'}
+    stack = []
+    quote = None
+    escaped = False
+    for char in expression:
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char in '([{':
+            stack.append(char)
+        elif char in closing:
+            if not stack or stack.pop() != closing[char]:
+                return False
+        elif char == ';' and not stack:
+            return False
+    return not stack and quote is None
+
+
+def to_stream_code(code):
+    """
+    Convierte el `echo formatOutput(consulta)` final en `echo streamOutput(consulta)`
+    cuando la consulta devuelve un listado. Un ::all() o un ->get() final se quitan
+    para que PHP reciba la consulta sin ejecutar y la recorra por partes. Sólo se
+    toca la última sentencia, y sólo si su argumento es una única expresión.
+
+    Returns:
+        str: Código en modo streaming, o el original si no es un listado
+    """
+    start = code.rfind(_FORMAT_OUTPUT_CALL)
+    if start < 0:
+        return code
+    tail = code[start + len(_FORMAT_OUTPUT_CALL):].rstrip()
+    if tail.endswith(';'):
+        tail = tail[:-1].rstrip()
+    if not tail.endswith(')'):
+        return code
+    expression = tail[:-1].strip()
+    if not expression or not _single_expression(expression) or not _LISTING_CALL.search(expression):
+        return code
+    expression = re.sub(r'::all\(\)$', '::query()', expression)
+    expression = re.sub(r'->get\(\)$', '', expression)
+    return code[:start] + f"echo streamOutput({expression});"
+
+
+def format_bytes(size):
+    """Tamaño legible (B, KB, MB, GB)"""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.1f} GB"
+
+
+# Fases del desglose de tiempos, en orden de ejecución
+TIMING_PHASES = [
+    ('spawn_ms', "proceso"),
+    ('bootstrap_ms', "bootstrap"),
+    ('code_ms', "código"),
+    ('serialize_ms', "serialización"),
+    ('transfer_ms', "transferencia"),
+    ('parse_ms', "parseo JSON"),
+    ('render_ms', "render UI"),
+    ('total_ms', "total"),
+]
+
+
+def format_timing(timing):
+    """
+    Desglose de tiempos y recursos de una ejecución en una línea
+
+    Args:
+        timing (dict): Tiempos en ms, memory_peak y bytes_received
+    """
+    parts = [f"{name} {timing[key]:.1f} ms" for key, name in TIMING_PHASES if timing.get(key) is not None]
+    if timing.get('memory_peak'):
+        parts.append(f"memoria pico PHP {format_bytes(timing['memory_peak'])}")
+    if timing.get('bytes_received') is not None:
+        parts.append(f"{format_bytes(timing['bytes_received'])} recibidos")
+    return " · ".join(parts)
+
+
+# Repeticiones de una misma forma de consulta desde una línea que se marcan como N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+_SQL_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_SQL_NUMBER_LITERAL = re.compile(r'(?<![\w."`])-?\d+(?:\.\d+)?\b')
+_SQL_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SQL_FOREIGN_KEY = re.compile(r'where\s+["`\[]?(\w+)["`\]]?\.["`\[]?(\w+)["`\]]?\s*(?:=|in)\s*\(?\?', re.I)
+_SQL_TABLE = re.compile(r'\bfrom\s+["`\[]?(\w+)["`\]]?', re.I)
+
+
+def normalize_sql(sql):
+    """
+    Forma de una consulta: sin literales, con las listas IN (?, ?, ...) reducidas
+    a IN (?) y los espacios normalizados
+    """
+    shape = _SQL_STRING_LITERAL.sub('?', sql)
+    shape = _SQL_NUMBER_LITERAL.sub('?', shape)
+    shape = _SQL_IN_LIST.sub('(?)', shape)
+    return " ".join(shape.split())
+
+
+def _suggest_eager_load(queries):
+    """
+    Sugiere el with() que agruparía las consultas repetidas; usa la relación
+    cargada de forma diferida si PHP la detectó y, si no, la deduce del SQL
+    """
+    for query in queries:
+        relation = query.get('relation')
+        if relation:
+            model = relation['model'].rsplit('\\', 1)[-1]
+            return f"{model}::with('{relation['name']}')"
+
+    sql = queries[0]['sql']
+    table = _SQL_TABLE.search(sql)
+    key = _SQL_FOREIGN_KEY.search(sql)
+    if not table:
+        return None
+    table = table.group(1)
+    if key and key.group(2).endswith('_id'):
+        # hasMany / hasOne: la consulta filtra por la clave foránea del padre
+        return f"with('{table}') en el modelo de '{key.group(2)[:-3]}'"
+    # belongsTo: la consulta busca el padre por su clave primaria
+    singular = table[:-1] if table.endswith('s') else table
+    return f"with('{singular}')"
+
+
+def detect_n_plus_one(queries, line_offset=0, threshold=N_PLUS_ONE_THRESHOLD):
+    """
+    Agrupa las consultas por forma y línea del fragmento y marca como posible N+1
+    las que se repiten al menos `threshold` veces
+
+    Args:
+        queries (list): Consultas del sobre (sql, time, line, relation...)
+        line_offset (int): Líneas añadidas antes del código del usuario
+        threshold (int): Repeticiones a partir de las que se avisa
+
+    Returns:
+        list: Grupos sospechosos (shape, line, count, time, indexes, suggestion),
+            del más costoso al menos costoso
+    """
+    groups = {}
+    for idx, query in enumerate(queries):
+        line = query.get('line')
+        if line is not None:
+            line = max(1, line - line_offset)
+        groups.setdefault((normalize_sql(query['sql']), line), []).append(idx)
+
+    suspects = []
+    for (shape, line), indexes in groups.items():
+        if len(indexes) < threshold:
+            continue
+        members = [queries[i] for i in indexes]
+        suspects.append({
+            'shape': shape,
+            'line': line,
+            'count': len(indexes),
+            'time': sum(query['time'] or 0 for query in members),
+            'indexes': indexes,
+            'suggestion': _suggest_eager_load(members),
+        })
+    suspects.sort(key=lambda suspect: suspect['time'], reverse=True)
+    return suspects
+
+
+def php_string_literal(text):
+    """Cadena PHP entre comillas simples con el texto dado"""
+    return "'" + text.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+# Código PHP que repite una consulta capturada como EXPLAIN en la misma conexión.
+# Con ANALYZE la consulta se ejecuta de verdad, por eso va dentro de una
+# transacción que siempre se deshace.
+EXPLAIN_PHP_TEMPLATE = r"""
+$__explain_connection = \Illuminate\Support\Facades\DB::connection(%(connection)s);
+$__explain_driver = $__explain_connection->getDriverName();
+$__explain_analyze = %(analyze)s;
+switch ($__explain_driver) {
+    case 'mysql':
+    case 'mariadb':
+        $__explain_prefix = $__explain_analyze ? 'EXPLAIN ANALYZE ' : 'EXPLAIN ';
+        break;
+    case 'pgsql':
+        $__explain_prefix = $__explain_analyze ? 'EXPLAIN (ANALYZE, BUFFERS) ' : 'EXPLAIN ';
+        break;
+    case 'sqlite':
+        // SQLite no tiene EXPLAIN ANALYZE: se muestra el plan
+        $__explain_prefix = 'EXPLAIN QUERY PLAN ';
+        break;
+    default:
+        throw new RuntimeException("EXPLAIN no está soportado para el driver {$__explain_driver}");
+}
+$__explain_connection->beginTransaction();
+try {
+    $__explain_rows = $__explain_connection->select(
+        $__explain_prefix . %(sql)s,
+        json_decode(%(bindings)s, true)
+    );
+} finally {
+    $__explain_connection->rollBack();
+}
+$__explain_plan = [];
+foreach ($__explain_rows as $__explain_row) {
+    $__explain_row = (array) $__explain_row;
+    // Los planes en texto (Postgres, EXPLAIN ANALYZE de MySQL) se separan por líneas
+    if (count($__explain_row) === 1) {
+        $__explain_column = key($__explain_row);
+        foreach (preg_split('/\r?\n/', (string) current($__explain_row)) as $__explain_line) {
+            if ($__explain_line !== '') {
+                $__explain_plan[] = [$__explain_column => $__explain_line];
+            }
+        }
+    } else {
+        $__explain_plan[] = $__explain_row;
+    }
+}
+echo formatOutput(['driver' => $__explain_driver, 'analyze' => $__explain_analyze, 'plan' => $__explain_plan]);
+"""
+
+
+def build_explain_code(query, analyze=False):
+    """
+    Código PHP para ver el plan de una consulta capturada
+
+    Args:
+        query (dict): Consulta con sql, bindings y connection
+        analyze (bool): Usar EXPLAIN ANALYZE (ejecuta la consulta)
+    """
+    return EXPLAIN_PHP_TEMPLATE % {
+        'connection': php_string_literal(query['connection']) if query.get('connection') else 'null',
+        'analyze': 'true' if analyze else 'false',
+        'sql': php_string_literal(query['sql']),
+        'bindings': php_string_literal(json.dumps(query.get('bindings') or [])),
+    }
+
+
+def explain_findings(driver, plan):
+    """
+    Busca en un plan de ejecución los recorridos completos y la falta de índices
+
+    Args:
+        driver (str): Driver de la conexión (mysql, mariadb, pgsql, sqlite)
+        plan (list): Filas del plan
+
+    Returns:
+        dict: Índice de fila → motivo del aviso
+    """
+    findings = {}
+    for idx, row in enumerate(plan):
+        text = " ".join(str(value) for value in row.values())
+        if driver in ('mysql', 'mariadb'):
+            access = str(row.get('type') or '').upper()
+            if access == 'ALL' or 'Table scan on' in text:
+                findings[idx] = "recorrido completo de la tabla"
+            elif access == 'INDEX':
+                findings[idx] = "recorrido completo del índice"
+            elif 'type' in row and row.get('table') and row.get('key') is None:
+                findings[idx] = "no usa ningún índice"
+        elif driver == 'pgsql':
+            if 'Seq Scan' in text:
+                findings[idx] = "recorrido secuencial (sin índice)"
+        elif driver == 'sqlite':
+            detail = str(row.get('detail') or '')
+            if detail.startswith('SCAN') and 'INDEX' not in detail:
+                findings[idx] = "recorrido completo de la tabla"
+    return findings
+
+
+# Bucle del modo benchmark: repite el fragmento en el mismo proceso y mide
+# cada iteración. La salida del fragmento se descarta y los resultados se
+# vacían entre iteraciones. Mientras se mide, las consultas sólo se cuentan:
+# capturar el SQL y el backtrace de cada una inflaría los tiempos.
+BENCHMARK_PHP_TEMPLATE = r"""
+global $__tinker_results, $__tinker_queries, $__tinker_queries_dropped, $__tinker_capture_queries;
+$__bench_code = %(code)s;
+$__bench_samples = [];
+$__bench_clock = function_exists('hrtime')
+    ? function () { return hrtime(true) / 1e6; }
+    : function () { return microtime(true) * 1000; };
+$__bench_capture = $__tinker_capture_queries;
+$__tinker_capture_queries = false;
+try {
+    for ($__bench_i = 0; $__bench_i < %(warmup)d + %(iterations)d; $__bench_i++) {
+        $__tinker_results = [];
+        $__tinker_queries = [];
+        $__tinker_queries_dropped = 0;
+        gc_collect_cycles();
+        $__bench_memory = memory_get_usage();
+        $__bench_started = $__bench_clock();
+        ob_start();
+        try {
+            // Cada iteración en un ámbito nuevo, como un trabajo normal
+            (function () use ($__bench_code) {
+                return eval($__bench_code);
+            })();
+        } finally {
+            ob_end_clean();
+        }
+        $__bench_ms = $__bench_clock() - $__bench_started;
+        if ($__bench_i >= %(warmup)d) {
+            $__bench_samples[] = [
+                'iteración' => $__bench_i - %(warmup)d + 1,
+                'ms' => round($__bench_ms, 4),
+                'memoria' => memory_get_usage() - $__bench_memory,
+                'consultas' => count($__tinker_queries) + $__tinker_queries_dropped,
+            ];
+        }
+    }
+} finally {
+    $__tinker_capture_queries = $__bench_capture;
+    $__tinker_queries = [];
+    $__tinker_queries_dropped = 0;
+}
+$__tinker_results = [];
+echo formatOutput(['benchmark' => $__bench_samples]);
+"""
+
+
+def build_benchmark_code(code, iterations, warmup):
+    """
+    Código PHP que ejecuta un fragmento `warmup` veces sin medir y luego
+    `iterations` veces midiendo tiempo, memoria y consultas de cada una
+
+    Args:
+        code (str): Fragmento ya transformado (ver transform_code)
+        iterations (int): Iteraciones medidas
+        warmup (int): Iteraciones de calentamiento
+    """
+    return BENCHMARK_PHP_TEMPLATE % {
+        'code': php_string_literal(build_use_statements(code) + code),
+        'iterations': iterations,
+        'warmup': warmup,
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def benchmark_stats(samples):
+    """
+    Resume las iteraciones de un benchmark
+
+    Args:
+        samples (list): Iteraciones con ms, memoria y consultas
+
+    Returns:
+        dict: min, p50, p95, p99 y max en ms, memoria media y máxima, y consultas
+            mínimas, medias y máximas por iteración
+    """
+    times = sorted(sample['ms'] for sample in samples)
+    memory = [sample['memoria'] for sample in samples]
+    queries = [sample['consultas'] for sample in samples]
+    return {
+        'min': times[0],
+        'p50': percentile(times, 0.50),
+        'p95': percentile(times, 0.95),
+        'p99': percentile(times, 0.99),
+        'max': times[-1],
+        'memory_avg': sum(memory) / len(memory),
+        'memory_max': max(memory),
+        'queries_min': min(queries),
+        'queries_avg': sum(queries) / len(queries),
+        'queries_max': max(queries),
+    }
+
+
+# Código PHP que trae una página de una consulta de Eloquent ordenada por la
+# clave primaria: por keyset (clave > última de la página anterior) si se
+# conoce esa clave, o por offset si se salta a una página lejana. La primera
+# página incluye además el total de registros.
+PAGE_PHP_TEMPLATE = r"""
+$__page_query = %(query)s;
+$__page_model = $__page_query->getModel();
+$__page_key = $__page_model->getKeyName();
+$__page_total = %(count)s ? (clone $__page_query)->count() : null;
+$__page_after = json_decode(%(after)s, true);
+if ($__page_after !== null) {
+    $__page_query->where($__page_model->qualifyColumn($__page_key), '>', $__page_after);
+} else {
+    $__page_query->skip(%(offset)d);
+}
+// reorder(): un orderBy/latest() de las condiciones cambiaría el orden de las
+// páginas por offset y dejaría de coincidir con el de las páginas por keyset
+$__page_rows = $__page_query->reorder()->orderBy($__page_model->qualifyColumn($__page_key))->take(%(limit)d)->get();
+echo formatOutput(['key' => $__page_key, 'total' => $__page_total, 'rows' => $__page_rows->toArray()]);
+"""
+
+
+def build_page_code(query, page, page_size, after=None, count=False):
+    """
+    Código PHP para traer una página de una consulta. Las páginas siempre van
+    ordenadas por clave primaria: se descarta cualquier orden de `query`.
+
+    Args:
+        query (str): Expresión PHP que devuelve un Builder de Eloquent
+            (p. ej. "App\\Models\\User::query()")
+        page (int): Número de página (desde 0); se usa como offset si no hay `after`
+        page_size (int): Registros por página
+        after: Clave primaria del último registro de la página anterior (keyset)
+        count (bool): Contar también el total de registros
+    """
+    return PAGE_PHP_TEMPLATE % {
+        'query': query,
+        'count': 'true' if count else 'false',
+        'after': php_string_literal(json.dumps(after)),
+        'offset': page * page_size,
+        'limit': page_size,
+    }
+
+
+class PagedQuery:
+    """
+    Filas de una consulta que se traen por páginas a medida que se muestran.
+    Se comporta como las filas de una vista de tabla (len y value) y las
+    celdas de páginas aún no recibidas valen MISSING.
+
+    Sólo se piden las páginas de la ventana visible y la siguiente, con como
+    mucho max_in_flight en curso y prioridad baja para no adelantarse a los
+    fragmentos del usuario. Al desplazarse, las páginas que esperan en la cola
+    y ya no se ven se cancelan; las que llegan fuera de la ventana se guardan
+    como las primeras a descartar.
+
+    Las páginas recibidas se guardan en un LRU de max_pages páginas; de cada
+    página se recuerda además la clave de su último registro, para pedir la
+    siguiente por keyset aunque la página ya se haya descartado.
+
+    Las respuestas llegan en el hilo del ejecutor: on_page(página, job_id,
+    sobre, error) debe llevarlas al hilo que usa el objeto, que llama a store_page.
+    """
+
+    def __init__(self, runner, query, on_page, page_size=500, max_pages=20, max_in_flight=2,
+                 timeout=None, memory_limit=None):
+        """
+        Args:
+            runner (WorkerPool/OneShotRunner): Ejecutor de las páginas
+            query (str): Expresión PHP que devuelve un Builder de Eloquent
+            on_page (callable): Recibe (página, job_id, sobre, error) desde el hilo del ejecutor
+            page_size (int): Registros por página
+            max_pages (int): Páginas que se conservan en memoria
+            max_in_flight (int): Páginas pedidas a la vez como mucho
+            timeout (float): Segundos de reloj por página (None = sin límite)
+            memory_limit (str): memory_limit de PHP por página
+        """
+        self.runner = runner
+        self.query = query
+        self.on_page = on_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.total = None
+        self.key = None
+        self.columns = []
+        self._pages = collections.OrderedDict()
+        self._last_keys = {}
+        # Página -> trabajo que la está trayendo
+        self._pending = {}
+        self._wanted = []
+
+    def __len__(self):
+        return self.total or 0
+
+    def cached_pages(self):
+        """Número de páginas en memoria"""
+        return len(self._pages)
+
+    def value(self, index, column):
+        page = self._pages.get(index // self.page_size)
+        if page is None:
+            return MISSING
+        self._pages.move_to_end(index // self.page_size)
+        offset = index % self.page_size
+        return page.value(offset, column) if offset < len(page) else MISSING
+
+    def ensure(self, first, last):
+        """
+        Pide las páginas que faltan para las filas [first, last) y la
+        siguiente, y cancela las pedidas que aún esperan y ya no hacen falta
+
+        Returns:
+            list: Páginas pedidas
+        """
+        if self.total is None:
+            wanted = [0]
+        else:
+            page_count = -(-self.total // self.page_size)
+            last_page = (max(last, first + 1) - 1) // self.page_size + 1
+            wanted = list(range(first // self.page_size, min(last_page + 1, page_count)))
+        self._wanted = wanted
+
+        for page, job_id in list(self._pending.items()):
+            if page not in wanted and self.runner.cancel(job_id, running=False):
+                del self._pending[page]
+
+        requested = []
+        for page in wanted:
+            if len(self._pending) >= self.max_in_flight:
+                break
+            if page not in self._pages and page not in self._pending:
+                self._fetch(page)
+                requested.append(page)
+        return requested
+
+    def cancel(self):
+        """
+        Cancela todas las páginas pedidas, en cola o en curso (p. ej. al
+        cerrar la tabla)
+
+        Returns:
+            int: Trabajos cancelados
+        """
+        pending, self._pending = self._pending, {}
+        self._wanted = []
+        return sum(self.runner.cancel(job_id) for job_id in pending.values())
+
+    def _fetch(self, page):
+        after = self._last_keys.get(page - 1) if page else None
+        self._pending[page] = self.runner.submit(
+            build_page_code(self.query, page, self.page_size, after, count=self.total is None),
+            lambda job_id, envelope, error: self.on_page(page, job_id, envelope, error),
+            PRIORITY_LOW,
+            timeout=self.timeout,
+            memory_limit=self.memory_limit
+        )
+
+    def store_page(self, page, job_id, envelope, error):
+        """
+        Guarda una página recibida, descartando la menos usada si hace falta.
+        Las respuestas de trabajos cancelados se ignoran.
+
+        Returns:
+            str: Mensaje de error, o None si la página se guardó o se ignoró
+        """
+        if self._pending.get(page) != job_id:
+            return None
+        del self._pending[page]
+        if error is not None:
+            return str(error)
+        if envelope['exception']:
+            return f"{envelope['exception']['class']}: {envelope['exception']['message']}"
+        if envelope['error'] or not envelope['results']:
+            return envelope['error'] or envelope['stderr'] or 'sin resultado'
+
+        result = envelope['results'][0]
+        self.key = result['key']
+        if result['total'] is not None:
+            self.total = result['total']
+        rows = ColumnStore.from_rows(result['rows'])
+        known = set(self.columns)
+        self.columns.extend(column for column in rows.columns if column not in known)
+        if len(rows) and self.key in rows.columns:
+            self._last_keys[page] = rows.value(len(rows) - 1, self.key)
+
+        self._pages[page] = rows
+        # Una página que ya no se ve no desplaza a las que se usan
+        self._pages.move_to_end(page, last=page in self._wanted)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return None
+
+
+def pump_pipe(pipe, callback):
+    """Lee un pipe de texto línea a línea y entrega cada línea al callback"""
+    try:
+        for line in iter(pipe.readline, ''):
+            callback(line)
+    finally:
+        pipe.close()
+
+
+def transform_code(code, log=None):
+    """
+    Transforma el código ingresado por el usuario para adaptarlo automáticamente
+    al formato requerido por Tinker.
+
+    Transformaciones:
+    - ModelName::método() → echo formatOutput(App\\Models\\ModelName::método());
+    - App\\ModelName::método() → echo formatOutput(App\\ModelName::método());
+
+    Args:
+        code (str): Código ingresado por el usuario
+        log (callable): log(mensaje, tipo) para informar de la transformación
+
+    Returns:
+        str: Código transformado
+    """
+    def _log(message, msg_type):
+        if log is not None:
+            log(message, msg_type)
+
+    try:
+        # Eliminar espacios al inicio y final
+        code = code.strip()
+
+        # Eliminar punto y coma al final si existe
+        if code.endswith(';'):
+            code = code[:-1]
+
+        # Si ya contiene "echo formatOutput" o streamOutput, no aplicar transformación
+        if "echo formatOutput" in code or "streamOutput(" in code:
+            return code
+
+        # Si ya está formateado con var_dump o dd, devolverlo sin cambios
+        if code.startswith("var_dump(") or code.startswith("dd("):
+            return code
+
+        # Si es un código generado por consulta de modelo, no transformar
+        if "// Consulta al modelo" in code:
+            return code
+
+        # Si es un comando de Laravel (como DB::), no lo transformamos
+        if code.startswith("DB::") or code.startswith("\\DB::") or code.startswith("Schema::"):
+            # Simplemente añadir echo si no está ya
+            if not code.startswith("echo"):
+                return f"echo formatOutput({code});"
+            return code
+
+        # Verificar si es una consulta de modelo simple (Modelo::método())
+        # Patrón: palabra::método(args) - sin espacios antes de ::
+        model_method_pattern = r'^([A-Za-z0-9_]+)::([A-Za-z0-9_]+\(.*\))(.*)$'
+        import re
+        match = re.match(model_method_pattern, code)
+
+        if match:
+            model_name = match.group(1)
+            method_call = match.group(2)
+            rest_of_code = match.group(3)
+
+            # Si parece ser un nombre de modelo (primera letra mayúscula)
+            if model_name[0].isupper():
+                # Transformar a formato completo con namespace
+                transformed = f"echo formatOutput(App\\Models\\{model_name}::{method_call}{rest_of_code});"
+
+                # Registrar la transformación
+                _log(f"Código transformado: {code} → {transformed}", "info")
+
+                return transformed
+
+        # Verificar si ya tiene namespace App pero sin formatOutput
+        namespace_pattern = r'^App\\([A-Za-z0-9_\\]+)::([A-Za-z0-9_]+\(.*\))(.*)$'
+        match = re.match(namespace_pattern, code)
+
+        if match:
+            namespace = match.group(1)
+            method_call = match.group(2)
+            rest_of_code = match.group(3)
+
+            # Transformar a formato con formatOutput
+            transformed = f"echo formatOutput(App\\{namespace}::{method_call}{rest_of_code});"
+
+            # Registrar la transformación
+            _log(f"Código transformado: {code} → {transformed}", "info")
+
+            return transformed
+
+        # Si no coincide con ningún patrón pero parece código PHP válido
+        if "::" in code or "->" in code:
+            # Verificar si el código comienza con un nombre de clase
+            # que podría ser un modelo Eloquent
+            class_pattern = r'^([A-Z][A-Za-z0-9_]*)(::|\->)'
+            class_match = re.match(class_pattern, code)
+            if class_match and "::" in code[:10]:  # Si hay una clase y usa ::
+                model_name = class_match.group(1)
+                # Asegurarnos que tenga el namespace completo
+                if not code.startswith("App\\"):
+                    transformed = f"echo formatOutput(App\\Models\\{code});"
+                    _log(f"Código transformado: {code} → {transformed}", "info")
+                    return transformed
+
+            # Si no es una clase o ya tiene namespace, simplemente envolver
+            transformed = f"echo formatOutput({code});"
+            _log(f"Código transformado: {code} → {transformed}", "info")
+            return transformed
+
+        # Si no coincide con ningún patrón, devolver el código original
+        return code
+
+    except Exception as e:
+        # Si hay algún error en la transformación, devolver el código original
+        _log(f"Error al transformar código: {str(e)}", "error")
+        return code
+
+
+def prepare_snippet(code, transform=True, stream=False, log=None):
+    """
+    Prepara un fragmento para el worker: transformación opcional, modo
+    streaming y los use de facades y modelos
+
+    Args:
+        code (str): Código tal como lo escribió el usuario
+        transform (bool): Aplicar transform_code()
+        stream (bool): Convertir los listados a streamOutput()
+        log (callable): log(mensaje, tipo) para informar de la transformación
+
+    Returns:
+        str: Código listo para TinkerWorker.execute()
+    """
+    if transform:
+        code = transform_code(code, log)
+    if stream:
+        code = to_stream_code(code)
+    return build_use_statements(code) + code
+
+
+def run_snippet(project_path, code, transform=True, stream=False, on_output=None, on_error=None,
+                on_rows=None, timeout=None, memory_limit=None, log=None, php_binary='php'):
+    """
+    Ejecuta un fragmento en un proceso PHP de un solo uso
+
+    Args:
+        project_path (str): Directorio del proyecto Laravel
+        code (str): Código tal como lo escribió el usuario
+        transform (bool): Aplicar transform_code()
+        stream (bool): Convertir los listados a streamOutput()
+        on_output, on_error, on_rows (callable): Ver TinkerWorker.execute
+        timeout (float): Segundos de reloj antes de matar el proceso
+        memory_limit (str): memory_limit de PHP
+        log (callable): log(mensaje, tipo) para informar de la transformación
+        php_binary (str o list): Ejecutable de PHP
+
+    Returns:
+        dict: Sobre con el resultado (ver TinkerWorker.execute)
+
+    Raises:
+        RuntimeError: Si Laravel no puede arrancar
+        ExecutionInterrupted: Si se superó el tiempo máximo
+    """
+    # execute() arranca el proceso, así el arranque cuenta en el desglose de tiempos
+    worker = TinkerWorker(project_path, php_binary, once=True)
+    try:
+        return worker.execute(
+            prepare_snippet(code, transform, stream, log),
+            on_output=on_output,
+            on_error=on_error,
+            timeout=timeout,
+            memory_limit=memory_limit,
+            on_rows=on_rows
+        )
+    finally:
+        worker.stop()
+
+
+class OneShotRunner:
+    """
+    Ejecutor con la misma interfaz que WorkerPool (submit / cancel) que lanza
+    cada trabajo en un proceso PHP de un solo uso. Lo usan los trabajos de
+    fondo cuando el worker persistente está desactivado.
+
+    Como mucho `size` procesos a la vez: el resto espera en una cola por
+    prioridad, de la que cancel() puede retirarlos antes de que arranquen.
+    """
+
+    def __init__(self, project_path, php_binary='php', size=2):
+        self.project_path = project_path
+        self.php_binary = php_binary
+        self.size = max(1, int(size))
+        self.jobs = queue.PriorityQueue()
+        self._job_ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._active = {}
+        self._threads = 0
+        self._lock = threading.Lock()
+
+    def submit(self, code, callback, priority=PRIORITY_NORMAL, timeout=None, memory_limit=None):
+        """
+        Encola un fragmento ya preparado (sin transformar)
+
+        Returns:
+            int: Identificador del trabajo
+        """
+        job_id = next(self._job_ids)
+        job = {'id': job_id, 'code': code, 'callback': callback,
+               'timeout': timeout, 'memory_limit': memory_limit}
+        with self._lock:
+            self.jobs.put((priority, next(self._seq), job))
+            if self._threads < self.size:
+                self._threads += 1
+                threading.Thread(target=self._run_jobs, daemon=True).start()
+        return job_id
+
+    def pending(self):
+        """Número de trabajos esperando turno"""
+        return self.jobs.qsize()
+
+    def running(self):
+        """Número de trabajos en ejecución"""
+        return len(self._active)
+
+    def cancel(self, job_id=None, running=True):
+        """
+        Cancela un trabajo (o todos si job_id es None): los que esperan en la cola
+        se descartan y los que están en ejecución matan su proceso PHP
+
+        Args:
+            job_id (int): Trabajo a cancelar (None = todos)
+            running (bool): Cancelar también los que ya están en ejecución
+
+        Returns:
+            int: Número de trabajos cancelados
+        """
+        cancelled = []
+        with self._lock:
+            kept = []
+            while True:
+                try:
+                    item = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job_id is None or item[2]['id'] == job_id:
+                    cancelled.append(item[2])
+                else:
+                    kept.append(item)
+            for item in kept:
+                self.jobs.put(item)
+            active = [worker for active_id, worker in self._active.items()
+                      if running and (job_id is None or active_id == job_id)]
+        for job in cancelled:
+            job['callback'](job['id'], None, ExecutionInterrupted('cancelled'))
+        for worker in active:
+            worker.kill('cancelled')
+        return len(cancelled) + len(active)
+
+    def _run_jobs(self):
+        # Cada hilo atiende trabajos hasta vaciar la cola; la comprobación y la
+        # salida van bajo el cerrojo para que submit() no se quede sin hilo
+        while True:
+            with self._lock:
+                try:
+                    _priority, _seq, job = self.jobs.get_nowait()
+                except queue.Empty:
+                    self._threads -= 1
+                    return
+                worker = TinkerWorker(self.project_path, self.php_binary, once=True)
+                self._active[job['id']] = worker
+            try:
+                envelope = worker.execute(
+                    prepare_snippet(job['code'], False, False),
+                    timeout=job['timeout'],
+                    memory_limit=job['memory_limit']
+                )
+                error = None
+            except Exception as e:
+                envelope, error = None, e
+            finally:
+                worker.stop()
+                with self._lock:
+                    self._active.pop(job['id'], None)
+            job['callback'](job['id'], envelope, error)
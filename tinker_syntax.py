@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Resaltado de sintaxis de Laravel Tinker Tool, sin dependencias de interfaz.
+
+Un único recorrido con una expresión regular por lenguaje produce los tramos
+de cada etiqueta (keyword, string, comment, number, json_key) ya convertidos a
+índices "línea.columna" de Tk, agrupados para aplicarlos con una sola llamada
+a tag_add por etiqueta.
+
+Para el editor, lex_line tokeniza PHP línea a línea con el estado del lexer al
+empezar cada línea (dentro de un comentario /* */ o de una cadena abierta), de
+modo que tras una edición sólo se vuelven a tokenizar las líneas cambiadas y
+las siguientes cuyo estado inicial cambie.
+"""
+
+import re
+
+# Textos de más caracteres que esto no se resaltan (o se resaltan aparte)
+HIGHLIGHT_MAX_CHARS = 200 * 1024
+
+# Etiquetas que puede producir el tokenizador
+HIGHLIGHT_TAGS = ('keyword', 'string', 'comment', 'number', 'json_key')
+
+PHP_KEYWORDS = frozenset((
+    'abstract', 'and', 'array', 'as', 'break', 'callable', 'case', 'catch', 'class', 'clone',
+    'const', 'continue', 'declare', 'default', 'do', 'echo', 'else', 'elseif', 'empty',
+    'enum', 'extends', 'false', 'final', 'finally', 'fn', 'for', 'foreach', 'function',
+    'global', 'if', 'implements', 'include', 'include_once', 'instanceof', 'insteadof',
+    'interface', 'isset', 'list', 'match', 'namespace', 'new', 'null', 'or', 'print',
+    'private', 'protected', 'public', 'readonly', 'require', 'require_once', 'return',
+    'self', 'static', 'switch', 'throw', 'trait', 'true', 'try', 'unset', 'use', 'var',
+    'while', 'xor', 'yield',
+))
+
+_PHP_TOKEN = re.compile(r'''
+    (?P<comment>//[^\n]*|\#(?!\[)[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:[^'\\]|\\.)*(?:'|\Z)|"(?:[^"\\]|\\.)*(?:"|\Z))
+  | (?P<number>\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)
+  | (?P<word>\$?[A-Za-z_]\w*)
+''', re.S | re.X)
+
+_JSON_TOKEN = re.compile(r'''
+    (?P<json_key>"(?:[^"\\\n]|\\.)*"(?=\s*:))
+  | (?P<string>"(?:[^"\\\n]|\\.)*")
+  | (?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)
+  | (?P<keyword>\b(?:true|false|null)\b)
+''', re.X)
+
+
+def tokenize(text, language='php'):
+    """
+    Recorre el texto una sola vez y devuelve los tokens resaltables
+
+    Args:
+        text (str): Código PHP o JSON
+        language (str): 'php' o 'json'
+
+    Yields:
+        tuple: (etiqueta, inicio, fin) en desplazamientos de caracteres, en orden
+    """
+    if language == 'json':
+        for match in _JSON_TOKEN.finditer(text):
+            yield match.lastgroup, match.start(), match.end()
+        return
+
+    for match in _PHP_TOKEN.finditer(text):
+        tag = match.lastgroup
+        if tag == 'word':
+            # Las variables y los identificadores que no son palabras clave no se resaltan
+            if match.group()[0] == '$' or match.group().lower() not in PHP_KEYWORDS:
+                continue
+            tag = 'keyword'
+        yield tag, match.start(), match.end()
+
+
+def highlight_ranges(text, language='php', line=1, column=0):
+    """
+    Tramos de cada etiqueta como índices de Tk, listos para tag_add
+
+    Args:
+        text (str): Texto a resaltar
+        language (str): 'php' o 'json'
+        line (int): Línea de Tk donde empieza el texto
+        column (int): Columna de Tk donde empieza el texto
+
+    Returns:
+        dict: etiqueta -> lista plana [inicio, fin, inicio, fin, ...]
+    """
+    ranges = {}
+    # Desplazamiento del inicio de la línea actual; la primera empieza en `column`
+    line_start = -column
+    position = 0
+
+    def index(offset):
+        nonlocal line, line_start, position
+        newlines = text.count("\n", position, offset)
+        if newlines:
+            line += newlines
+            line_start = text.rfind("\n", position, offset) + 1
+        position = offset
+        return f"{line}.{offset - line_start}"
+
+    for tag, start, end in tokenize(text, language):
+        ranges.setdefault(tag, []).extend((index(start), index(end)))
+    return ranges
+
+
+_PHP_LINE_TOKEN = re.compile(r'''
+    (?P<comment>//.*|\#(?!\[).*)
+  | (?P<comment_open>/\*)
+  | (?P<string_open>['"])
+  | (?P<number>\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)
+  | (?P<word>\$?[A-Za-z_]\w*)
+''', re.X)
+
+# Resto de una cadena abierta con cada tipo de comilla, hasta el cierre incluido
+_STRING_REST = {
+    "'": re.compile(r"(?:[^'\\]|\\.)*'"),
+    '"': re.compile(r'(?:[^"\\]|\\.)*"'),
+}
+
+# Estado del lexer al terminar una línea: None (código), 'comment' o la comilla de la cadena abierta
+STATE_CODE = None
+STATE_COMMENT = 'comment'
+
+
+def lex_line(line, state=STATE_CODE):
+    """
+    Tokeniza una línea de PHP partiendo del estado con que termina la anterior
+
+    Args:
+        line (str): Texto de la línea, sin el salto final
+        state: Estado al empezar la línea (STATE_CODE, STATE_COMMENT o una comilla)
+
+    Returns:
+        tuple: (lista de (etiqueta, columna inicial, columna final), estado al terminar la línea)
+    """
+    tokens = []
+    position = 0
+    length = len(line)
+
+    while True:
+        if state == STATE_COMMENT:
+            end = line.find("*/", position)
+            if end == -1:
+                if position < length:
+                    tokens.append(('comment', position, length))
+                return tokens, STATE_COMMENT
+            tokens.append(('comment', position, end + 2))
+            position = end + 2
+            state = STATE_CODE
+        elif state is not STATE_CODE:
+            # Dentro de una cadena que se abrió en una línea anterior
+            match = _STRING_REST[state].match(line, position)
+            if match is None:
+                if position < length:
+                    tokens.append(('string', position, length))
+                return tokens, state
+            tokens.append(('string', position, match.end()))
+            position = match.end()
+            state = STATE_CODE
+
+        match = _PHP_LINE_TOKEN.search(line, position)
+        if match is None:
+            return tokens, STATE_CODE
+        tag = match.lastgroup
+        start = match.start()
+        position = match.end()
+        if tag == 'comment_open':
+            # El cierre se busca después del /* (así /*/ no cierra el comentario)
+            end = line.find("*/", start + 2)
+            if end == -1:
+                tokens.append(('comment', start, length))
+                return tokens, STATE_COMMENT
+            tokens.append(('comment', start, end + 2))
+            position = end + 2
+        elif tag == 'string_open':
+            state = match.group()
+            position = start
+            rest = _STRING_REST[state].match(line, start + 1)
+            if rest is None:
+                tokens.append(('string', start, length))
+                return tokens, state
+            tokens.append(('string', start, rest.end()))
+            position = rest.end()
+            state = STATE_CODE
+        elif tag == 'word':
+            word = match.group()
+            if word[0] != '$' and word.lower() in PHP_KEYWORDS:
+                tokens.append(('keyword', start, position))
+        else:
+            tokens.append((tag, start, position))